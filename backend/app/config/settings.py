@@ -20,6 +20,7 @@ class Settings(BaseSettings):
     api_key: str
     max_tokens: int
     only_n_most_recent_images: int
+    only_n_thumbnail_images: int = 10
     selected_screen: int
 
     # Logging Configuration
@@ -2,7 +2,11 @@
 Agentic sampling loop that calls the Anthropic API and local implementation of anthropic-defined computer use tools.
 """
 import asyncio
+import base64
+import hashlib
 import platform
+import threading
+from collections import OrderedDict
 from collections.abc import Callable
 from datetime import datetime
 from enum import StrEnum
@@ -25,6 +29,7 @@ from anthropic.types import TextBlock
 from anthropic.types.beta import BetaMessage, BetaTextBlock, BetaToolUseBlock
 
 from ..tools import BashTool, ComputerTool, EditTool, ToolCollection, ToolResult
+from ..tools.computer import BATCH_ACTIONS, MAX_BATCH_ACTIONS, MAX_BATCH_WAIT
 
 from PIL import Image
 from io import BytesIO
@@ -53,6 +58,12 @@ SYSTEM_PROMPT = f"""<SYSTEM_CAPABILITY>
 * You are utilizing a Windows system with internet access.
 * The current date is {datetime.today().strftime('%A, %B %d, %Y')}.
 </SYSTEM_CAPABILITY>
+
+<COMPUTER_TOOL_ACTIONS>
+Besides its documented actions, the computer tool accepts:
+* "zoom" with "region": [x0, y0, x1, y1] in screenshot coordinates. It returns that region at native screen resolution; use it to read small text or inspect details.
+* "batch" with "actions": a list of up to {MAX_BATCH_ACTIONS} steps run back to back, with one screenshot after the last one. Each step is an object with "action" (one of {", ".join(BATCH_ACTIONS)}), the "text" or "coordinate" that action takes, "scroll_direction" and "scroll_amount" for scroll, and an optional "wait" in seconds (at most {MAX_BATCH_WAIT:g}) after the step. Execution stops at the first step that fails. Use it for sequences whose intermediate screens you do not need to see, such as clicking a field and typing into it.
+</COMPUTER_TOOL_ACTIONS>
 """
 
 
@@ -66,6 +77,7 @@ class AnthropicActor:
         api_response_callback: Callable[[APIResponse[BetaMessage]], None],
         max_tokens: int = 4096,
         only_n_most_recent_images: int | None = None,
+        only_n_thumbnail_images: int = 10,
         selected_screen: int = 0,
         print_usage: bool = True,
     ):
@@ -76,6 +88,8 @@ class AnthropicActor:
         self.api_response_callback = api_response_callback
         self.max_tokens = max_tokens
         self.only_n_most_recent_images = only_n_most_recent_images
+        # screenshots older than the most recent ones are kept this long as grayscale thumbnails
+        self.only_n_thumbnail_images = only_n_thumbnail_images
         self.selected_screen = selected_screen
         
         self.tool_collection = ToolCollection(
@@ -112,7 +126,9 @@ class AnthropicActor:
         Generate a response given history messages.
         """
         if self.only_n_most_recent_images:
-            _maybe_filter_to_n_most_recent_images(messages, self.only_n_most_recent_images)
+            _maybe_degrade_older_images(
+                messages, self.only_n_most_recent_images, self.only_n_thumbnail_images
+            )
 
         # Call the API synchronously
         raw_response = self.client.beta.messages.with_raw_response.create(
@@ -138,16 +154,76 @@ class AnthropicActor:
         return response
 
 
-def _maybe_filter_to_n_most_recent_images(
+# Older screenshots are replaced by this text once they fall out of the thumbnail tier
+IMAGE_STUB_TEXT = "[An older screenshot was removed here to save context.]"
+THUMBNAIL_SIZE = (480, 300)
+THUMBNAIL_QUALITY = 60
+
+
+# Thumbnails already made, keyed by a digest of the screenshot, up to this many bytes of base64
+THUMBNAIL_CACHE_BYTES = 8 * 1024 * 1024
+# Base64 prefix that holds the PNG IHDR or JPEG frame header of the images we produce
+HEADER_CHARS = 1024
+
+_thumbnails: OrderedDict[bytes, str] = OrderedDict()
+_thumbnails_size = 0
+_thumbnails_lock = threading.Lock()
+
+
+def _thumbnail(data: str) -> str:
+    """Base64 JPEG of a small grayscale version of a base64 screenshot (deterministic, so cache friendly)."""
+    global _thumbnails_size
+    key = hashlib.blake2b(data.encode(), digest_size=16).digest()
+    with _thumbnails_lock:
+        cached = _thumbnails.get(key)
+        if cached is not None:
+            _thumbnails.move_to_end(key)
+            return cached
+
+    image = Image.open(BytesIO(base64.b64decode(data))).convert("L")
+    image.thumbnail(THUMBNAIL_SIZE, Image.Resampling.BOX)
+    buffer = BytesIO()
+    image.save(buffer, format="JPEG", quality=THUMBNAIL_QUALITY)
+    thumbnail = base64.b64encode(buffer.getvalue()).decode()
+
+    with _thumbnails_lock:
+        if key not in _thumbnails:
+            _thumbnails[key] = thumbnail
+            _thumbnails_size += len(thumbnail)
+        while _thumbnails_size > THUMBNAIL_CACHE_BYTES and len(_thumbnails) > 1:
+            _thumbnails_size -= len(_thumbnails.popitem(last=False)[1])
+    return thumbnail
+
+
+def _is_thumbnail(data: str) -> bool:
+    # only the header is needed, so decode a short prefix (and everything only if that falls short);
+    # full-quality screenshots are never grayscale
+    try:
+        image = Image.open(BytesIO(base64.b64decode(data[:HEADER_CHARS])))
+    except Exception:
+        image = Image.open(BytesIO(base64.b64decode(data)))
+    return image.mode == "L" and image.width <= THUMBNAIL_SIZE[0] and image.height <= THUMBNAIL_SIZE[1]
+
+
+def _chunked(count: int, chunk: int) -> int:
+    return max(0, count - count % chunk)
+
+
+def _maybe_degrade_older_images(
     messages: list[BetaMessageParam],
     images_to_keep: int,
+    thumbnails_to_keep: int = 0,
     min_removal_threshold: int = 10,
 ):
     """
     With the assumption that images are screenshots that are of diminishing value as
-    the conversation progresses, remove all but the final `images_to_keep` tool_result
-    images in place, with a chunk of min_removal_threshold to reduce the amount we
-    break the implicit prompt cache.
+    the conversation progresses, keep the final `images_to_keep` tool_result images at
+    full quality, shrink the `thumbnails_to_keep` before them to grayscale thumbnails,
+    and replace anything older with a short text stub, in place.
+
+    The tier boundaries move in chunks of `min_removal_threshold` images and thumbnails
+    are re-encoded deterministically, so the prompt prefix (and its cache) only changes
+    once per chunk.
     """
     if images_to_keep is None:
         return messages
@@ -164,25 +240,39 @@ def _maybe_filter_to_n_most_recent_images(
         ],
     )
 
+    # every screenshot ever sent, oldest first: images (full or thumbnail) and earlier stubs
     total_images = sum(
         1
         for tool_result in tool_result_blocks
         for content in tool_result.get("content", [])
-        if isinstance(content, dict) and content.get("type") == "image"
+        if isinstance(content, dict) and (
+            content.get("type") == "image"
+            or (content.get("type") == "text" and content.get("text") == IMAGE_STUB_TEXT)
+        )
     )
 
-    images_to_remove = total_images - images_to_keep
-    # for better cache behavior, we want to remove in chunks
-    images_to_remove -= images_to_remove % min_removal_threshold
+    # for better cache behavior, we want to degrade in chunks
+    images_to_degrade = _chunked(total_images - images_to_keep, min_removal_threshold)
+    images_to_stub = _chunked(total_images - images_to_keep - thumbnails_to_keep, min_removal_threshold)
 
+    position = 0
     for tool_result in tool_result_blocks:
         if isinstance(tool_result.get("content"), list):
             new_content = []
             for content in tool_result.get("content", []):
-                if isinstance(content, dict) and content.get("type") == "image":
-                    if images_to_remove > 0:
-                        images_to_remove -= 1
-                        continue
+                is_image = isinstance(content, dict) and content.get("type") == "image"
+                is_stub = isinstance(content, dict) and content.get("type") == "text" and content.get("text") == IMAGE_STUB_TEXT
+                if is_image or is_stub:
+                    if position < images_to_stub and is_image:
+                        content = {"type": "text", "text": IMAGE_STUB_TEXT}
+                    elif position < images_to_degrade and is_image and content["source"].get("type") == "base64":
+                        data = content["source"]["data"]
+                        if not _is_thumbnail(data):
+                            content = {
+                                "type": "image",
+                                "source": {"type": "base64", "media_type": "image/jpeg", "data": _thumbnail(data)},
+                            }
+                    position += 1
                 new_content.append(content)
             tool_result["content"] = new_content
             
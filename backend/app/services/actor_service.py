@@ -34,7 +34,8 @@ class ActorService:
                 ),
                 max_tokens=self.settings.max_tokens,
                 only_n_most_recent_images=self.settings.only_n_most_recent_images,
-                selected_screen=self.settings.selected_screen
+                only_n_thumbnail_images=self.settings.only_n_thumbnail_images,
+                selected_screen=self.settings.selected_screen,
             )
         except Exception as e:
             logger.error(f"Failed to create actor: {str(e)}")
@@ -1,9 +1,54 @@
 import pytest
 from fastapi.testclient import TestClient
 from app.main import create_app
+from app.tools import capture
+from app.tools.computer import ComputerTool
+from app.tools.input_backend import RecordingInputBackend
+from app.tools.topology import ScreenGeometry, get_topology, scale_target_for
+
+
+# A 16:10 primary screen (scaled to WXGA, exactly half size) and a 16:9 screen to its right
+SCREENS = [
+    ScreenGeometry(index=0, x=0, y=0, width=2560, height=1600, is_primary=True,
+                   scale_target=scale_target_for(2560, 1600)),
+    ScreenGeometry(index=1, x=2560, y=0, width=1920, height=1080, is_primary=False,
+                   scale_target=scale_target_for(1920, 1080)),
+]
 
 
 @pytest.fixture
 def client():
     app = create_app()
-    return TestClient(app)
\ No newline at end of file
+    return TestClient(app)
+
+
+@pytest.fixture
+def screens(monkeypatch):
+    """Serve SCREENS from the shared topology instead of probing the real monitors."""
+    topology = get_topology()
+    monkeypatch.setattr(topology, "_probe", lambda: list(SCREENS))
+    monkeypatch.setattr(topology, "_start_watcher", lambda: None)
+    topology.invalidate()
+    yield SCREENS
+    monkeypatch.undo()
+    topology.invalidate()
+
+
+@pytest.fixture
+def fake_capture():
+    """Install a FakeCaptureBackend as the process-wide capture backend."""
+    previous = capture._backend
+    backend = capture.set_capture_backend(capture.FakeCaptureBackend())
+    yield backend
+    capture._backend = previous
+
+
+@pytest.fixture
+def recording_input():
+    return RecordingInputBackend()
+
+
+@pytest.fixture
+def computer(screens, fake_capture, recording_input):
+    """A ComputerTool on the primary screen with fake capture, recorded input and no pacing delays."""
+    return ComputerTool(selected_screen=0, pacing="fast-headless", input_backend=recording_input)
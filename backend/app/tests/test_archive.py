@@ -0,0 +1,81 @@
+import hashlib
+
+import pytest
+
+from app.tools.archive import ScreenshotArchive
+
+
+def digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def test_identical_images_are_stored_once(tmp_path):
+    archive = ScreenshotArchive(root=tmp_path)
+
+    first = archive.submit(b"a" * 100, session="s", step=0)
+    second = archive.submit(b"a" * 100, session="s", step=1)
+    archive.flush()
+
+    assert first.result() == second.result() == archive.path_for(digest(b"a" * 100))
+    assert first.result().read_bytes() == b"a" * 100
+    assert archive.lookup("s") == [(0, digest(b"a" * 100)), (1, digest(b"a" * 100))]
+    assert archive.lookup("s", step=1) == [(1, digest(b"a" * 100))]
+
+
+def test_least_recently_used_images_are_evicted_over_quota(tmp_path):
+    archive = ScreenshotArchive(root=tmp_path, quota_bytes=250)
+    a, b, c = b"a" * 100, b"b" * 100, b"c" * 100
+
+    for step, data in enumerate((a, b, a)):
+        archive.submit(data, session="s", step=step)
+        archive.flush()
+    # a was used again after b, so b goes first
+    archive.submit(c, session="s", step=3).result()
+
+    assert archive.path_for(digest(a)).exists()
+    assert not archive.path_for(digest(b)).exists()
+    assert archive.path_for(digest(c)).exists()
+    assert [step for step, _ in archive.lookup("s")] == [0, 2, 3]
+
+
+def test_the_newest_image_is_kept_even_over_quota(tmp_path):
+    archive = ScreenshotArchive(root=tmp_path, quota_bytes=50)
+
+    path = archive.submit(b"x" * 100, session="s", step=0).result()
+
+    assert path.exists()
+
+
+def test_phash_lookup(tmp_path):
+    archive = ScreenshotArchive(root=tmp_path)
+
+    archive.submit(b"a", session="s", step=0, phash="00ff")
+    archive.submit(b"b", session="t", step=4, phash="00ff")
+    archive.submit(b"c", session="t", step=5, phash="ff00")
+    archive.flush()
+
+    assert sorted(archive.find_phash("00ff")) == [("s", 0, digest(b"a")), ("t", 4, digest(b"b"))]
+
+
+def test_empty_archive_lookups(tmp_path):
+    archive = ScreenshotArchive(root=tmp_path / "missing")
+
+    assert archive.lookup("s") == []
+    assert archive.find_phash("00ff") == []
+
+
+def test_unusable_archive_fails_submissions_instead_of_hanging(tmp_path):
+    # the root is a file, so the archive thread cannot create its directory
+    root = tmp_path / "root"
+    root.write_text("not a directory")
+    archive = ScreenshotArchive(root=root)
+
+    first = archive.submit(b"a")
+    with pytest.raises(RuntimeError, match="unavailable"):
+        first.result(timeout=5)
+    archive.flush()
+
+    later = archive.submit(b"b")
+    assert later.done()
+    with pytest.raises(RuntimeError, match="unavailable"):
+        later.result()
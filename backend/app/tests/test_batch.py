@@ -0,0 +1,62 @@
+import pytest
+
+from app.tools.base import ToolError
+from app.tools.computer import MAX_BATCH_ACTIONS
+
+
+def test_batch_runs_steps_and_returns_one_screenshot(computer, recording_input, fake_capture):
+    result = computer.sync_call(
+        action="batch",
+        actions=[
+            {"action": "left_click", "coordinate": [10, 10]},
+            {"action": "key", "text": "ctrl+a"},
+            {"action": "scroll", "scroll_direction": "down", "scroll_amount": 2},
+        ],
+    )
+
+    assert recording_input.kinds() == ["click", "hotkey", "scroll"]
+    assert result.output.splitlines()[:3] == [
+        "0: Performed left_click at 20, 20",
+        "1: Pressed keys: ctrl+a",
+        "2: Scrolled down",
+    ]
+    assert result.error is None
+    assert result.image
+
+
+def test_failed_step_keeps_the_output_and_screenshot(computer, recording_input):
+    result = computer.sync_call(
+        action="batch",
+        actions=[
+            {"action": "left_click", "coordinate": [10, 10]},
+            {"action": "mouse_move", "coordinate": [5000, 5000]},
+            {"action": "key", "text": "enter"},
+        ],
+    )
+
+    assert recording_input.kinds() == ["click"]
+    assert result.output.splitlines()[:2] == [
+        "0: Performed left_click at 20, 20",
+        "Step 1 (mouse_move) failed: Coordinates 5000, 5000 are out of bounds. The remaining 1 steps were skipped.",
+    ]
+    assert result.error is None
+    assert result.image
+
+
+@pytest.mark.parametrize(
+    "actions, message",
+    [
+        ([], "actions must be a non-empty list of action objects"),
+        ([{"action": "zoom"}], "step 0: each step needs an action"),
+        ([{"action": "key", "text": "a"}, {"action": "key"}], "step 1: text is required for key"),
+        ([{"action": "key", "text": "a", "scroll_amount": 3}], "step 0: key does not accept scroll_amount"),
+        ([{"action": "key", "text": "a", "wait": 60}], "step 0: wait must be between 0 and"),
+        ([{"action": "key", "text": "a"}] * (MAX_BATCH_ACTIONS + 1), "a batch may contain at most"),
+    ],
+)
+def test_invalid_batches_run_nothing(computer, recording_input, actions, message):
+    with pytest.raises(ToolError) as error:
+        computer.sync_call(action="batch", actions=actions)
+
+    assert error.value.message.startswith(message)
+    assert recording_input.events == []
@@ -0,0 +1,92 @@
+import pytest
+from PIL import Image
+
+from app.tools import capture
+from app.tools.capture import (
+    FakeCaptureBackend,
+    ImageGrabBackend,
+    create_capture_backend,
+    get_capture_backend,
+    set_capture_backend,
+    take_x_error,
+)
+
+RED, BLUE = (255, 0, 0), (0, 0, 255)
+
+
+class ClosingBackend(FakeCaptureBackend):
+    def __init__(self):
+        super().__init__()
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def restore_backend():
+    previous = capture._backend
+    yield
+    capture._backend = previous
+
+
+def test_fake_backend_returns_solid_frames_of_the_requested_size():
+    backend = FakeCaptureBackend(color=RED)
+
+    frame = backend.grab((100, 50, 164, 98))
+
+    assert frame.size == (64, 48)
+    assert frame.getpixel((0, 0)) == RED
+    assert backend.grabs == [(100, 50, 164, 98)]
+
+
+def test_fake_backend_replays_queued_frames_and_repeats_the_last():
+    backend = FakeCaptureBackend([Image.new("RGB", (8, 8), RED)])
+    backend.push(Image.new("RGB", (8, 8), BLUE))
+    bbox = (0, 0, 8, 8)
+
+    colors = [backend.grab(bbox).getpixel((0, 0)) for _ in range(3)]
+
+    assert colors == [RED, BLUE, BLUE]
+
+
+def test_fake_backend_crops_desktop_frames_to_the_bbox():
+    desktop = Image.new("RGB", (20, 10), RED)
+    desktop.paste(BLUE, (10, 0, 20, 10))
+    backend = FakeCaptureBackend([desktop])
+
+    frame = backend.grab((10, 0, 20, 10))
+
+    assert frame.size == (10, 10)
+    assert frame.getpixel((0, 0)) == BLUE
+
+
+def test_backends_are_created_by_name_or_from_the_environment(monkeypatch):
+    assert isinstance(create_capture_backend("fake"), FakeCaptureBackend)
+    with pytest.raises(ValueError, match="Unknown capture backend 'gdi'"):
+        create_capture_backend("gdi")
+
+    monkeypatch.setenv("CUA_CAPTURE_BACKEND", "fake")
+    assert isinstance(create_capture_backend(), FakeCaptureBackend)
+
+
+def test_unusable_x_display_falls_back_to_imagegrab(monkeypatch):
+    monkeypatch.delenv("CUA_CAPTURE_BACKEND", raising=False)
+    monkeypatch.setattr(capture.platform, "system", lambda: "Linux")
+    monkeypatch.setenv("DISPLAY", ":4242")
+
+    assert isinstance(create_capture_backend(), ImageGrabBackend)
+    # failing to open the display is not an X protocol error, so none is left behind
+    assert take_x_error() is None
+
+
+def test_replacing_the_backend_closes_the_previous_one(restore_backend):
+    first = set_capture_backend(ClosingBackend())
+    second = set_capture_backend("fake")
+
+    assert first.closed
+    assert isinstance(second, FakeCaptureBackend)
+    assert get_capture_backend() is second
+
+    set_capture_backend(second)
+    assert get_capture_backend() is second
@@ -0,0 +1,97 @@
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from app.tools import frame_buffer
+from app.tools.computer import ComputerTool
+from app.tools.frame_buffer import CaptureRing
+
+RED, BLUE = (255, 0, 0), (0, 0, 255)
+
+
+@pytest.fixture
+def rings(monkeypatch, screens):
+    """Start every test without shared capture rings, and stop the ones it made."""
+    monkeypatch.setattr(frame_buffer, "_rings", {})
+    yield frame_buffer._rings
+    for ring in frame_buffer._rings.values():
+        stop(ring)
+
+
+def stop(ring):
+    ring.stop()
+    ring._thread.join(1)
+
+
+def color(result):
+    return Image.open(BytesIO(result.image.data)).convert("RGB").getpixel((0, 0))
+
+
+def test_ring_keeps_a_bounded_number_of_frames():
+    ring = CaptureRing(lambda: Image.new("RGB", (4, 4)), capacity=3, interval=0.0)
+    ring.start()
+    try:
+        assert ring.latest_after(since=0.0) is not None
+        while len(ring.frames()) < 3:
+            ring.latest_after(since=ring.latest().timestamp)
+    finally:
+        stop(ring)
+
+    frames = ring.frames()
+    assert len(frames) == 3
+    assert [frame.timestamp for frame in frames] == sorted(frame.timestamp for frame in frames)
+
+
+def test_frames_from_before_the_last_input_are_not_returned():
+    ring = CaptureRing(lambda: Image.new("RGB", (4, 4)), interval=0.01)
+    ring.start()
+    assert ring.latest_after(since=0.0) is not None
+    stop(ring)
+
+    ring.mark_input()
+
+    assert ring.latest() is not None
+    assert ring.latest_after(timeout=0.05) is None
+
+    ring.start()
+    try:
+        frame = ring.latest_after(timeout=1.0)
+    finally:
+        stop(ring)
+    assert frame is not None and frame.timestamp > ring.last_input
+
+
+def test_screenshot_after_input_uses_a_frame_grabbed_after_it(rings, screens, fake_capture, recording_input):
+    computer = ComputerTool(pacing="fast-headless", input_backend=recording_input, capture_buffer=True)
+    fake_capture.color = RED
+    assert computer._capture_ring.latest_after(since=0.0) is not None
+
+    fake_capture.color = BLUE
+    computer.sync_call(action="left_click")
+
+    assert color(computer.sync_call(action="screenshot")) == BLUE
+
+
+def test_screenshot_grabs_afresh_when_the_ring_has_no_new_frame(rings, screens, fake_capture, recording_input):
+    computer = ComputerTool(pacing="fast-headless", input_backend=recording_input, capture_buffer=True)
+    fake_capture.color = RED
+    assert computer._capture_ring.latest_after(since=0.0) is not None
+    stop(computer._capture_ring)
+
+    fake_capture.color = BLUE
+    computer.sync_call(action="left_click")
+    grabs = len(fake_capture.grabs)
+
+    assert color(computer.sync_call(action="screenshot")) == BLUE
+    assert len(fake_capture.grabs) > grabs
+
+
+def test_unchanged_screenshots_still_count_as_steps(screens, fake_capture, recording_input):
+    computer = ComputerTool(pacing="fast-headless", input_backend=recording_input, dirty_crops=True)
+
+    computer.sync_call(action="screenshot")
+    unchanged = computer.sync_call(action="screenshot")
+
+    assert unchanged.output == "The screen has not changed since the previous screenshot."
+    assert computer._step == 2
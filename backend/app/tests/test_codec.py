@@ -0,0 +1,67 @@
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from app.tools import archive
+from app.tools.archive import ScreenshotArchive
+from app.tools.codec import CODECS, ImageCodec, get_codec
+from app.tools.computer import ComputerTool
+
+
+def decode(data):
+    return Image.open(BytesIO(data))
+
+
+@pytest.mark.parametrize(
+    "name, format, media_type, extension",
+    [
+        ("png", "PNG", "image/png", "png"),
+        ("png-palette", "PNG", "image/png", "png"),
+        ("webp-lossless", "WEBP", "image/webp", "webp"),
+        ("jpeg", "JPEG", "image/jpeg", "jpg"),
+    ],
+)
+def test_codecs_encode_their_format(name, format, media_type, extension):
+    codec = get_codec(name)
+
+    image = decode(codec.encode(Image.new("RGB", (32, 16), (10, 200, 30))))
+
+    assert (image.format, image.size) == (format, (32, 16))
+    assert (codec.media_type, codec.extension) == (media_type, extension)
+
+
+def test_palette_png_is_quantized_and_jpeg_drops_alpha():
+    rgba = Image.new("RGBA", (16, 16), (10, 200, 30, 128))
+
+    assert decode(CODECS["png-palette"].encode(rgba.convert("RGB"))).mode == "P"
+    assert decode(CODECS["jpeg"].encode(rgba)).mode == "RGB"
+
+
+def test_lossless_webp_round_trips_exactly():
+    image = Image.effect_noise((64, 64), 50).convert("RGB")
+
+    assert decode(CODECS["webp-lossless"].encode(image)).convert("RGB").tobytes() == image.tobytes()
+
+
+def test_custom_codecs_pass_through_and_unknown_names_are_rejected():
+    custom = ImageCodec("tiff", "TIFF", "image/tiff", "tif")
+
+    assert get_codec(custom) is custom
+    with pytest.raises(ValueError, match="Unknown codec 'avif'"):
+        get_codec("avif")
+
+
+def test_screenshot_uses_the_codec_for_the_result_and_the_archive(screens, fake_capture, recording_input,
+                                                                  tmp_path, monkeypatch):
+    store = ScreenshotArchive(root=tmp_path)
+    monkeypatch.setattr(archive, "_archive", store)
+    computer = ComputerTool(pacing="fast-headless", input_backend=recording_input,
+                            codec="jpeg", archive_screenshots=True)
+
+    result = computer.sync_call(action="screenshot")
+    store.flush()
+
+    assert result.media_type == "image/jpeg"
+    assert decode(result.image.data).format == "JPEG"
+    assert [path.suffix for path in (tmp_path / "objects").rglob("*.*")] == [".jpg"]
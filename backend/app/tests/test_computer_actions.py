@@ -0,0 +1,98 @@
+import pytest
+
+from app.tools.base import ToolError
+from app.tools.computer import ACTIONS, ComputerTool
+
+
+def test_every_action_has_a_handler():
+    for action, (validate, handler) in ACTIONS.items():
+        assert callable(validate)
+        assert callable(getattr(ComputerTool, handler)), action
+
+
+def test_click_maps_api_to_screen_coordinates(computer, recording_input):
+    # the primary screen is scaled to exactly half size
+    result = computer.sync_call(action="left_click", coordinate=(640, 400))
+
+    assert result.output == "Performed left_click at 1280, 800"
+    assert recording_input.events[-1].kind == "click"
+    assert recording_input.events[-1].args == (1280, 800, "left", 1)
+    assert result.pacing == "fast-headless"
+
+
+@pytest.mark.parametrize(
+    "action, button, clicks",
+    [("right_click", "right", 1), ("middle_click", "middle", 1), ("double_click", "left", 2)],
+)
+def test_click_variants(computer, recording_input, action, button, clicks):
+    computer.sync_call(action=action)
+
+    assert recording_input.events[-1].args == (0, 0, button, clicks)
+
+
+def test_click_on_a_secondary_screen_adds_its_offset(screens, fake_capture, recording_input):
+    computer = ComputerTool(selected_screen=1, pacing="fast-headless", input_backend=recording_input)
+
+    computer.sync_call(action="mouse_move", coordinate=(0, 0))
+
+    assert recording_input.pointer == (screens[1].x, screens[1].y)
+
+
+def test_legacy_action_names_are_converted(computer, recording_input):
+    computer.sync_call(action="left click", coordinate=(10, 10))
+
+    assert recording_input.kinds() == ["click"]
+
+
+def test_key_combinations_use_pyautogui_names(computer, recording_input):
+    computer.sync_call(action="key", text="ctrl+Page_Down")
+
+    assert recording_input.events[-1].kind == "hotkey"
+    assert recording_input.events[-1].args == ("ctrl", "pagedown")
+
+
+def test_scroll_direction_and_amount(computer, recording_input):
+    computer.sync_call(action="scroll", coordinate=(100, 50), scroll_direction="up", scroll_amount=3)
+    computer.sync_call(action="scroll", scroll_direction="left", scroll_amount=2)
+
+    assert [(event.kind, event.args) for event in recording_input.events] == [
+        ("scroll", (3, 200, 100)),
+        ("hscroll", (-2, 200, 100)),
+    ]
+
+
+def test_type_enters_text_and_returns_a_screenshot(screens, fake_capture, recording_input):
+    computer = ComputerTool(pacing="fast-headless", input_backend=recording_input, text_entry="typewrite")
+
+    result = computer.sync_call(action="type", text="hello")
+
+    assert recording_input.events[-1].kind == "write"
+    assert recording_input.events[-1].args == ("hello", 0)
+    assert result.output.startswith("hello")
+    assert result.image
+
+
+def test_every_action_flushes_input(computer, recording_input):
+    computer.sync_call(action="mouse_move", coordinate=(1, 1))
+    computer.sync_call(action="cursor_position")
+
+    assert recording_input.flushes == 2
+
+
+@pytest.mark.parametrize(
+    "kwargs, message",
+    [
+        ({"action": "fly"}, "Invalid action: fly"),
+        ({"action": "left_click", "text": "x"}, "text is not accepted for left_click"),
+        ({"action": "mouse_move"}, "coordinate is required for mouse_move"),
+        ({"action": "key"}, "text is required for key"),
+        ({"action": "mouse_move", "coordinate": (1, 2, 3)}, "(1, 2, 3) must be a tuple of length 2"),
+        ({"action": "mouse_move", "coordinate": (5000, 5000)}, "Coordinates 5000, 5000 are out of bounds"),
+    ],
+)
+def test_invalid_arguments_raise_tool_error(computer, recording_input, kwargs, message):
+    with pytest.raises(ToolError) as error:
+        computer.sync_call(**kwargs)
+
+    assert error.value.message == message
+    assert recording_input.events == []
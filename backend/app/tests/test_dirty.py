@@ -0,0 +1,56 @@
+import numpy as np
+from PIL import Image, ImageDraw
+
+from app.tools.dirty import changed_bands, changed_bbox, changed_tiles
+
+
+def frame(*boxes):
+    image = Image.new("RGB", (320, 200), (255, 255, 255))
+    draw = ImageDraw.Draw(image)
+    for box in boxes:
+        draw.rectangle(box, fill=(0, 0, 0))
+    return image
+
+
+def test_identical_frames_have_no_changes():
+    assert changed_bbox(frame(), frame()) is None
+    assert changed_bands(frame(), frame()) == []
+
+
+def test_bbox_is_aligned_to_tiles():
+    assert changed_bbox(frame(), frame((40, 70, 50, 80))) == (32, 64, 64, 96)
+
+
+def test_bbox_spans_separate_changes():
+    assert changed_bbox(frame(), frame((0, 0, 5, 5), (300, 150, 310, 160))) == (0, 0, 320, 192)
+
+
+def test_bbox_is_clipped_to_the_frame():
+    # 200 is not a multiple of the tile size, so the last tile row is partial
+    assert changed_bbox(frame(), frame((100, 195, 110, 199))) == (96, 192, 128, 200)
+
+
+def test_size_change_marks_the_whole_frame():
+    assert changed_bbox(Image.new("RGB", (10, 10)), frame()) == (0, 0, 320, 200)
+    assert changed_bands(Image.new("RGB", (10, 10)), frame()) == [(0, 200)]
+
+
+def test_small_differences_are_ignored():
+    faint = Image.new("RGB", (320, 200), (250, 250, 250))
+
+    assert changed_bbox(frame(), faint) is None
+    assert changed_bbox(frame(), faint, threshold=2) == (0, 0, 320, 200)
+
+
+def test_bands_merge_adjacent_tile_rows():
+    # tile rows 0-1, then rows 4 and 5 (a different column, but bands span the full width)
+    bands = changed_bands(frame(), frame((0, 10, 5, 40), (200, 130, 210, 140), (0, 170, 5, 175)))
+
+    assert bands == [(0, 64), (128, 192)]
+
+
+def test_changed_tiles_grid_shape():
+    tiles = changed_tiles(np.asarray(frame()), np.asarray(frame((40, 70, 50, 80))))
+
+    assert tiles.shape == (7, 10)
+    assert tiles.sum() == 1
@@ -0,0 +1,92 @@
+import base64
+from io import BytesIO
+
+from PIL import Image
+
+from app.planner.anthropic_agent import (
+    IMAGE_STUB_TEXT,
+    THUMBNAIL_SIZE,
+    _is_thumbnail,
+    _maybe_degrade_older_images,
+    _thumbnail,
+)
+
+
+def screenshot(shade: int) -> str:
+    buffer = BytesIO()
+    Image.new("RGB", (1280, 800), (shade, 255 - shade, 0)).save(buffer, format="PNG")
+    return base64.b64encode(buffer.getvalue()).decode()
+
+
+def conversation(count: int) -> list[dict]:
+    return [
+        {
+            "role": "user",
+            "content": [
+                {
+                    "type": "tool_result",
+                    "tool_use_id": str(i),
+                    "content": [
+                        {"type": "text", "text": f"step {i}"},
+                        {"type": "image", "source": {"type": "base64", "media_type": "image/png", "data": screenshot(i)}},
+                    ],
+                }
+            ],
+        }
+        for i in range(count)
+    ]
+
+
+def tiers(messages: list[dict]) -> list[str]:
+    kinds = []
+    for message in messages:
+        for content in message["content"][0]["content"][1:]:
+            if content["type"] == "text":
+                kinds.append("stub")
+            elif _is_thumbnail(content["source"]["data"]):
+                kinds.append("thumbnail")
+            else:
+                kinds.append("full")
+    return kinds
+
+
+def test_thumbnails_are_small_grayscale_jpegs():
+    data = screenshot(0)
+
+    thumbnail = _thumbnail(data)
+    image = Image.open(BytesIO(base64.b64decode(thumbnail)))
+
+    assert image.format == "JPEG" and image.mode == "L"
+    assert image.width <= THUMBNAIL_SIZE[0] and image.height <= THUMBNAIL_SIZE[1]
+    assert _thumbnail(data) == thumbnail
+    assert _is_thumbnail(thumbnail)
+    assert not _is_thumbnail(data)
+
+
+def test_older_images_degrade_in_chunks():
+    messages = conversation(25)
+
+    _maybe_degrade_older_images(messages, images_to_keep=3, thumbnails_to_keep=10, min_removal_threshold=5)
+
+    # 22 older than the last 3: 20 degrade (chunks of 5); 12 older than the thumbnails: 10 become stubs
+    assert tiers(messages) == ["stub"] * 10 + ["thumbnail"] * 10 + ["full"] * 5
+    assert messages[0]["content"][0]["content"][1] == {"type": "text", "text": IMAGE_STUB_TEXT}
+
+
+def test_degrading_again_keeps_earlier_tiers():
+    messages = conversation(25)
+    _maybe_degrade_older_images(messages, images_to_keep=3, thumbnails_to_keep=10, min_removal_threshold=5)
+    before = [message["content"][0]["content"] for message in messages]
+
+    _maybe_degrade_older_images(messages, images_to_keep=3, thumbnails_to_keep=10, min_removal_threshold=5)
+
+    # stubs still count as images, so the tier boundaries (and the prompt prefix) stay put
+    assert [message["content"][0]["content"] for message in messages] == before
+
+
+def test_nothing_is_degraded_without_a_limit():
+    messages = conversation(3)
+
+    _maybe_degrade_older_images(messages, images_to_keep=None)
+
+    assert tiers(messages) == ["full"] * 3
@@ -0,0 +1,63 @@
+from io import BytesIO
+
+from PIL import Image
+
+from app.tools.codec import get_codec
+from app.tools.computer import ComputerTool
+from app.tools.multi_screen import desktop_bbox, encode_screens
+from app.tools.transform import get_frame_transform
+
+RED, BLUE = (255, 0, 0), (0, 0, 255)
+
+
+def desktop():
+    """The SCREENS desktop with the primary screen red and the secondary blue."""
+    image = Image.new("RGB", (4480, 1600), RED)
+    image.paste(BLUE, (2560, 0, 4480, 1600))
+    return image
+
+
+def decode(image):
+    return Image.open(BytesIO(image.data)).convert("RGB")
+
+
+def center(image):
+    # resampling blends a few pixels across the screen edges, so look away from them
+    return image.getpixel((image.width // 2, image.height // 2))
+
+
+def test_desktop_bbox_covers_every_screen(screens):
+    assert desktop_bbox(screens) == (0, 0, 4480, 1600)
+    assert desktop_bbox(screens[1:]) == (2560, 0, 4480, 1080)
+
+
+def test_each_screen_is_cropped_from_one_desktop_grab(screens):
+    def transform_for(screen):
+        target = screen.scale_target
+        return get_frame_transform(screen.width, screen.height, target["width"], target["height"])
+
+    encoded = encode_screens(desktop(), screens, transform_for, get_codec("png"))
+
+    assert [screen.index for screen, _ in encoded] == [0, 1]
+    images = [Image.open(BytesIO(data)).convert("RGB") for _, data in encoded]
+    assert [image.size for image in images] == [(1280, 800), (1366, 768)]
+    assert [center(image) for image in images] == [RED, BLUE]
+
+
+def test_all_screens_screenshot_returns_one_image_per_screen(screens, fake_capture, recording_input):
+    fake_capture.push(desktop())
+    computer = ComputerTool(selected_screen=1, pacing="fast-headless", input_backend=recording_input)
+
+    result = computer.sync_call(action="screenshot", all_screens=True)
+
+    assert set(fake_capture.grabs) == {(0, 0, 4480, 1600)}
+    assert [(image.screen, image.bbox) for image in result.screen_images] == [
+        (0, (0, 0, 2560, 1600)),
+        (1, (2560, 0, 4480, 1080)),
+    ]
+    assert [center(decode(image.image)) for image in result.screen_images] == [RED, BLUE]
+    assert result.output.splitlines() == [
+        "Screen 0: 2560x1600 at (0, 0), shown as 1280x800",
+        "Screen 1: 1920x1080 at (2560, 0), shown as 1366x768 (selected, actions apply here)",
+    ]
+    assert computer._step == 1
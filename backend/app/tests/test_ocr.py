@@ -0,0 +1,85 @@
+import sys
+import types
+
+import pytest
+from PIL import Image
+
+from app.tools import computer as computer_module
+from app.tools import ocr
+from app.tools.base import ToolError
+from app.tools.ocr import TextBox, merge_bands, reading_order, recognize
+
+
+@pytest.fixture
+def fake_pytesseract(monkeypatch):
+    """An importable pytesseract whose image_to_data returns `module.data`."""
+    module = types.SimpleNamespace(Output=types.SimpleNamespace(DICT="dict"), data=None)
+    module.image_to_data = lambda image, output_type: module.data
+    monkeypatch.setitem(sys.modules, "pytesseract", module)
+    ocr.ocr_available.cache_clear()
+    yield module
+    ocr.ocr_available.cache_clear()
+
+
+def words(*entries):
+    """tesseract's dict output for (text, conf, line, left, top, width, height) entries."""
+    columns = ("text", "conf", "line_num", "left", "top", "width", "height")
+    data = {column: [entry[i] for entry in entries] for i, column in enumerate(columns)}
+    data["block_num"] = data["par_num"] = [1] * len(entries)
+    return data
+
+
+def test_missing_tesseract_binary_raises_tool_error(computer, fake_pytesseract, monkeypatch):
+    monkeypatch.setattr(ocr.shutil, "which", lambda name: None)
+
+    with pytest.raises(ToolError, match="Text observations need pytesseract"):
+        computer.sync_call(action="screenshot", observation="text")
+
+
+def test_words_are_grouped_into_lines_in_the_callers_space(fake_pytesseract):
+    fake_pytesseract.data = words(
+        ("File", "96", 1, 10, 10, 40, 20),
+        ("Edit", "91", 1, 60, 10, 40, 20),
+        ("~~", "12", 2, 10, 50, 20, 20),
+        ("Save", "88", 3, 10, 90, 50, 20),
+    )
+
+    boxes = recognize(Image.new("RGB", (200, 200)), offset=(0, 100), scale=(0.5, 0.5))
+
+    assert [box.describe() for box in boxes] == ["(5, 105, 50, 115) File Edit", "(5, 145, 30, 155) Save"]
+    assert boxes[0].confidence == 93.5
+    assert boxes[0].center == (27, 110)
+
+
+def test_reading_order_and_band_merging():
+    lower, upper = TextBox("b", (0, 50, 10, 60), 90.0), TextBox("a", (20, 10, 30, 20), 90.0)
+
+    assert reading_order([lower, upper]) == [upper, lower]
+    assert merge_bands([(40, 50), (10, 20), (22, 30)], margin=2, limit=45) == [(8, 32), (38, 45)]
+
+
+def test_text_observation_reads_only_the_changed_band_again(computer, fake_capture, monkeypatch):
+    calls = []
+    results = iter([
+        [TextBox("File Edit", (10, 10, 100, 20), 90.0), TextBox("Hello", (100, 400, 200, 410), 90.0)],
+        [TextBox("Goodbye", (100, 400, 220, 410), 90.0)],
+    ])
+
+    def fake_recognize(image, offset=(0, 0), scale=(1.0, 1.0)):
+        calls.append((image.size, offset))
+        return next(results)
+
+    monkeypatch.setattr(computer_module, "ocr_available", lambda: True)
+    monkeypatch.setattr(computer_module, "recognize", fake_recognize)
+    computer.sync_call(action="screenshot", observation="text")
+
+    changed = Image.new("RGB", (2560, 1600), (255, 255, 255))
+    changed.paste((0, 0, 0), (200, 800, 440, 820))
+    fake_capture.push(changed)
+    result = computer.sync_call(action="screenshot", observation="text")
+
+    assert calls[0] == ((2560, 1600), (0, 0))
+    (width, height), (_, top) = calls[1]
+    assert width == 2560 and height < 100 and top <= 400
+    assert result.output.splitlines()[1:] == ["(10, 10, 100, 20) File Edit", "(100, 400, 220, 410) Goodbye"]
+    assert result.output.startswith("Text on the screen (1280x800 frame;")
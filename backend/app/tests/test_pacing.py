@@ -0,0 +1,60 @@
+import pytest
+
+from app.tools.base import ToolError
+from app.tools.computer import ComputerTool
+from app.tools.pacing import PACING_PROFILES, PacingProfile, get_pacing
+
+
+def test_profiles_are_resolved_by_name():
+    custom = PacingProfile("custom", pause=0.05, drag_duration=0.2, press_timeout=0.5, typing_delay_ms=5)
+
+    assert get_pacing("default") is PACING_PROFILES["default"]
+    assert get_pacing(custom) is custom
+    with pytest.raises(ValueError, match="Unknown pacing profile 'slow'"):
+        get_pacing("slow")
+
+
+@pytest.mark.parametrize("pacing, duration", [("fast-headless", 0.0), ("default", 0.5)])
+def test_drag_duration_follows_the_profile(screens, fake_capture, recording_input, pacing, duration):
+    computer = ComputerTool(pacing=pacing, input_backend=recording_input)
+
+    result = computer.sync_call(action="left_click_drag", coordinate=[100, 100])
+
+    assert recording_input.events[-1].kind == "drag"
+    assert recording_input.events[-1].args[2] == duration
+    assert result.pacing == pacing
+
+
+def test_typing_delay_follows_the_profile(screens, fake_capture, recording_input):
+    computer = ComputerTool(pacing="default", input_backend=recording_input, text_entry="typewrite")
+
+    computer.sync_call(action="type", text="hi")
+    computer.sync_call(action="type", text="hi", pacing="conservative-remote-desktop")
+
+    intervals = [event.args[1] for event in recording_input.events if event.kind == "write"]
+    assert intervals == [0.012, 0.03]
+
+
+def test_a_per_call_profile_only_applies_to_that_call(computer, recording_input, monkeypatch):
+    pauses = []
+    click = recording_input.click
+
+    def recording_click(*args, **kwargs):
+        pauses.append(recording_input.pause)
+        return click(*args, **kwargs)
+
+    monkeypatch.setattr(recording_input, "click", recording_click)
+    remote = computer.sync_call(action="left_click", pacing="conservative-remote-desktop")
+    headless = computer.sync_call(action="left_click")
+
+    assert pauses == [0.25, 0.0]
+    assert (remote.pacing, headless.pacing) == ("conservative-remote-desktop", "fast-headless")
+    assert recording_input.pause == 0.0
+    assert computer._pacing is computer.pacing
+
+
+def test_unknown_per_call_profile_raises_tool_error(computer, recording_input):
+    with pytest.raises(ToolError, match="Unknown pacing profile 'slow'"):
+        computer.sync_call(action="left_click", pacing="slow")
+
+    assert recording_input.events == []
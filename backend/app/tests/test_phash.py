@@ -0,0 +1,69 @@
+from PIL import Image, ImageDraw
+
+from app.tools.phash import SAME_SCREEN_DISTANCE, PerceptualIndex, dhash, format_hash, hamming, phash
+
+
+def window(offset=0, size=(640, 400)):
+    """A light desktop with a dark window; `offset` moves the window to the right."""
+    image = Image.new("RGB", size, (230, 230, 230))
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((80 + offset, 60, 400 + offset, 300), fill=(40, 40, 60))
+    draw.rectangle((80 + offset, 60, 400 + offset, 90), fill=(20, 90, 200))
+    return image
+
+
+def test_hashes_ignore_scale_and_small_shifts_but_not_layout():
+    for hash_function in (dhash, phash):
+        original = hash_function(window())
+        assert hamming(hash_function(window().resize((1280, 800))), original) <= SAME_SCREEN_DISTANCE
+        assert hamming(hash_function(window(offset=2)), original) <= SAME_SCREEN_DISTANCE
+        assert hamming(hash_function(window(offset=200)), original) > SAME_SCREEN_DISTANCE
+
+
+def test_hamming_and_format():
+    assert hamming(0b1011, 0b0001) == 2
+    assert hamming(2**64 - 1, 0) == 64
+    assert format_hash(0xAB) == "00000000000000ab"
+
+
+def test_nearest_prefers_the_closest_then_the_newest():
+    index = PerceptualIndex()
+    index.add(0b0000, "old")
+    index.add(0b0111, "far")
+    index.add(0b0000, "new")
+
+    assert index.nearest(0b0001) == ("new", 1)
+    assert index.nearest(0b0111) == ("far", 0)
+    assert index.nearest(0b1111_0000, max_distance=3) is None
+    assert index.within(0b0001, max_distance=1) == [("old", 1), ("new", 1)]
+    assert PerceptualIndex().nearest(0) is None
+
+
+def test_full_index_forgets_the_oldest_half():
+    index = PerceptualIndex(max_size=4)
+    for key in range(6):
+        index.add(key, key)
+
+    assert len(index) == 4
+    assert sorted(key for key, _ in index.within(0, max_distance=64)) == [2, 3, 4, 5]
+    assert index.nearest(0, max_distance=0) is None
+    assert index.nearest(5, max_distance=0) == (5, 0)
+
+
+def test_repeated_screenshots_match_the_earlier_step(computer, fake_capture, monkeypatch):
+    monkeypatch.setattr(computer, "phash_index", PerceptualIndex())
+    fake_capture.push(window(size=(2560, 1600)))
+
+    first = computer.sync_call(action="screenshot")
+    assert computer.last_match is None
+    assert not computer.is_same_screen()
+
+    second = computer.sync_call(action="screenshot")
+    assert computer.last_match == ((computer.session_id, 0), 0)
+    assert computer.is_same_screen()
+    assert second.frame_hash == first.frame_hash == format_hash(computer.last_frame_hash)
+
+    fake_capture.frames.clear()
+    fake_capture.push(window(offset=800, size=(2560, 1600)))
+    computer.sync_call(action="screenshot")
+    assert not computer.is_same_screen()
@@ -0,0 +1,85 @@
+import base64
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+from app.tools.computer import ComputerTool
+from app.tools.resolution import ResolutionPolicy, detail_level, estimate_image_tokens
+from app.tools.topology import Resolution
+
+WXGA = Resolution(width=1280, height=800)
+
+
+def noise(width=1280, height=800):
+    return Image.fromarray(np.random.default_rng(0).integers(0, 256, (height, width, 3), dtype=np.uint8))
+
+
+def test_estimate_image_tokens():
+    assert estimate_image_tokens(1280, 800) == 1366
+    assert estimate_image_tokens(750, 1) == 1
+
+
+def test_detail_level():
+    assert detail_level(Image.new("RGB", (1280, 800), (255, 255, 255))) == 0.0
+    assert detail_level(noise()) == 1.0
+
+
+def test_base_resolution_is_kept_within_budget():
+    policy = ResolutionPolicy(frame_tokens=1600, adapt_to_content=False)
+
+    assert policy.choose(WXGA) == WXGA
+
+
+def test_smaller_budget_scales_down_keeping_aspect_ratio():
+    policy = ResolutionPolicy(frame_tokens=400, min_frame_tokens=100, adapt_to_content=False)
+
+    chosen = policy.choose(WXGA)
+
+    assert chosen["width"] % 2 == 0 and chosen["height"] % 2 == 0
+    assert abs(chosen["width"] / chosen["height"] - 1.6) < 0.01
+    assert estimate_image_tokens(chosen["width"], chosen["height"]) <= 405
+
+
+def test_blank_frames_get_the_minimum_budget():
+    policy = ResolutionPolicy(frame_tokens=1600, min_frame_tokens=400)
+
+    assert policy.frame_budget(Image.new("RGB", (1280, 800))) == 400
+    assert policy.frame_budget(noise()) == 1600
+
+
+def test_budget_shrinks_as_the_context_fills():
+    policy = ResolutionPolicy(frame_tokens=1600, min_frame_tokens=100, context_tokens=200_000, reserved_frames=20)
+
+    assert policy.frame_budget() == 1600
+    policy.observe_usage(180_000)
+    assert policy.remaining_context == 20_000
+    assert policy.frame_budget() == 1000
+    policy.observe_usage(199_000)
+    assert policy.frame_budget() == 100
+
+
+def test_spent_tokens_stand_in_for_unreported_usage():
+    policy = ResolutionPolicy(context_tokens=10_000)
+
+    assert policy.record(1280, 800) == 1366
+    assert policy.spent_tokens == 1366
+    assert policy.remaining_context == 10_000 - 1366
+
+
+def _image_size(result):
+    return Image.open(BytesIO(base64.b64decode(result.base64_image))).size
+
+
+def test_screenshots_and_coordinates_follow_the_policy(screens, fake_capture, recording_input):
+    policy = ResolutionPolicy(frame_tokens=400, min_frame_tokens=100, adapt_to_content=False)
+    computer = ComputerTool(pacing="fast-headless", input_backend=recording_input, resolution_policy=policy)
+
+    width, height = _image_size(computer.sync_call(action="screenshot"))
+    assert (width, height) == tuple(policy.choose(WXGA).values())
+    assert policy.spent_tokens == estimate_image_tokens(width, height)
+
+    # the model's coordinates refer to the smaller frame it was shown
+    computer.sync_call(action="left_click", coordinate=(width // 2, height // 2))
+    x, y = recording_input.pointer
+    assert abs(x - 1280) <= 4 and abs(y - 800) <= 4
@@ -0,0 +1,86 @@
+import itertools
+
+from PIL import Image, ImageDraw
+
+from app.tools.settle import frames_differ, probe, probes_differ, wait_until_settled
+
+SIZE = (2560, 1600)
+
+
+def blank():
+    return Image.new("RGB", SIZE, (255, 255, 255))
+
+
+def with_box(box):
+    image = blank()
+    ImageDraw.Draw(image).rectangle(box, fill=(0, 0, 0))
+    return image
+
+
+def frames(*images):
+    """A grab that returns `images` in order, then repeats the last one."""
+    sequence = itertools.chain(images, itertools.repeat(images[-1]))
+    return lambda: next(sequence)
+
+
+def test_static_screen_settles_quickly():
+    result = wait_until_settled(frames(blank()), max_wait=1.0, interval=0.01)
+
+    assert result.settled
+    assert not result.changed
+    assert result.waited < 0.5
+
+
+def test_unchanged_screen_waits_for_the_timeout():
+    result = wait_until_settled(
+        frames(blank()), max_wait=0.2, interval=0.01, require_change=True, reference=blank()
+    )
+
+    assert not result.settled
+    assert not result.changed
+    assert result.waited >= 0.15
+
+
+def test_small_change_is_seen_on_a_large_screen():
+    caret = with_box((1200, 700, 1201, 718))
+    # far too small for the probe
+    assert not probes_differ(probe(blank()), probe(caret))
+    assert frames_differ(blank(), caret)
+
+    result = wait_until_settled(
+        frames(blank(), caret), max_wait=1.0, interval=0.01, require_change=True, reference=blank()
+    )
+
+    assert result.settled
+    assert result.changed
+    assert result.image is caret
+    assert result.waited < 0.5
+
+
+def test_screen_that_keeps_changing_times_out_as_changed():
+    moving = (with_box((x, 0, x + 400, 400)) for x in itertools.count(0, 200))
+
+    result = wait_until_settled(
+        lambda: next(moving), max_wait=0.2, interval=0.01, require_change=True, reference=blank()
+    )
+
+    assert result.changed
+    assert not result.settled
+
+
+def test_wait_for_change_reports_an_unchanged_screen(computer):
+    result = computer.sync_call(action="left_click", wait_for_change=0.2)
+
+    assert "The screen did not change within 0.2s." in result.output
+    assert result.image
+
+
+def test_wait_for_change_returns_the_changed_screen(computer, fake_capture):
+    # the first grab is the reference taken before the click, the rest show its effect
+    fake_capture.frames.extend([Image.new("RGB", SIZE, (255, 255, 255)), with_box((100, 100, 104, 104))])
+
+    result = computer.sync_call(action="left_click", wait_for_change=1.0)
+
+    assert result.output.startswith("Performed left_click")
+    assert "did not change" not in result.output
+    assert "still changing" not in result.output
@@ -0,0 +1,141 @@
+import subprocess
+import sys
+import time
+import types
+
+import pytest
+
+from app.tools import text_entry
+from app.tools.base import ToolError
+from app.tools.text_entry import PASTE_THRESHOLD, TYPING_GROUP_SIZE, Clipboard, TextEntry
+
+LONG_TEXT = "a" * PASTE_THRESHOLD
+
+
+@pytest.fixture
+def clipboard(monkeypatch):
+    """A working clipboard held in a dict, installed as the process-wide clipboard."""
+    contents = {"text": "original"}
+    monkeypatch.setattr(
+        Clipboard, "_find_commands",
+        staticmethod(lambda: (lambda text: contents.update(text=text), lambda: contents["text"])),
+    )
+    monkeypatch.setattr(text_entry, "_clipboard", Clipboard())
+    monkeypatch.setattr(text_entry, "_clipboard_probed", True)
+    monkeypatch.setattr(text_entry, "CLIPBOARD_RESTORE_DELAY", 0.0)
+    return contents
+
+
+@pytest.fixture
+def broken_clipboard(monkeypatch):
+    def fail(*args):
+        raise RuntimeError("no clipboard mechanism")
+
+    monkeypatch.setattr(Clipboard, "_find_commands", staticmethod(lambda: (fail, fail)))
+    monkeypatch.setattr(text_entry, "_clipboard", Clipboard())
+    monkeypatch.setattr(text_entry, "_clipboard_probed", True)
+
+
+@pytest.fixture
+def no_clipboard(monkeypatch):
+    monkeypatch.setattr(text_entry, "_clipboard", None)
+    monkeypatch.setattr(text_entry, "_clipboard_probed", True)
+
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+def entry(recording_input, strategy="auto", xdotool=False, **kwargs):
+    entry = TextEntry(recording_input, strategy, **kwargs)
+    entry._xdotool = xdotool
+    return entry
+
+
+def test_choose(recording_input, clipboard):
+    assert entry(recording_input).choose("hello") == "typewrite"
+    assert entry(recording_input, xdotool=True).choose("hello") == "chunked"
+    assert entry(recording_input).choose("a" * (TYPING_GROUP_SIZE + 1)) == "chunked"
+    assert entry(recording_input).choose(LONG_TEXT) == "paste"
+    assert entry(recording_input).choose("héllo") == "paste"
+    assert entry(recording_input, "typewrite").choose(LONG_TEXT) == "typewrite"
+
+
+def test_choose_without_clipboard(recording_input, no_clipboard):
+    assert entry(recording_input).choose(LONG_TEXT) == "chunked"
+    assert entry(recording_input, xdotool=True).choose("héllo") == "chunked"
+    with pytest.raises(ToolError):
+        entry(recording_input).choose("héllo")
+
+
+def test_paste_presses_the_shortcut_and_restores_the_clipboard(recording_input, clipboard):
+    typist = entry(recording_input, paste_shortcut="ctrl+shift+v")
+
+    assert typist.enter(LONG_TEXT) == "paste"
+    assert recording_input.kinds() == ["hotkey"]
+    assert recording_input.events[0].args == ("ctrl", "shift", "v")
+    assert wait_for(lambda: clipboard["text"] == "original")
+
+
+def test_failing_clipboard_falls_back_to_typing(recording_input, broken_clipboard):
+    assert entry(recording_input).enter(LONG_TEXT) == "chunked"
+    assert "".join(event.args[0] for event in recording_input.events) == LONG_TEXT
+    # the failed clipboard is not offered again
+    assert text_entry.get_clipboard() is None
+
+
+def test_failing_clipboard_raises_tool_error_when_pasting_was_asked_for(recording_input, broken_clipboard):
+    with pytest.raises(ToolError, match="clipboard is unavailable"):
+        entry(recording_input, "paste").enter("hello")
+    assert recording_input.events == []
+
+
+def test_failed_restore_does_not_raise(recording_input, clipboard, monkeypatch):
+    monkeypatch.setattr(text_entry, "CLIPBOARD_RESTORE_DELAY", 60.0)
+    typist = entry(recording_input)
+    typist.enter(LONG_TEXT)
+    typist._restore_timer.cancel()
+    text_entry._clipboard._copy = lambda text: (_ for _ in ()).throw(RuntimeError("gone"))
+
+    typist._restore_clipboard(typist._pastes)
+
+    assert typist._saved_clipboard is None
+
+
+def test_pyperclip_without_a_mechanism_is_skipped(monkeypatch):
+    def paste():
+        raise RuntimeError("Pyperclip could not find a copy/paste mechanism")
+
+    monkeypatch.setitem(sys.modules, "pyperclip", types.SimpleNamespace(copy=print, paste=paste))
+    monkeypatch.setattr(text_entry.shutil, "which", lambda command: None)
+
+    assert Clipboard._find_commands() == (None, None)
+
+
+def test_non_ascii_text_cannot_be_typed_key_by_key(recording_input, clipboard):
+    with pytest.raises(ToolError):
+        entry(recording_input, "typewrite").enter("héllo")
+
+
+def test_xdotool_typing_follows_the_pacing_delay(recording_input, monkeypatch):
+    commands = []
+    monkeypatch.setattr(text_entry.subprocess, "run", lambda command, check: commands.append(command))
+
+    entry(recording_input, "chunked", xdotool=True).enter("hello", typing_delay_ms=0)
+    entry(recording_input, "chunked", xdotool=True).enter("hello", typing_delay_ms=12)
+
+    assert [command[command.index("--delay") + 1] for command in commands] == ["0", "12"]
+
+
+def test_xdotool_failure_raises_tool_error(recording_input, monkeypatch):
+    def run(command, check):
+        raise subprocess.CalledProcessError(1, command)
+
+    monkeypatch.setattr(text_entry.subprocess, "run", run)
+
+    with pytest.raises(ToolError, match="xdotool failed"):
+        entry(recording_input, "chunked", xdotool=True).enter("hello")
+
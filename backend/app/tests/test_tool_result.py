@@ -0,0 +1,51 @@
+import base64
+
+from app.tools.base import EncodedImage, ToolResult
+
+PNG = b"\x89PNG\r\n\x1a\n" + bytes(range(256))
+
+
+def test_base64_is_built_on_first_access_only():
+    image = EncodedImage(PNG)
+
+    assert image._base64 is None
+    encoded = image.base64
+    assert encoded == base64.b64encode(PNG).decode()
+    assert image.base64 is encoded
+
+
+def test_encoding_releases_the_raw_bytes():
+    image = EncodedImage(PNG, "image/webp")
+    image.base64
+
+    assert image._data is None
+    assert image.data == PNG
+    assert len(image) == len(PNG)
+    assert image
+    assert repr(image) == f"EncodedImage(image/webp, {len(PNG)} bytes)"
+
+
+def test_memoryview_data():
+    image = EncodedImage(memoryview(PNG))
+
+    assert image.base64 == base64.b64encode(PNG).decode()
+    assert not EncodedImage(b"")
+
+
+def test_tool_result_exposes_the_image():
+    result = ToolResult(output="done", image=EncodedImage(PNG, "image/webp"))
+
+    assert result.media_type == "image/webp"
+    assert result.base64_image == base64.b64encode(PNG).decode()
+    assert ToolResult(output="done").base64_image is None
+
+
+def test_replace_and_combine_keep_the_same_image():
+    image = EncodedImage(PNG)
+    result = ToolResult(output="a", image=image)
+
+    assert result.replace(output="b").image is image
+    combined = result + ToolResult(output="b", pacing="default")
+    assert combined.image is image
+    assert combined.output == "ab"
+    assert combined.pacing == "default"
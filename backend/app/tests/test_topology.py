@@ -0,0 +1,127 @@
+import sys
+import types
+
+import pytest
+
+from app.tools import topology as topology_module
+from app.tools.base import ToolError
+from app.tools.topology import ScreenGeometry, ScreenTopology, get_topology, scale_target_for
+
+
+def geometry(*sizes):
+    screens, x = [], 0
+    for index, (width, height) in enumerate(sizes):
+        screens.append(ScreenGeometry(
+            index=index, x=x, y=0, width=width, height=height, is_primary=index == 0,
+            scale_target=scale_target_for(width, height),
+        ))
+        x += width
+    return screens
+
+
+@pytest.fixture
+def probed(monkeypatch):
+    """A fresh topology whose probes return `layout` and are counted; a watcher is 'running'."""
+    topology = ScreenTopology()
+    state = {"layout": geometry((1920, 1080)), "probes": 0}
+
+    def probe():
+        state["probes"] += 1
+        return list(state["layout"])
+
+    monkeypatch.setattr(topology, "_probe", probe)
+    monkeypatch.setattr(topology, "_start_watcher", lambda: setattr(topology, "_watching", True))
+    return topology, state
+
+
+def test_screens_are_probed_once_while_watched(probed):
+    topology, state = probed
+
+    topology.screens()
+    topology.screens()
+
+    assert state["probes"] == 1
+
+
+def test_invalidate_causes_a_reprobe(probed):
+    topology, state = probed
+    topology.screens()
+
+    topology.invalidate()
+    topology.screens()
+
+    assert state["probes"] == 2
+    # the layout did not change, so nothing needs to be forgotten
+    assert topology.generation == 1
+
+
+def test_a_new_layout_bumps_the_generation(probed):
+    topology, state = probed
+    topology.screens()
+
+    state["layout"] = geometry((1920, 1080), (2560, 1440))
+    topology.invalidate()
+
+    assert len(topology.screens()) == 2
+    assert topology.generation == 2
+
+
+def test_without_a_watcher_the_cache_expires(probed, monkeypatch):
+    topology, state = probed
+    monkeypatch.setattr(topology, "_start_watcher", lambda: None)
+    monkeypatch.setattr(topology_module, "REPROBE_INTERVAL", 0.0)
+
+    topology.screens()
+    topology.screens()
+
+    assert state["probes"] == 2
+
+
+def test_a_missing_screen_is_reprobed_once_then_rejected(probed):
+    topology, state = probed
+    topology.screens()
+
+    with pytest.raises(ToolError, match="Screen 3 does not exist"):
+        topology.screen(3)
+    assert state["probes"] == 2
+
+
+def test_randr_events_invalidate_and_a_dead_watcher_falls_back_to_expiry(probed, monkeypatch):
+    topology, state = probed
+    topology.screens()
+    events = iter([object()])
+
+    def next_event():
+        # one screen change notification, then the connection dies
+        return next(events)
+
+    connection = types.SimpleNamespace(
+        screen=lambda: types.SimpleNamespace(root=types.SimpleNamespace(xrandr_select_input=lambda mask: None)),
+        next_event=next_event,
+    )
+    randr = types.SimpleNamespace(RRScreenChangeNotifyMask=1, RRCrtcChangeNotifyMask=2, RROutputChangeNotifyMask=4)
+    display = types.SimpleNamespace(Display=lambda: connection)
+    monkeypatch.setitem(sys.modules, "Xlib", types.SimpleNamespace(display=display))
+    monkeypatch.setitem(sys.modules, "Xlib.display", display)
+    monkeypatch.setitem(sys.modules, "Xlib.ext", types.SimpleNamespace(randr=randr))
+    monkeypatch.setitem(sys.modules, "Xlib.ext.randr", randr)
+
+    topology._watch_randr()
+
+    assert not topology._watching
+    topology.screens()
+    assert state["probes"] == 2
+
+
+def test_computer_tool_forgets_the_old_layout(computer, monkeypatch):
+    computer.sync_call(action="screenshot")
+    assert computer._frame_transform is not None
+
+    topology = get_topology()
+    monkeypatch.setattr(topology, "_probe", lambda: geometry((1920, 1200)))
+    topology.invalidate()
+    computer.sync_call(action="cursor_position")
+
+    assert computer._frame_transform is None
+    assert computer._previous_frame is None
+    assert computer.width == 1920
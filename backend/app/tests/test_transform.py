@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+from PIL import Image
+
+from app.tools.transform import PADDING_COLOR, CoordinateTransform, get_frame_transform
+
+
+def test_exact_reduction_uses_a_whole_factor():
+    transform = get_frame_transform(2560, 1600, 1280, 800)
+
+    assert not transform.padded
+    assert transform.reduce_factor == 2
+    assert transform.apply(Image.new("RGB", (2560, 1600))).size == (1280, 800)
+
+
+def test_other_aspect_ratios_are_padded_right_and_bottom():
+    transform = get_frame_transform(1920, 1200, 1366, 768)
+
+    assert transform.padded
+    assert (transform.content_width, transform.content_height) == (1229, 768)
+    frame = transform.apply(Image.new("RGB", (1920, 1200), (0, 0, 0)))
+    assert frame.size == (1366, 768)
+    assert frame.getpixel((0, 0)) == (0, 0, 0)
+    assert frame.getpixel((1365, 0)) == PADDING_COLOR
+
+
+def test_without_padding_the_capture_is_stretched():
+    transform = get_frame_transform(1920, 1200, 1366, 768, pad=False)
+
+    assert not transform.padded
+    assert transform.apply(Image.new("RGB", (1920, 1200))).size == (1366, 768)
+
+
+@pytest.mark.parametrize("width, height", [(2560, 1600), (1920, 1080), (1920, 1200)])
+def test_api_screen_round_trip(width, height):
+    frame = get_frame_transform(width, height, 1280, 800)
+    transform = CoordinateTransform.for_frame(frame, offset_x=2560, offset_y=0)
+    points = np.array([[0, 0], [640, 400], [1279, 799], [17, 523]])
+
+    screen = transform.api_to_screen(points)
+
+    # one screen pixel is at most 1 / scale API pixels, so the round trip is exact up to rounding
+    assert np.all(np.abs(transform.screen_to_api(screen) - points) <= 1)
+    assert tuple(screen[0]) == (2560, 0)
+
+
+def test_single_points_map_to_tuples():
+    transform = CoordinateTransform(2560, 1600, offset_x=100, offset_y=50, scale_x=0.5, scale_y=0.5)
+
+    assert transform.api_to_screen((640, 400)) == (1380, 850)
+    assert transform.screen_to_api((1380, 850)) == (640, 400)
+    assert transform.convert((640, 400), "api", "local") == (1280, 800)
+
+
+def test_normalized_coordinates():
+    transform = CoordinateTransform(2560, 1600, offset_x=100, offset_y=50, scale_x=0.5, scale_y=0.5)
+
+    assert transform.normalized_to_screen((0.5, 0.5)) == (1380, 850)
+    assert transform.normalized_to_api((1.0, 1.0)) == (1280, 800)
+    assert transform.convert((1380, 850), "screen", "normalized") == pytest.approx((0.5, 0.5))
@@ -0,0 +1,80 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.tools.worker import DisplayWorker, get_display_worker
+
+
+@pytest.fixture
+def worker():
+    worker = DisplayWorker("test")
+    yield worker
+    worker.shutdown()
+
+
+def test_calls_run_in_submission_order_on_one_thread(worker):
+    calls = []
+
+    def record(index):
+        time.sleep(0.01 if index == 0 else 0)
+        calls.append((index, threading.current_thread().name))
+
+    futures = [worker.submit(record, index) for index in range(5)]
+    for future in futures:
+        future.result(timeout=5)
+
+    assert [index for index, _ in calls] == [0, 1, 2, 3, 4]
+    assert len({name for _, name in calls}) == 1
+    assert calls[0][1].startswith("display-test")
+
+
+def test_nested_calls_run_inline_instead_of_deadlocking(worker):
+    def outer():
+        return worker.call(threading.get_ident), threading.get_ident()
+
+    inner, outer_thread = worker.submit(outer).result(timeout=5)
+
+    assert inner == outer_thread != threading.get_ident()
+
+
+def test_run_keeps_the_event_loop_free(worker):
+    ticks = []
+
+    async def tick():
+        while True:
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.01)
+
+    async def main():
+        ticker = asyncio.ensure_future(tick())
+        result = await worker.run(lambda: time.sleep(0.1) or "done")
+        ticker.cancel()
+        return result
+
+    assert asyncio.run(main()) == "done"
+    # the loop kept ticking while the worker slept
+    assert len(ticks) >= 3
+
+
+def test_workers_are_shared_per_display():
+    assert get_display_worker(":7") is get_display_worker(":7")
+    assert get_display_worker(":7") is not get_display_worker(":8")
+
+
+def test_computer_tool_input_runs_on_the_display_worker(computer, recording_input, monkeypatch):
+    threads = []
+    click = recording_input.click
+
+    def recording_click(*args, **kwargs):
+        threads.append(threading.current_thread().name)
+        return click(*args, **kwargs)
+
+    monkeypatch.setattr(recording_input, "click", recording_click)
+    computer.sync_call(action="left_click")
+    asyncio.run(computer(action="left_click"))
+
+    assert len(threads) == 2
+    assert all(name.startswith("display-") for name in threads)
+    assert len(set(threads)) == 1
@@ -0,0 +1,61 @@
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+from app.tools.base import ToolError
+from app.tools.computer import MAX_ZOOM_EDGE, ComputerTool
+
+
+def size(result):
+    return Image.open(BytesIO(result.image.data)).size
+
+
+def test_region_is_shown_at_native_resolution(computer, fake_capture):
+    # the primary screen is scaled to half size, so the region covers twice as many screen pixels
+    result = computer.sync_call(action="zoom", region=[100, 50, 300, 150])
+
+    assert fake_capture.grabs[-1] == (200, 100, 600, 300)
+    assert size(result) == (400, 200)
+    assert result.output == "Region [100, 50, 300, 150] shown at native resolution (400x200 screen pixels)."
+    assert result.image_bbox == (100, 50, 300, 150)
+
+
+def test_region_on_a_secondary_screen_is_offset(screens, fake_capture, recording_input):
+    computer = ComputerTool(selected_screen=1, pacing="fast-headless", input_backend=recording_input)
+
+    computer.sync_call(action="zoom", region=[0, 0, 10, 10])
+
+    left, top, _, _ = fake_capture.grabs[-1]
+    assert (left, top) == (screens[1].x, screens[1].y)
+
+
+def test_region_is_clamped_to_the_screen(computer, fake_capture):
+    computer.sync_call(action="zoom", region=[1200, 700, 1400, 900])
+
+    assert fake_capture.grabs[-1] == (2400, 1400, 2560, 1600)
+
+
+def test_large_regions_are_downscaled(computer):
+    result = computer.sync_call(action="zoom", region=[0, 0, 1280, 800])
+
+    assert max(size(result)) == MAX_ZOOM_EDGE
+    assert "downscaled from 2560x1600 screen pixels" in result.output
+
+
+@pytest.mark.parametrize(
+    "kwargs, message",
+    [
+        ({"region": None}, "None must be a list of four ints [x0, y0, x1, y1]"),
+        ({"region": [0, 0, 10]}, "[0, 0, 10] must be a list of four ints [x0, y0, x1, y1]"),
+        ({"region": [10, 10, 5, 20]}, "region [10, 10, 5, 20] must have x0 < x1 and y0 < y1"),
+        ({"region": [1300, 0, 1400, 10]}, "region [1300, 0, 1400, 10] is outside the screen"),
+        ({"region": [0, 0, 10, 10], "text": "x"}, "text is not accepted for zoom"),
+    ],
+)
+def test_invalid_zoom_raises_tool_error(computer, fake_capture, kwargs, message):
+    with pytest.raises(ToolError) as error:
+        computer.sync_call(action="zoom", **kwargs)
+
+    assert error.value.message == message
+    assert fake_capture.grabs == []
@@ -0,0 +1,371 @@
+"""
+Pluggable screen capture backends.
+
+A backend is chosen once per process (`CUA_CAPTURE_BACKEND`, or the fastest one
+available) and shared by `screen_capture.get_screenshot` and `ComputerTool`.
+"""
+import ctypes
+import ctypes.util
+import os
+import platform
+import threading
+from abc import ABCMeta, abstractmethod
+from collections import OrderedDict, deque
+
+from PIL import Image, ImageGrab
+
+from .base import ToolError
+
+BBox = tuple[int, int, int, int]
+
+
+class CaptureBackend(metaclass=ABCMeta):
+    """Grabs a region of the virtual desktop as an RGB image."""
+
+    name: str
+
+    @abstractmethod
+    def grab(self, bbox: BBox) -> Image.Image:
+        """Capture `bbox` (left, top, right, bottom) in virtual desktop coordinates."""
+        ...
+
+    def close(self):
+        """Release any native resources held by the backend."""
+
+
+class ImageGrabBackend(CaptureBackend):
+    """PIL.ImageGrab; works on Windows, macOS and X11 but re-reads the screen through PIL each call."""
+
+    name = "imagegrab"
+
+    def grab(self, bbox: BBox) -> Image.Image:
+        return ImageGrab.grab(bbox=bbox, all_screens=True)
+
+
+class FakeCaptureBackend(CaptureBackend):
+    """In-memory backend for tests: replays queued frames, else returns a solid frame."""
+
+    name = "fake"
+
+    def __init__(self, frames: list[Image.Image] | None = None, color=(255, 255, 255)):
+        self.frames: deque[Image.Image] = deque(frames or [])
+        self.color = color
+        self.grabs: list[BBox] = []
+
+    def push(self, frame: Image.Image):
+        self.frames.append(frame)
+
+    def grab(self, bbox: BBox) -> Image.Image:
+        self.grabs.append(bbox)
+        left, top, right, bottom = bbox
+        if self.frames:
+            frame = self.frames.popleft() if len(self.frames) > 1 else self.frames[0]
+            if frame.size != (right - left, bottom - top):
+                frame = frame.crop(bbox)
+            return frame.convert("RGB")
+        return Image.new("RGB", (right - left, bottom - top), self.color)
+
+
+class _XShmSegmentInfo(ctypes.Structure):
+    _fields_ = [
+        ("shmseg", ctypes.c_ulong),
+        ("shmid", ctypes.c_int),
+        ("shmaddr", ctypes.c_void_p),
+        ("readOnly", ctypes.c_int),
+    ]
+
+
+class _XImage(ctypes.Structure):
+    _fields_ = [
+        ("width", ctypes.c_int),
+        ("height", ctypes.c_int),
+        ("xoffset", ctypes.c_int),
+        ("format", ctypes.c_int),
+        ("data", ctypes.c_void_p),
+        ("byte_order", ctypes.c_int),
+        ("bitmap_unit", ctypes.c_int),
+        ("bitmap_bit_order", ctypes.c_int),
+        ("bitmap_pad", ctypes.c_int),
+        ("depth", ctypes.c_int),
+        ("bytes_per_line", ctypes.c_int),
+        ("bits_per_pixel", ctypes.c_int),
+        ("red_mask", ctypes.c_ulong),
+        ("green_mask", ctypes.c_ulong),
+        ("blue_mask", ctypes.c_ulong),
+        ("obdata", ctypes.c_void_p),
+        # XDestroyImage is a macro over f.destroy_image; it is the first function pointer
+        ("destroy_image", ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_void_p)),
+        ("_funcs", ctypes.c_void_p * 5),
+    ]
+
+
+class _XErrorEvent(ctypes.Structure):
+    _fields_ = [
+        ("type", ctypes.c_int),
+        ("display", ctypes.c_void_p),
+        ("resourceid", ctypes.c_ulong),
+        ("serial", ctypes.c_ulong),
+        ("error_code", ctypes.c_ubyte),
+        ("request_code", ctypes.c_ubyte),
+        ("minor_code", ctypes.c_ubyte),
+    ]
+
+
+_XErrorHandler = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_void_p, ctypes.POINTER(_XErrorEvent))
+_x_errors = threading.local()
+
+
+@_XErrorHandler
+def _on_x_error(display, event):
+    # Xlib's default handler exits the process; remember the error for the failing call instead
+    _x_errors.last = (event.contents.error_code, event.contents.request_code, event.contents.minor_code)
+    return 0
+
+
+def install_x_error_handler(x11: ctypes.CDLL):
+    """Route X protocol errors of every libX11 connection in this process to `take_x_error`."""
+    x11.XSetErrorHandler.argtypes = [_XErrorHandler]
+    x11.XSetErrorHandler.restype = ctypes.c_void_p
+    x11.XSetErrorHandler(_on_x_error)
+
+
+def take_x_error() -> tuple[int, int, int] | None:
+    """(error_code, request_code, minor_code) of the last X error on this thread, and clear it."""
+    error = getattr(_x_errors, "last", None)
+    _x_errors.last = None
+    return error
+
+
+_ZPIXMAP = 2
+_ALL_PLANES = ctypes.c_ulong(-1).value
+_IPC_PRIVATE = 0
+_IPC_CREAT = 0o1000
+_IPC_RMID = 0
+
+# Shared-memory images kept at once (the selected screen, the whole desktop), and how often
+# a capture size must be seen before it gets one; one-off sizes such as zooms use XGetImage
+SHM_IMAGES = 2
+SHM_AFTER_GRABS = 2
+
+
+class X11Backend(CaptureBackend):
+    """Direct Xlib capture: XShmGetImage into a reused MIT-SHM segment, XGetImage when SHM is unavailable.
+
+    Keeps one display connection and shared-memory images for the capture sizes that
+    recur, so a screen grab is a single round trip with no per-call allocation on the
+    X server side. X errors (a stale bbox after a monitor was unplugged, MIT-SHM refused
+    on a remote display) become ToolError, or disable SHM, instead of exiting the process.
+    """
+
+    name = "x11"
+
+    def __init__(self, display: str | None = None):
+        x11 = ctypes.util.find_library("X11")
+        xext = ctypes.util.find_library("Xext")
+        if x11 is None:
+            raise RuntimeError("libX11 not found; the x11 capture backend is unavailable.")
+        self._x11 = ctypes.CDLL(x11)
+        self._xext = ctypes.CDLL(xext) if xext else None
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._declare()
+        install_x_error_handler(self._x11)
+
+        self._lock = threading.Lock()
+        self._display = self._x11.XOpenDisplay((display or os.environ.get("DISPLAY", "")).encode() or None)
+        if not self._display:
+            raise RuntimeError("Cannot open X display for the x11 capture backend.")
+        screen = self._x11.XDefaultScreen(self._display)
+        self._root = self._x11.XDefaultRootWindow(self._display)
+        self._visual = self._x11.XDefaultVisual(self._display, screen)
+        self._depth = self._x11.XDefaultDepth(self._display, screen)
+        self.use_shm = bool(self._xext and self._xext.XShmQueryExtension(self._display))
+        # (width, height) -> (XImage*, XShmSegmentInfo), least recently used first
+        self._shm_images: OrderedDict[tuple[int, int], tuple[ctypes.POINTER(_XImage), _XShmSegmentInfo]] = (
+            OrderedDict()
+        )
+        # recently grabbed sizes without an SHM image -> times seen
+        self._sizes_seen: OrderedDict[tuple[int, int], int] = OrderedDict()
+
+    def _declare(self):
+        x11, libc = self._x11, self._libc
+        x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        x11.XOpenDisplay.restype = ctypes.c_void_p
+        x11.XCloseDisplay.argtypes = [ctypes.c_void_p]
+        x11.XDefaultScreen.argtypes = [ctypes.c_void_p]
+        x11.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+        x11.XDefaultRootWindow.restype = ctypes.c_ulong
+        x11.XDefaultVisual.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XDefaultVisual.restype = ctypes.c_void_p
+        x11.XDefaultDepth.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XGetImage.argtypes = [
+            ctypes.c_void_p, ctypes.c_ulong, ctypes.c_int, ctypes.c_int,
+            ctypes.c_uint, ctypes.c_uint, ctypes.c_ulong, ctypes.c_int,
+        ]
+        x11.XGetImage.restype = ctypes.POINTER(_XImage)
+        x11.XSync.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        if self._xext:
+            xext = self._xext
+            xext.XShmQueryExtension.argtypes = [ctypes.c_void_p]
+            xext.XShmCreateImage.argtypes = [
+                ctypes.c_void_p, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int,
+                ctypes.c_void_p, ctypes.POINTER(_XShmSegmentInfo), ctypes.c_uint, ctypes.c_uint,
+            ]
+            xext.XShmCreateImage.restype = ctypes.POINTER(_XImage)
+            xext.XShmAttach.argtypes = [ctypes.c_void_p, ctypes.POINTER(_XShmSegmentInfo)]
+            xext.XShmDetach.argtypes = [ctypes.c_void_p, ctypes.POINTER(_XShmSegmentInfo)]
+            xext.XShmGetImage.argtypes = [
+                ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(_XImage),
+                ctypes.c_int, ctypes.c_int, ctypes.c_ulong,
+            ]
+        libc.shmget.argtypes = [ctypes.c_int, ctypes.c_size_t, ctypes.c_int]
+        libc.shmat.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_int]
+        libc.shmat.restype = ctypes.c_void_p
+        libc.shmdt.argtypes = [ctypes.c_void_p]
+        libc.shmctl.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_void_p]
+
+    def grab(self, bbox: BBox) -> Image.Image:
+        left, top, right, bottom = bbox
+        width, height = right - left, bottom - top
+        with self._lock:
+            take_x_error()
+            ximage = self._shm_image(width, height) if self.use_shm else None
+            if ximage is not None:
+                ok = self._xext.XShmGetImage(self._display, self._root, ximage, left, top, _ALL_PLANES)
+                error = take_x_error()
+                if ok and error is None:
+                    return self._to_pil(ximage.contents, width, height)
+                # retry without SHM; a bad bbox fails there too and is reported below
+                self._drop_shm_image((width, height))
+
+            ximage = self._x11.XGetImage(
+                self._display, self._root, left, top, width, height, _ALL_PLANES, _ZPIXMAP
+            )
+            error = take_x_error()
+            if not ximage or error is not None:
+                raise ToolError(f"Capturing {bbox} failed with X error {error}; the screen layout may have changed")
+            try:
+                return self._to_pil(ximage.contents, width, height)
+            finally:
+                ximage.contents.destroy_image(ctypes.cast(ximage, ctypes.c_void_p))
+
+    def _shm_image(self, width: int, height: int):
+        """The SHM image for this size, or None while the size is not (yet) worth one."""
+        size = (width, height)
+        cached = self._shm_images.get(size)
+        if cached is not None:
+            self._shm_images.move_to_end(size)
+            return cached[0]
+        seen = self._sizes_seen.pop(size, 0) + 1
+        if seen < SHM_AFTER_GRABS:
+            self._sizes_seen[size] = seen
+            while len(self._sizes_seen) > 16:
+                self._sizes_seen.popitem(last=False)
+            return None
+        while len(self._shm_images) >= SHM_IMAGES:
+            self._drop_shm_image(next(iter(self._shm_images)))
+
+        shminfo = _XShmSegmentInfo()
+        ximage = self._xext.XShmCreateImage(
+            self._display, self._visual, self._depth, _ZPIXMAP, None, ctypes.byref(shminfo), width, height
+        )
+        if not ximage:
+            raise RuntimeError("XShmCreateImage failed")
+        nbytes = ximage.contents.bytes_per_line * height
+        shminfo.shmid = self._libc.shmget(_IPC_PRIVATE, nbytes, _IPC_CREAT | 0o600)
+        if shminfo.shmid < 0:
+            print(f"shmget failed ({os.strerror(ctypes.get_errno())}), capturing with XGetImage")
+            self.use_shm = False
+            ximage.contents.destroy_image(ctypes.cast(ximage, ctypes.c_void_p))
+            return None
+        shminfo.shmaddr = self._libc.shmat(shminfo.shmid, None, 0)
+        ximage.contents.data = shminfo.shmaddr
+        shminfo.readOnly = 0
+        self._xext.XShmAttach(self._display, ctypes.byref(shminfo))
+        self._x11.XSync(self._display, 0)
+        # mark for removal now; the segment is freed once both sides have detached
+        self._libc.shmctl(shminfo.shmid, _IPC_RMID, None)
+        error = take_x_error()
+        if error is not None:
+            # typically BadAccess: the X server cannot map our memory (remote DISPLAY)
+            print(f"MIT-SHM attach failed with X error {error}, capturing with XGetImage")
+            self.use_shm = False
+            self._free_shm_image(ximage, shminfo, attached=False)
+            return None
+        self._shm_images[size] = (ximage, shminfo)
+        return ximage
+
+    def _drop_shm_image(self, size: tuple[int, int]):
+        entry = self._shm_images.pop(size, None)
+        if entry is not None:
+            self._free_shm_image(*entry)
+
+    def _free_shm_image(self, ximage, shminfo: _XShmSegmentInfo, attached: bool = True):
+        if attached:
+            self._xext.XShmDetach(self._display, ctypes.byref(shminfo))
+            self._x11.XSync(self._display, 0)
+            take_x_error()
+        self._libc.shmdt(shminfo.shmaddr)
+        ximage.contents.data = None
+        ximage.contents.destroy_image(ctypes.cast(ximage, ctypes.c_void_p))
+
+    @staticmethod
+    def _to_pil(ximage: _XImage, width: int, height: int) -> Image.Image:
+        if ximage.bits_per_pixel != 32:
+            raise RuntimeError(f"Unsupported X visual: {ximage.bits_per_pixel} bits per pixel")
+        raw = ctypes.string_at(ximage.data, ximage.bytes_per_line * height)
+        return Image.frombuffer("RGB", (width, height), raw, "raw", "BGRX", ximage.bytes_per_line, 1)
+
+    def close(self):
+        with self._lock:
+            while self._shm_images:
+                self._drop_shm_image(next(iter(self._shm_images)))
+            if self._display:
+                self._x11.XCloseDisplay(self._display)
+                self._display = None
+
+
+CAPTURE_BACKENDS: dict[str, type[CaptureBackend]] = {
+    ImageGrabBackend.name: ImageGrabBackend,
+    X11Backend.name: X11Backend,
+    FakeCaptureBackend.name: FakeCaptureBackend,
+}
+
+_backend: CaptureBackend | None = None
+_backend_lock = threading.Lock()
+
+
+def create_capture_backend(name: str | None = None) -> CaptureBackend:
+    """Instantiate the named backend, or the fastest one that works on this host."""
+    name = name or os.environ.get("CUA_CAPTURE_BACKEND")
+    if name:
+        if name not in CAPTURE_BACKENDS:
+            raise ValueError(f"Unknown capture backend {name!r}, expected one of {list(CAPTURE_BACKENDS)}")
+        return CAPTURE_BACKENDS[name]()
+    if platform.system() == "Linux" and os.environ.get("DISPLAY"):
+        try:
+            return X11Backend()
+        except Exception as e:
+            print(f"x11 capture backend unavailable, falling back to ImageGrab: {e}")
+    return ImageGrabBackend()
+
+
+def get_capture_backend() -> CaptureBackend:
+    """Return the process-wide capture backend, choosing it on first use."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_capture_backend()
+    return _backend
+
+
+def set_capture_backend(backend: CaptureBackend | str) -> CaptureBackend:
+    """Replace the process-wide capture backend (e.g. with a FakeCaptureBackend in tests)."""
+    global _backend
+    with _backend_lock:
+        if isinstance(backend, str):
+            backend = create_capture_backend(backend)
+        if _backend is not None and _backend is not backend:
+            _backend.close()
+        _backend = backend
+    return backend
@@ -0,0 +1,56 @@
+"""
+Screenshot codecs.
+
+Each codec knows how to encode a PIL image and which `media_type` the API needs for
+the result. The named codecs form a quality ladder from lossless PNG down to JPEG.
+"""
+from dataclasses import dataclass, field
+from io import BytesIO
+from typing import Any
+
+from PIL import Image
+
+
+@dataclass(frozen=True)
+class ImageCodec:
+    """An image encoding setting: PIL format plus save options."""
+
+    name: str
+    format: str
+    media_type: str
+    extension: str
+    options: dict[str, Any] = field(default_factory=dict)
+    palette: bool = False
+
+    def encode(self, image: Image.Image) -> bytes:
+        if self.palette:
+            # screenshots rarely use more than 256 colours; fast octree keeps quantizing cheap
+            image = image.quantize(colors=256, method=Image.Quantize.FASTOCTREE)
+        elif self.format == "JPEG" and image.mode != "RGB":
+            image = image.convert("RGB")
+        buffer = BytesIO()
+        image.save(buffer, format=self.format, **self.options)
+        return buffer.getvalue()
+
+
+CODECS: dict[str, ImageCodec] = {
+    # PIL defaults (zlib level 6); the historical behaviour
+    "png": ImageCodec("png", "PNG", "image/png", "png"),
+    "png-fast": ImageCodec("png-fast", "PNG", "image/png", "png", {"compress_level": 1}),
+    "png-palette": ImageCodec("png-palette", "PNG", "image/png", "png", {"compress_level": 6}, palette=True),
+    "webp-lossless": ImageCodec("webp-lossless", "WEBP", "image/webp", "webp", {"lossless": True, "method": 2}),
+    "webp": ImageCodec("webp", "WEBP", "image/webp", "webp", {"quality": 85, "method": 4}),
+    "jpeg": ImageCodec("jpeg", "JPEG", "image/jpeg", "jpg", {"quality": 85}),
+    "jpeg-low": ImageCodec("jpeg-low", "JPEG", "image/jpeg", "jpg", {"quality": 60}),
+}
+
+DEFAULT_CODEC = "png"
+
+
+def get_codec(codec: str | ImageCodec) -> ImageCodec:
+    """Resolve a codec name (or pass a custom ImageCodec through)."""
+    if isinstance(codec, ImageCodec):
+        return codec
+    if codec not in CODECS:
+        raise ValueError(f"Unknown codec {codec!r}, expected one of {list(CODECS)}")
+    return CODECS[codec]
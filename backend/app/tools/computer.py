@@ -1,30 +1,34 @@
-import subprocess
-import platform
-import pyautogui
-import asyncio
-import base64
-import os
+import math
 import time
-if platform.system() == "Darwin":
-    import Quartz  # uncomment this line if you are on macOS
+from collections.abc import Callable
 from enum import StrEnum
-from pathlib import Path
 from typing import Literal, TypedDict
 from uuid import uuid4
-from screeninfo import get_monitors
 
-from PIL import ImageGrab, Image
-from functools import partial
+from PIL import Image
 
 from anthropic.types.beta import BetaToolComputerUse20241022Param
 
-from .base import BaseAnthropicTool, ToolError, ToolResult
+from .archive import get_archive
+from .base import BaseAnthropicTool, EncodedImage, ScreenImage, ToolError, ToolResult
+from .capture import get_capture_backend
+from .codec import DEFAULT_CODEC, ImageCodec, get_codec
+from .dirty import changed_bands, changed_bbox
+from .frame_buffer import get_capture_ring
+from .input_backend import InputBackend, create_input_backend
+from .multi_screen import encode_screens, grab_desktop
+from .ocr import TextBox, merge_bands, ocr_available, reading_order, recognize
+from .pacing import DEFAULT_PACING, PacingProfile, get_pacing
+from .phash import SAME_SCREEN_DISTANCE, dhash, format_hash, get_phash_index, hamming
+from .resolution import ResolutionPolicy
 from .run import run
-
-OUTPUT_DIR = "./tmp/outputs"
-
-TYPING_DELAY_MS = 12
-TYPING_GROUP_SIZE = 50
+from .settle import SettleResult, wait_until_settled
+from .text_entry import TextEntry
+# re-exported: these used to be defined in this module
+from .text_entry import TYPING_DELAY_MS, TYPING_GROUP_SIZE, chunks  # noqa: F401
+from .topology import Resolution, ScreenGeometry, get_topology
+from .transform import CoordinateTransform, FrameTransform, get_coordinate_transform, get_frame_transform
+from .worker import get_display_worker
 
 Action = Literal[
     "key",
@@ -37,19 +41,29 @@ Action = Literal[
     "double_click",
     "screenshot",
     "cursor_position",
+    "zoom",
+    "scroll",
+    "left_press",
+    "batch",
 ]
 
+Observation = Literal["image", "text"]
 
-class Resolution(TypedDict):
-    width: int
-    height: int
+# Actions allowed inside a batch, and limits on what one batch may do
+BATCH_ACTIONS = (
+    "mouse_move", "left_click", "right_click", "middle_click", "double_click",
+    "left_click_drag", "key", "type", "scroll",
+)
+MAX_BATCH_ACTIONS = 50
+MAX_BATCH_WAIT = 5.0
+# Arguments a batch step may carry besides action, text, coordinate and wait
+BATCH_STEP_OPTIONS = {"scroll": ("scroll_direction", "scroll_amount")}
 
+# Actions that can wait for the UI to react and return the settled screenshot (`wait_for_change`)
+WAIT_FOR_CHANGE_ACTIONS = ("left_click", "right_click", "middle_click", "double_click", "key", "type")
 
-MAX_SCALING_TARGETS: dict[str, Resolution] = {
-    "XGA": Resolution(width=1024, height=768),  # 4:3
-    "WXGA": Resolution(width=1280, height=800),  # 16:10
-    "FWXGA": Resolution(width=1366, height=768),  # ~16:9
-}
+# Longest edge of a zoomed region before it is downscaled (larger images are resized by the API anyway)
+MAX_ZOOM_EDGE = 1568
 
 
 class ScalingSource(StrEnum):
@@ -63,16 +77,63 @@ class ComputerToolOptions(TypedDict):
     display_number: int | None
 
 
-def chunks(s: str, chunk_size: int) -> list[str]:
-    return [s[i : i + chunk_size] for i in range(0, len(s), chunk_size)]
+# (button, clicks) per click action (left_press is handled separately)
+_CLICKS = {
+    "left_click": ("left", 1),
+    "right_click": ("right", 1),
+    "middle_click": ("middle", 1),
+    "double_click": ("left", 2),
+}
+
+Rule = Literal["required", "optional", "forbidden"]
+
+
+def _compile_validator(text: Rule, coordinate: Rule) -> Callable[[str, object, object], None]:
+    """Build the argument check for an action once, from which of text/coordinate it takes."""
+
+    def validate(action: str, text_value, coordinate_value):
+        if text == "required" and text_value is None:
+            raise ToolError(f"text is required for {action}")
+        if text == "forbidden" and text_value is not None:
+            raise ToolError(f"text is not accepted for {action}")
+        if text_value is not None and not isinstance(text_value, str):
+            raise ToolError(f"{text_value} must be a string")
+        if coordinate == "required" and coordinate_value is None:
+            raise ToolError(f"coordinate is required for {action}")
+        if coordinate == "forbidden" and coordinate_value is not None:
+            raise ToolError(f"coordinate is not accepted for {action}")
+        if coordinate_value is not None:
+            if not isinstance(coordinate_value, (list, tuple)) or len(coordinate_value) != 2:
+                raise ToolError(f"{coordinate_value} must be a tuple of length 2")
+            if not all(isinstance(i, int) for i in coordinate_value):
+                raise ToolError(f"{coordinate_value} must be a tuple of ints")
+
+    return validate
+
+
+# action -> (argument validator, handler method name); handlers are bound once per tool
+ACTIONS: dict[str, tuple[Callable[[str, object, object], None], str]] = {
+    "mouse_move": (_compile_validator(text="forbidden", coordinate="required"), "_move"),
+    "left_click_drag": (_compile_validator(text="forbidden", coordinate="required"), "_drag"),
+    "key": (_compile_validator(text="required", coordinate="forbidden"), "_key"),
+    "type": (_compile_validator(text="required", coordinate="forbidden"), "_type"),
+    "scroll": (_compile_validator(text="forbidden", coordinate="optional"), "_scroll"),
+    **{
+        click: (_compile_validator(text="forbidden", coordinate="optional"), "_click")
+        for click in (*_CLICKS, "left_press")
+    },
+    "screenshot": (_compile_validator(text="forbidden", coordinate="optional"), "_screenshot_action"),
+    "cursor_position": (_compile_validator(text="forbidden", coordinate="optional"), "_cursor_position"),
+    "zoom": (_compile_validator(text="forbidden", coordinate="optional"), "_zoom_action"),
+    "batch": (_compile_validator(text="forbidden", coordinate="forbidden"), "_batch"),
+}
 
 
 def get_screen_details():
-    screens = get_monitors()
     screen_details = []
 
-    # Sort screens by x position to arrange from left to right
-    sorted_screens = sorted(screens, key=lambda s: s.x)
+    # The topology service already sorts screens from left to right
+    sorted_screens = get_topology().screens()
 
     # Loop through sorted screens and assign positions
     primary_index = 0
@@ -98,13 +159,11 @@ def get_screen_details():
 class ComputerTool(BaseAnthropicTool):
     """
     A tool that allows the agent to interact with the screen, keyboard, and mouse of the current computer.
-    Adapted for Windows using 'pyautogui'.
+    Input goes through a pluggable backend (pyautogui, X11 XTest, or a recording fake).
     """
 
     name: Literal["computer"] = "computer"
     api_type: Literal["computer_20241022"] = "computer_20241022"
-    width: int
-    height: int
     display_num: int | None
 
     _screenshot_delay = 2.0
@@ -112,9 +171,13 @@ class ComputerTool(BaseAnthropicTool):
 
     @property
     def options(self) -> ComputerToolOptions:
-        width, height = self.scale_coordinates(
-            ScalingSource.COMPUTER, self.width, self.height
-        )
+        if self._scaling_enabled:
+            # the API frame, including any padding added to reach the target aspect ratio; this stays
+            # the scaling target even under a resolution policy so the tool definition (and cache) is stable
+            transform = self._transform_for(self.screen)
+            width, height = transform.target_width, transform.target_height
+        else:
+            width, height = self.width, self.height
         return {
             "display_width_px": width,
             "display_height_px": height,
@@ -124,17 +187,92 @@ class ComputerTool(BaseAnthropicTool):
     def to_params(self) -> BetaToolComputerUse20241022Param:
         return {"name": self.name, "type": self.api_type, **self.options}
 
-    def __init__(self, selected_screen: int = 0, is_scaling: bool = True):
+    def __init__(
+        self,
+        selected_screen: int = 0,
+        is_scaling: bool = True,
+        archive_screenshots: bool = False,
+        capture_buffer: bool = False,
+        settle_timeout: float = 1.0,
+        wait_for_change: bool = False,
+        change_timeout: float = 3.0,
+        dirty_crops: bool = False,
+        full_frame_every: int = 5,
+        codec: str | ImageCodec = DEFAULT_CODEC,
+        resample: Image.Resampling = Image.Resampling.BICUBIC,
+        session_id: str | None = None,
+        all_screens: bool = False,
+        resolution_policy: ResolutionPolicy | None = None,
+        observation: Observation = "image",
+        text_entry: str = "auto",
+        paste_shortcut: str | None = None,
+        pacing: str | PacingProfile = DEFAULT_PACING,
+        input_backend: str | InputBackend | None = None,
+    ):
         super().__init__()
 
-        # Get screen width and height using Windows command
         self.display_num = None
-        self.offset_x = 0
-        self.offset_y = 0
         self.selected_screen = selected_screen   
         self.is_scaling = is_scaling
-        self.width, self.height = self.get_screen_size()  
-        self.width, self.height = int(self.width), int(self.height)
+        self.archive_screenshots = archive_screenshots
+        # Archived screenshots are indexed by (session_id, step)
+        self.session_id = session_id or uuid4().hex
+        self._step = 0
+        self.codec = get_codec(codec)
+        self.resample = resample
+        # Capture every monitor per screenshot instead of only the selected one
+        self.all_screens = all_screens
+        # Ceiling for adaptive settle waits (replaces the old fixed one-second sleeps)
+        self.settle_timeout = settle_timeout
+        # Default for `wait_for_change` on clicks, keys and typing, and how long such a wait may take
+        self.wait_for_change = wait_for_change
+        self.change_timeout = change_timeout
+        # Picks the API frame size per screenshot from a token budget; None keeps the fixed scaling targets
+        self.resolution_policy = resolution_policy
+        # transform of the last screenshot sent, which the model's coordinates refer to
+        self._frame_transform: FrameTransform | None = None
+        # Input and capture for this display are serialized on one worker thread shared by its tools
+        self._worker = get_display_worker()
+        # Validate the screen index up front; geometry is served by the shared topology cache
+        self.screen
+        # topology generation the per-screen state below belongs to (see _forget_stale_screen)
+        self._topology_generation = get_topology().generation
+
+        # Optional background capture thread keeping the latest frames of this screen
+        self._capture_ring = get_capture_ring(selected_screen, self._grab) if capture_buffer else None
+
+        # Dirty-region crops: send only what changed since the previous frame, with a full
+        # frame every `full_frame_every` screenshots so the model's picture cannot drift
+        self.dirty_crops = dirty_crops
+        self.full_frame_every = full_frame_every
+        self._previous_frame: Image.Image | None = None
+        self._frames_since_full = 0
+
+        # "text" screenshots return OCR'd text lines with API-space boxes instead of an image;
+        # after the first one, only horizontal bands that changed are read again
+        if observation not in ("image", "text"):
+            raise ValueError(f"Unknown observation {observation!r}, expected 'image' or 'text'")
+        self.observation = observation
+        self._ocr_frame: Image.Image | None = None
+        self._ocr_boxes: list[TextBox] = []
+
+        # Every API frame is fingerprinted into the process-wide perceptual-hash index;
+        # `last_match` is the closest earlier frame as ((session_id, step), distance), if any
+        self.phash_index = get_phash_index()
+        self.last_frame_hash: int | None = None
+        self._previous_frame_hash: int | None = None
+        self.last_match: tuple[tuple[str, int], int] | None = None
+
+        # Mouse and keyboard backend, chosen once: pyautogui (default), xtest or recording
+        self.input = create_input_backend(input_backend)
+
+        # Input delays (pause after each input call, drag, press hold, typing); a request may pick another profile
+        self.pacing = get_pacing(pacing)
+        self._pacing = self.pacing
+
+        # How the type action enters text: typewrite, chunked, paste, or auto (by length and characters);
+        # `paste_shortcut` overrides ctrl+v / command+v, e.g. "ctrl+shift+v" when typing into terminals
+        self.text_entry = TextEntry(self.input, text_entry, paste_shortcut=paste_shortcut)
 
         # Path to cliclick
         self.cliclick = "cliclick"
@@ -144,532 +282,602 @@ class ComputerTool(BaseAnthropicTool):
                                "super": "command",
                                "escape": "esc"}
         
-        self.action_conversion = {"left click": "click",
+        self.action_conversion = {"left click": "left_click",
                                   "right click": "right_click"}
-        
-        system = platform.system()        # Detect platform
-        if system == "Windows":
-            screens = get_monitors()
-            sorted_screens = sorted(screens, key=lambda s: s.x)
-            if self.selected_screen < 0 or self.selected_screen >= len(screens):
-                raise IndexError("Invalid screen index.")
-            screen = sorted_screens[self.selected_screen]
-            bbox = (screen.x, screen.y, screen.x + screen.width, screen.y + screen.height)
-
-        elif system == "Darwin":  # macOS
-            max_displays = 32  # Maximum number of displays to handle
-            active_displays = Quartz.CGGetActiveDisplayList(max_displays, None, None)[1]
-            screens = []
-            for display_id in active_displays:
-                bounds = Quartz.CGDisplayBounds(display_id)
-                screens.append({
-                    'id': display_id, 'x': int(bounds.origin.x), 'y': int(bounds.origin.y),
-                    'width': int(bounds.size.width), 'height': int(bounds.size.height),
-                    'is_primary': Quartz.CGDisplayIsMain(display_id)  # Check if this is the primary display
-                })
-            sorted_screens = sorted(screens, key=lambda s: s['x'])
-            if self.selected_screen < 0 or self.selected_screen >= len(screens):
-                raise IndexError("Invalid screen index.")
-            screen = sorted_screens[self.selected_screen]
-            bbox = (screen['x'], screen['y'], screen['x'] + screen['width'], screen['y'] + screen['height'])
-        else:  # Linux or other OS
-            cmd = "xrandr | grep ' primary' | awk '{print $4}'"
-            try:
-                output = subprocess.check_output(cmd, shell=True).decode()
-                resolution = output.strip().split()[0]
-                width, height = map(int, resolution.split('x'))
-                bbox = (0, 0, width, height)  # Assuming single primary screen for simplicity
-            except subprocess.CalledProcessError:
-                raise RuntimeError("Failed to get screen resolution on Linux.")
-            
-        self.offset_x = screen['x'] if system == "Darwin" else screen.x
-        self.offset_y = screen['y'] if system == "Darwin" else screen.y
-        self.bbox = bbox
-        
 
-    async def __call__(
+        # dispatch table with handlers bound to this tool
+        self._actions = {
+            action: (validate, getattr(self, handler)) for action, (validate, handler) in ACTIONS.items()
+        }
+
+    @property
+    def screen(self) -> ScreenGeometry:
+        """Geometry of the selected screen, re-probed only after a display change."""
+        return get_topology().screen(self.selected_screen)
+
+    @property
+    def width(self) -> int:
+        return self.screen.width
+
+    @property
+    def height(self) -> int:
+        return self.screen.height
+
+    @property
+    def offset_x(self) -> int:
+        return self.screen.x
+
+    @property
+    def offset_y(self) -> int:
+        return self.screen.y
+
+    @property
+    def bbox(self) -> tuple[int, int, int, int]:
+        return self.screen.bbox
+
+    @property
+    def target_dimension(self) -> Resolution:
+        return self.screen.scale_target
+
+    @property
+    def frame_transform(self) -> FrameTransform:
+        """Capture-to-API geometry of the last screenshot, or the screen's default if none was taken
+        at the current screen size."""
+        screen = self.screen
+        transform = self._frame_transform
+        if transform is not None and (transform.source_width, transform.source_height) == (screen.width, screen.height):
+            return transform
+        return self._transform_for(screen)
+
+    @property
+    def coordinate_transform(self) -> CoordinateTransform:
+        """Point maps between the last frame's API space, the screen and normalized coordinates."""
+        screen = self.screen
+        if self.is_scaling and self._scaling_enabled:
+            transform = self.frame_transform
+        else:
+            transform = get_frame_transform(screen.width, screen.height, screen.width, screen.height)
+        return get_coordinate_transform(transform, screen.x, screen.y)
+
+    def _transform_for(self, screen: ScreenGeometry, target: Resolution | None = None) -> FrameTransform:
+        target = target or screen.scale_target
+        return get_frame_transform(screen.width, screen.height, target["width"], target["height"], self.resample)
+
+    def _choose_transform(self, image: Image.Image) -> FrameTransform:
+        """Transform for the next screenshot: the scaling target, or what the resolution policy allows."""
+        screen = self.screen
+        if self.resolution_policy is None or not self.is_scaling:
+            return self._transform_for(screen)
+        return self._transform_for(screen, self.resolution_policy.choose(screen.scale_target, image))
+
+    async def __call__(self, *, action: Action, **kwargs):
+        # blocking input and capture run on the display's worker thread; the event loop stays free
+        return await self._worker.run(self._run_action, action, **kwargs)
+
+    def sync_call(self, *, action: Action, **kwargs):
+        # same worker as the async path, so sync and async callers never interleave input
+        return self._worker.call(self._run_action, action, **kwargs)
+
+    def _mark_input(self, action: str):
+        """Send queued input, then tell the capture ring that earlier frames no longer show the screen state."""
+        self.input.flush()
+        if self._capture_ring is not None and action not in ("screenshot", "cursor_position", "zoom"):
+            self._capture_ring.mark_input()
+
+    def _forget_stale_screen(self):
+        """Drop state tied to the old monitor layout once the topology has re-probed a new one."""
+        # looking the screen up re-probes an invalidated or expired topology
+        self.screen
+        generation = get_topology().generation
+        if generation == self._topology_generation:
+            return
+        self._topology_generation = generation
+        self._frame_transform = None
+        self._previous_frame = None
+        self._frames_since_full = 0
+        self._ocr_frame, self._ocr_boxes = None, []
+
+    def _run_action(
         self,
-        *,
         action: Action,
         text: str | None = None,
         coordinate: tuple[int, int] | None = None,
-        scroll_direction: Literal["up", "down", "left", "right"] = "down",
-        scroll_amount: int = 10,
         **kwargs,
-    ):  
+    ) -> ToolResult:
+        """Validate and run one action through the dispatch table (shared by the sync and async paths)."""
         print(f"action: {action}, text: {text}, coordinate: {coordinate}")
         action = self.action_conversion.get(action, action)
-        
-        if action in ("mouse_move", "left_click_drag"):
-            if coordinate is None:
-                raise ToolError(f"coordinate is required for {action}")
-            if text is not None:
-                raise ToolError(f"text is not accepted for {action}")
-            if not isinstance(coordinate, (list, tuple)) or len(coordinate) != 2:
-                raise ToolError(f"{coordinate} must be a tuple of length 2")
-            # if not all(isinstance(i, int) and i >= 0 for i in coordinate):
-            if not all(isinstance(i, int) for i in coordinate):
-                raise ToolError(f"{coordinate} must be a tuple of non-negative ints")
-            
-            if self.is_scaling:
-                x, y = self.scale_coordinates(
-                    ScalingSource.API, coordinate[0], coordinate[1]
-                )
-            else:
-                x, y = coordinate
-
-            # print(f"scaled_coordinates: {x}, {y}")
-            # print(f"offset: {self.offset_x}, {self.offset_y}")
-            
-            x += self.offset_x
-            y += self.offset_y
-
-            print(f"mouse move to {x}, {y}")
-            
-            if action == "mouse_move":
-                pyautogui.moveTo(x, y)
-                return ToolResult(output=f"Moved mouse to ({x}, {y})")
-            elif action == "left_click_drag":
-                current_x, current_y = pyautogui.position()
-                pyautogui.dragTo(x, y, duration=0.5)  # Adjust duration as needed
-                return ToolResult(output=f"Dragged mouse from ({current_x}, {current_y}) to ({x}, {y})")
-
-        if action in ("key", "type"):
-            if text is None:
-                raise ToolError(f"text is required for {action}")
-            if coordinate is not None:
-                raise ToolError(f"coordinate is not accepted for {action}")
-            if not isinstance(text, str):
-                raise ToolError(output=f"{text} must be a string")
-
-            if action == "key":
-                # Handle key combinations
-                keys = text.split('+')
-                for key in keys:
-                    key = key.strip().lower()
-                    key = self.key_conversion.get(key, key)
-                    pyautogui.keyDown(key)  # Press down each key
-                for key in reversed(keys):
-                    key = key.strip().lower()
-                    key = self.key_conversion.get(key, key)
-                    pyautogui.keyUp(key)    # Release each key in reverse order
-                return ToolResult(output=f"Pressed keys: {text}")
-            
-            elif action == "type":
-                pyautogui.typewrite(text, interval=TYPING_DELAY_MS / 1000)  # Convert ms to seconds
-                screenshot_base64 = (await self.screenshot()).base64_image
-                return ToolResult(output=text, base64_image=screenshot_base64)
-           
-        # minimum modification to avoid disrupting the original flow, will be optimized later
-        # for support of Claude 3.7 Computer Use API
-        if action in ("scroll"):
-            if coordinate is None:
-                if scroll_direction in ("up", "down"):
-                    pyautogui.scroll(scroll_amount if scroll_direction == "up" else -scroll_amount)
-                elif scroll_direction in ("left", "right"):
-                    pyautogui.hscroll(scroll_amount if scroll_direction == "right" else -scroll_amount)
-                return ToolResult(output=f"Scrolled {scroll_direction}")
-            else:
-                if self.is_scaling:
-                    x, y = self.scale_coordinates(
-                        ScalingSource.API, coordinate[0], coordinate[1]
-                    )
-                else:
-                    x, y = coordinate
-
-                # print(f"scaled_coordinates: {x}, {y}")
-                # print(f"offset: {self.offset_x}, {self.offset_y}")
-                
-                if scroll_direction in ("up", "down"):
-                    pyautogui.scroll(scroll_amount if scroll_direction == "up" else -scroll_amount, x, y)
-                elif scroll_direction in ("left", "right"):
-                    pyautogui.hscroll(scroll_amount if scroll_direction == "right" else -scroll_amount, x, y)
-                return ToolResult(output=f"Scrolled {scroll_direction} at {x}, {y}")
-            
-        if action in ("left_click", "right_click", "double_click", "middle_click", "left_press"):
-            if coordinate is not None:
-                if self.is_scaling:
-                    x, y = self.scale_coordinates(
-                        ScalingSource.API, coordinate[0], coordinate[1]
-                    )
-                else:
-                    x, y = coordinate
-
-                # print(f"scaled_coordinates: {x}, {y}")
-                # print(f"offset: {self.offset_x}, {self.offset_y}")
-                
-                x += self.offset_x
-                y += self.offset_y
-
-                if action == "left_click":
-                    pyautogui.click(x, y)
-                elif action == "right_click":
-                    pyautogui.rightClick(x, y)
-                elif action == "double_click":
-                    pyautogui.doubleClick(x, y)
-                elif action == "middle_click":
-                    pyautogui.middleClick(x, y)
-                elif action == "left_press":
-                    pyautogui.mouseDown(x, y)
-                    time.sleep(1)
-                    pyautogui.mouseUp(x, y)
-                return ToolResult(output=f"Performed {action} at {x}, {y}")
-            else:
-                pass
-        
-        if action in (
-            "left_click",
-            "right_click",
-            "double_click",
-            "middle_click",
-            "screenshot",
-            "cursor_position",
-            "left_press",
-        ):
-            if text is not None:
-                raise ToolError(f"text is not accepted for {action}")
-            # if coordinate is not None:
-            #     raise ToolError(f"coordinate is not accepted for {action}")
-
-            if action == "screenshot":
-                return await self.screenshot()
-            elif action == "cursor_position":
-                x, y = pyautogui.position()
-                x, y = self.scale_coordinates(ScalingSource.COMPUTER, x, y)
-                return ToolResult(output=f"X={x},Y={y}")
-            # minimum modification to avoid disrupting the original flow, will be optimized later
+        entry = self._actions.get(action)
+        if entry is None:
+            raise ToolError(f"Invalid action: {action}")
+        self._forget_stale_screen()
+        try:
+            pacing = get_pacing(kwargs.pop("pacing", None) or self.pacing)
+        except ValueError as e:
+            raise ToolError(str(e))
+        validate, handler = entry
+        validate(action, text, coordinate)
+        wait_for_change = kwargs.pop("wait_for_change", None)
+        if wait_for_change is None:
+            wait_for_change = self.wait_for_change and action in WAIT_FOR_CHANGE_ACTIONS
+        elif wait_for_change is not False and action not in WAIT_FOR_CHANGE_ACTIONS:
+            raise ToolError(f"wait_for_change is only supported for {', '.join(WAIT_FOR_CHANGE_ACTIONS)}")
+        if isinstance(wait_for_change, bool):
+            timeout = self.change_timeout
+        elif isinstance(wait_for_change, (int, float)) and wait_for_change > 0:
+            timeout = float(wait_for_change)
+        else:
+            raise ToolError("wait_for_change must be true, false or a timeout in seconds")
+
+        # handlers run one at a time on the display worker, so the profile can be swapped in for the call
+        previous_pause, self.input.pause = self.input.pause, pacing.pause
+        self._pacing = pacing
+        try:
+            if wait_for_change:
+                result = self._act_and_wait(handler, action, text, coordinate, timeout, **kwargs)
             else:
-                if coordinate is None:
-                    if action == "left_click":
-                        pyautogui.click()
-                    elif action == "right_click":
-                        pyautogui.rightClick()
-                    elif action == "middle_click":
-                        pyautogui.middleClick()
-                    elif action == "double_click":
-                        pyautogui.doubleClick()
-                    elif action == "left_press":
-                        pyautogui.mouseDown()
-                        time.sleep(1)
-                        pyautogui.mouseUp()
-                    return ToolResult(output=f"Performed {action}")
-                else:
-                    pass
-            
-        raise ToolError(f"Invalid action: {action}")
-    
-    
-    def sync_call(
+                result = handler(action, text, coordinate, **kwargs)
+        finally:
+            self.input.pause = previous_pause
+            self._pacing = self.pacing
+            # still on the worker, which owns the input backend's connection
+            self._mark_input(action)
+        return result.replace(pacing=pacing.name)
+
+    def _act_and_wait(self, handler, action, text, coordinate, timeout: float, **kwargs) -> ToolResult:
+        """Run an input handler, wait until the screen reacts and settles, and return that screenshot.
+
+        Saves the model a follow-up screenshot when a click or key starts a page load or
+        animation. The wait ends after `timeout` seconds even if nothing changed.
+        """
+        reference = self._grab()
+        result = handler(action, text, coordinate, take_screenshot=False, **kwargs)
+        self._mark_input(action)
+        settle = wait_until_settled(self._grab, max_wait=timeout, require_change=True, reference=reference)
+        screenshot = self._screenshot(settled=settle)
+
+        lines = [result.output]
+        if not settle.changed:
+            lines.append(f"The screen did not change within {timeout:g}s.")
+        elif not settle.settled:
+            lines.append(f"The screen was still changing after {timeout:g}s.")
+        lines.append(screenshot.output)
+        return screenshot.replace(output="\n".join(line for line in lines if line))
+
+    def _to_screen(self, coordinate: tuple[int, int]) -> tuple[int, int]:
+        """API coordinates of the last frame -> absolute screen pixels."""
+        transform = self.coordinate_transform
+        x, y = transform.convert(coordinate, "api", "local")
+        if x > self.width or y > self.height:
+            raise ToolError(f"Coordinates {coordinate[0]}, {coordinate[1]} are out of bounds")
+        return transform.convert((x, y), "local", "screen")
+
+    def _move(self, action, text, coordinate, **kwargs) -> ToolResult:
+        x, y = self._to_screen(coordinate)
+        print(f"mouse move to {x}, {y}")
+        self.input.move(x, y)
+        return ToolResult(output=f"Moved mouse to ({x}, {y})")
+
+    def _drag(self, action, text, coordinate, **kwargs) -> ToolResult:
+        x, y = self._to_screen(coordinate)
+        current_x, current_y = self.input.position()
+        self.input.drag(x, y, duration=self._pacing.drag_duration)
+        return ToolResult(output=f"Dragged mouse from ({current_x}, {current_y}) to ({x}, {y})")
+
+    def _key(self, action, text, coordinate, **kwargs) -> ToolResult:
+        # Handle key combinations: press down each key, release in reverse order
+        keys = [self.key_conversion.get(key.strip().lower(), key.strip().lower()) for key in text.split("+")]
+        try:
+            self.input.hotkey(*keys)
+        except ValueError as e:
+            raise ToolError(str(e))
+        return ToolResult(output=f"Pressed keys: {text}")
+
+    def _type(self, action, text, coordinate, take_screenshot: bool = True, **kwargs) -> ToolResult:
+        strategy = self.text_entry.enter(text, typing_delay_ms=self._pacing.typing_delay_ms)
+        print(f"typed {len(text)} characters ({strategy})")
+        if not take_screenshot:
+            return ToolResult(output=text)
+        self._mark_input(action)
+        screenshot = self._screenshot()
+        return screenshot.replace(output=f"{text}\n{screenshot.output}" if screenshot.output else text)
+
+    def _scroll(
         self,
-        *,
-        action: Action,
-        text: str | None = None,
-        coordinate: tuple[int, int] | None = None,
+        action,
+        text,
+        coordinate,
+        scroll_direction: Literal["up", "down", "left", "right"] = "down",
+        scroll_amount: int = 10,
         **kwargs,
-    ):
-        print(f"action: {action}, text: {text}, coordinate: {coordinate}")
-        action = self.action_conversion.get(action, action)
-        
-        if action in ("mouse_move", "left_click_drag"):
-            if coordinate is None:
-                raise ToolError(f"coordinate is required for {action}")
-            if text is not None:
-                raise ToolError(f"text is not accepted for {action}")
-            if not isinstance(coordinate, (list, tuple)) or len(coordinate) != 2:
-                raise ToolError(f"{coordinate} must be a tuple of length 2")
-            # if not all(isinstance(i, int) and i >= 0 for i in coordinate):
-            if not all(isinstance(i, int) for i in coordinate):
-                raise ToolError(f"{coordinate} must be a tuple of non-negative ints")
-            
-            if self.is_scaling:
-                x, y = self.scale_coordinates(
-                    ScalingSource.API, coordinate[0], coordinate[1]
-                )
-            else:
-                x, y = coordinate
-
-            # print(f"scaled_coordinates: {x}, {y}")
-            # print(f"offset: {self.offset_x}, {self.offset_y}")
-            x += self.offset_x
-            y += self.offset_y
-
-            print(f"mouse move to {x}, {y}")
-            
-            if action == "mouse_move":
-                pyautogui.moveTo(x, y)
-                return ToolResult(output=f"Moved mouse to ({x}, {y})")
-            elif action == "left_click_drag":
-                current_x, current_y = pyautogui.position()
-                pyautogui.dragTo(x, y, duration=0.5)  # Adjust duration as needed
-                return ToolResult(output=f"Dragged mouse from ({current_x}, {current_y}) to ({x}, {y})")
-
-        if action in ("key", "type"):
-            if text is None:
-                raise ToolError(f"text is required for {action}")
-            if coordinate is not None:
-                raise ToolError(f"coordinate is not accepted for {action}")
-            if not isinstance(text, str):
-                raise ToolError(output=f"{text} must be a string")
-
-            if action == "key":
-                # Handle key combinations
-                keys = text.split('+')
-                for key in keys:
-                    key = self.key_conversion.get(key.strip(), key.strip())
-                    key = key.lower()
-                    pyautogui.keyDown(key)  # Press down each key
-                for key in reversed(keys):
-                    key = self.key_conversion.get(key.strip(), key.strip())
-                    key = key.lower()
-                    pyautogui.keyUp(key)    # Release each key in reverse order
-                return ToolResult(output=f"Pressed keys: {text}")
-            
-            elif action == "type":
-                pyautogui.typewrite(text, interval=TYPING_DELAY_MS / 1000)  # Convert ms to seconds
-                return ToolResult(output=text)
-
-        if action in (
-            "left_click",
-            "right_click",
-            "double_click",
-            "middle_click",
-            "screenshot",
-            "cursor_position",
-            "left_press",
-        ):
-            if text is not None:
-                raise ToolError(f"text is not accepted for {action}")
-            if coordinate is not None:
-                raise ToolError(f"coordinate is not accepted for {action}")
-            elif action == "cursor_position":
-                x, y = pyautogui.position()
-                x, y = self.scale_coordinates(ScalingSource.COMPUTER, x, y)
-                return ToolResult(output=f"X={x},Y={y}")
-            else:
-                if action == "left_click":
-                    pyautogui.click()
-                elif action == "right_click":
-                    pyautogui.rightClick()
-                elif action == "middle_click":
-                    pyautogui.middleClick()
-                elif action == "double_click":
-                    pyautogui.doubleClick()
-                elif action == "left_press":
-                    pyautogui.mouseDown()
-                    time.sleep(1)
-                    pyautogui.mouseUp()
-                return ToolResult(output=f"Performed {action}")
-            
-        raise ToolError(f"Invalid action: {action}")
-
-    async def screenshot(self):
-        
-        import time
-        time.sleep(1)
-        
-        """Take a screenshot of the current screen and return a ToolResult with the base64 encoded image."""
-        output_dir = Path(OUTPUT_DIR)
-        output_dir.mkdir(parents=True, exist_ok=True)
-        path = output_dir / f"screenshot_{uuid4().hex}.png"
-
-        ImageGrab.grab = partial(ImageGrab.grab, all_screens=True)
-
-        # Detect platform
-        system = platform.system()
-
-        if system == "Windows":
-            # Windows: Use screeninfo to get monitor details
-            screens = get_monitors()
-
-            # Sort screens by x position to arrange from left to right
-            sorted_screens = sorted(screens, key=lambda s: s.x)
-
-            if self.selected_screen < 0 or self.selected_screen >= len(screens):
-                raise IndexError("Invalid screen index.")
-
-            screen = sorted_screens[self.selected_screen]
-            bbox = (screen.x, screen.y, screen.x + screen.width, screen.y + screen.height)
-
-        elif system == "Darwin":  # macOS
-            # macOS: Use Quartz to get monitor details
-            max_displays = 32  # Maximum number of displays to handle
-            active_displays = Quartz.CGGetActiveDisplayList(max_displays, None, None)[1]
-
-            # Get the display bounds (resolution) for each active display
-            screens = []
-            for display_id in active_displays:
-                bounds = Quartz.CGDisplayBounds(display_id)
-                screens.append({
-                    'id': display_id,
-                    'x': int(bounds.origin.x),
-                    'y': int(bounds.origin.y),
-                    'width': int(bounds.size.width),
-                    'height': int(bounds.size.height),
-                    'is_primary': Quartz.CGDisplayIsMain(display_id)  # Check if this is the primary display
-                })
-
-            # Sort screens by x position to arrange from left to right
-            sorted_screens = sorted(screens, key=lambda s: s['x'])
-
-            if self.selected_screen < 0 or self.selected_screen >= len(screens):
-                raise IndexError("Invalid screen index.")
-
-            screen = sorted_screens[self.selected_screen]
-            bbox = (screen['x'], screen['y'], screen['x'] + screen['width'], screen['y'] + screen['height'])
-
-        else:  # Linux or other OS
-            cmd = "xrandr | grep ' primary' | awk '{print $4}'"
+    ) -> ToolResult:
+        if scroll_direction not in ("up", "down", "left", "right"):
+            raise ToolError(f"{scroll_direction} must be one of up, down, left, right")
+        position = self._to_screen(coordinate) if coordinate is not None else ()
+        if scroll_direction in ("up", "down"):
+            self.input.scroll(scroll_amount if scroll_direction == "up" else -scroll_amount, *position)
+        else:
+            amount = scroll_amount if scroll_direction == "right" else -scroll_amount
+            self.input.scroll(amount, *position, horizontal=True)
+        if position:
+            return ToolResult(output=f"Scrolled {scroll_direction} at {position[0]}, {position[1]}")
+        return ToolResult(output=f"Scrolled {scroll_direction}")
+
+    def _click(self, action, text, coordinate, **kwargs) -> ToolResult:
+        # without a coordinate, click wherever the mouse is
+        x, y = self._to_screen(coordinate) if coordinate is not None else (None, None)
+        at = f" at {x}, {y}" if coordinate is not None else ""
+        if action == "left_press":
+            waited = self._press_and_hold(x, y)
+            return ToolResult(output=f"Performed {action}{at}", settle_time=waited)
+        button, clicks = _CLICKS[action]
+        self.input.click(x, y, button=button, clicks=clicks)
+        return ToolResult(output=f"Performed {action}{at}")
+
+    def _screenshot_action(self, action, text, coordinate, **kwargs) -> ToolResult:
+        if kwargs.get("all_screens", self.all_screens):
+            return self._screenshot_all_screens()
+        return self._screenshot(observation=kwargs.get("observation"))
+
+    def _cursor_position(self, action, text, coordinate, **kwargs) -> ToolResult:
+        x, y = self.coordinate_transform.screen_to_api(self.input.position())
+        return ToolResult(output=f"X={x},Y={y}")
+
+    def _zoom_action(self, action, text, coordinate, region=None, **kwargs) -> ToolResult:
+        return self.zoom(region)
+
+    def _batch(self, action, text, coordinate, actions=None, **kwargs) -> ToolResult:
+        """Run `actions` back to back and return one screenshot at the end.
+
+        Each step is a dict with the usual action arguments plus an optional `wait` in
+        seconds after it. Every step is validated before any runs; execution stops at
+        the first failing step, and the screenshot then shows the screen at that point.
+        A failure is reported in the output, not as the result's error, so the model
+        still gets the earlier steps' output and the screenshot.
+        """
+        if not isinstance(actions, list) or not actions:
+            raise ToolError("actions must be a non-empty list of action objects")
+        if len(actions) > MAX_BATCH_ACTIONS:
+            raise ToolError(f"a batch may contain at most {MAX_BATCH_ACTIONS} actions")
+        steps = []
+        for i, step in enumerate(actions):
+            if not isinstance(step, dict) or step.get("action") not in BATCH_ACTIONS:
+                raise ToolError(f"step {i}: each step needs an action, one of {', '.join(BATCH_ACTIONS)}")
+            step = dict(step)
+            name = step.pop("action")
+            wait = step.pop("wait", 0)
+            unknown = set(step) - {"text", "coordinate", *BATCH_STEP_OPTIONS.get(name, ())}
+            if unknown:
+                raise ToolError(f"step {i}: {name} does not accept {', '.join(sorted(unknown))}")
+            if not isinstance(wait, (int, float)) or not 0 <= wait <= MAX_BATCH_WAIT:
+                raise ToolError(f"step {i}: wait must be between 0 and {MAX_BATCH_WAIT} seconds")
+            validate, handler = self._actions[name]
             try:
-                output = subprocess.check_output(cmd, shell=True).decode()
-                resolution = output.strip().split()[0]
-                width, height = map(int, resolution.split('x'))
-                bbox = (0, 0, width, height)  # Assuming single primary screen for simplicity
-            except subprocess.CalledProcessError:
-                raise RuntimeError("Failed to get screen resolution on Linux.")
+                validate(name, step.get("text"), step.get("coordinate"))
+            except ToolError as e:
+                raise ToolError(f"step {i}: {e.message}")
+            steps.append((name, handler, wait, step))
 
-        # Take screenshot using the bounding box
-        screenshot = ImageGrab.grab(bbox=bbox)
+        lines = []
+        for i, (name, handler, wait, step) in enumerate(steps):
+            try:
+                result = handler(
+                    name, step.pop("text", None), step.pop("coordinate", None), take_screenshot=False, **step
+                )
+            except Exception as e:
+                message = e.message if isinstance(e, ToolError) else str(e)
+                lines.append(
+                    f"Step {i} ({name}) failed: {message}. The remaining {len(steps) - i - 1} steps were skipped."
+                )
+                break
+            finally:
+                self._mark_input(name)
+            lines.append(f"{i}: {result.output}")
+            if wait:
+                time.sleep(wait)
 
-        # Set offsets (for potential future use)
-        self.offset_x = screen['x'] if system == "Darwin" else screen.x
-        self.offset_y = screen['y'] if system == "Darwin" else screen.y
+        screenshot = self._screenshot()
+        output = "\n".join(lines)
+        return screenshot.replace(output=f"{output}\n{screenshot.output}" if screenshot.output else output)
 
-        print(f"target_dimension {self.target_dimension}")
-        
-        if not hasattr(self, 'target_dimension'):
-            screenshot = self.padding_image(screenshot)
-            self.target_dimension = MAX_SCALING_TARGETS["WXGA"]
+    async def screenshot(self, max_wait: float | None = None, observation: Observation | None = None):
+        return await self._worker.run(self._screenshot, max_wait, observation)
 
-        # Resize if target_dimensions are specified
+    def _screenshot(
+        self,
+        max_wait: float | None = None,
+        observation: Observation | None = None,
+        settled: SettleResult | None = None,
+    ) -> ToolResult:
+        """Take a screenshot of the current screen and return a ToolResult with the encoded image.
+
+        Without a capture ring, waits until the screen has settled (at most `max_wait`,
+        default `settle_timeout`) and reports the time actually waited; a `settled` wait
+        the caller already did is used as is. With a "text" `observation` (default: the
+        tool's), the screen's text is returned instead.
+        """
+        self._forget_stale_screen()
+        frame = None
+        if settled is None and self._capture_ring is not None:
+            # newest frame grabbed after the last input event, if the ring has one (or gets one soon)
+            frame = self._capture_ring.latest_after(timeout=2 * self._capture_ring.interval)
+
+        waited = None
+        if settled is not None:
+            waited, screenshot = settled.waited, settled.image
+        elif frame is not None:
+            screenshot = frame.image
+        else:
+            settle = wait_until_settled(
+                self._grab, max_wait=self.settle_timeout if max_wait is None else max_wait
+            )
+            waited = settle.waited
+            screenshot = settle.image
+
+        # Downsample and pad to the target dimension in one pass (geometry precomputed per screen)
         print(f"offset is {self.offset_x}, {self.offset_y}")
         print(f"target_dimension is {self.target_dimension}")
-        screenshot = screenshot.resize((self.target_dimension["width"], self.target_dimension["height"]))
+        native = screenshot
+        transform = self._choose_transform(screenshot)
+        screenshot = transform.apply(screenshot)
+        # from here on the model's coordinates refer to this frame
+        self._frame_transform = transform
+        frame_hash = self._fingerprint(screenshot)
+
+        if (observation or self.observation) == "text":
+            return self._observe_text(native, screenshot, transform, waited, frame_hash)
+
+        output, image_bbox = None, None
+        if transform != self._transform_for(self.screen):
+            output = (
+                f"This screenshot is scaled to {transform.target_width}x{transform.target_height}; "
+                "give coordinates in this size until the next screenshot."
+            )
+        region = self._dirty_region(screenshot)
+        if region is not None:
+            if region == (0, 0, 0, 0):
+                # still a step: archive and pHash step numbers must keep matching the agent's steps
+                self._step += 1
+                return ToolResult(
+                    output="The screen has not changed since the previous screenshot.",
+                    settle_time=waited,
+                    frame_hash=frame_hash,
+                )
+            image_bbox = region
+            screenshot = screenshot.crop(region)
+            output = (output + "\n" if output else "") + (
+                f"Only the changed region is shown: its top-left corner is at ({region[0]}, {region[1]}) "
+                f"and its size is {region[2] - region[0]}x{region[3] - region[1]}. "
+                "The rest of the screen is unchanged."
+            )
+
+        # Encode in memory; the disk copy (if any) is written off the agent's critical path
+        data = self.codec.encode(screenshot)
+        if self.resolution_policy is not None:
+            self.resolution_policy.record(*screenshot.size)
+
+        if self.archive_screenshots:
+            get_archive().submit(
+                data, suffix=self.codec.extension, session=self.session_id, step=self._step, phash=frame_hash
+            )
+        self._step += 1
+
+        return ToolResult(
+            output=output,
+            image=EncodedImage(data, self.codec.media_type),
+            settle_time=waited,
+            image_bbox=image_bbox,
+            frame_hash=frame_hash,
+        )
 
-        # Save the screenshot
-        screenshot.save(str(path))
+    async def screenshot_all_screens(self, max_wait: float | None = None) -> ToolResult:
+        return await self._worker.run(self._screenshot_all_screens, max_wait)
 
-        if path.exists():
-            # Return a ToolResult instance instead of a dictionary
-            return ToolResult(base64_image=base64.b64encode(path.read_bytes()).decode())
-        
-        raise ToolError(f"Failed to take screenshot: {path} does not exist.")
+    def _screenshot_all_screens(self, max_wait: float | None = None) -> ToolResult:
+        """Capture every monitor in one grab and return one image per screen with its geometry."""
+        screens = get_topology().screens()
+        settle = wait_until_settled(
+            lambda: grab_desktop(screens), max_wait=self.settle_timeout if max_wait is None else max_wait
+        )
+        encoded = encode_screens(settle.image, screens, self._transform_for, self.codec)
+
+        lines = []
+        images = []
+        for screen, data in encoded:
+            transform = self._transform_for(screen)
+            selected = " (selected, actions apply here)" if screen.index == self.selected_screen else ""
+            lines.append(
+                f"Screen {screen.index}: {screen.width}x{screen.height} at ({screen.x}, {screen.y}), "
+                f"shown as {transform.target_width}x{transform.target_height}{selected}"
+            )
+            images.append(ScreenImage(
+                screen=screen.index, bbox=screen.bbox,
+                image=EncodedImage(data, self.codec.media_type),
+            ))
+            if self.archive_screenshots:
+                get_archive().submit(data, suffix=self.codec.extension, session=self.session_id, step=self._step)
+        self._step += 1
+
+        return ToolResult(output="\n".join(lines), screen_images=tuple(images), settle_time=settle.waited)
+
+    def zoom(self, region: list[int] | tuple[int, int, int, int] | None) -> ToolResult:
+        """Return `region` (x0, y0, x1, y1 in API coordinates) at native screen resolution.
+
+        Cropped from the capture ring's latest frame when it is newer than the last input,
+        otherwise grabbed directly for just that region.
+        """
+        if not isinstance(region, (list, tuple)) or len(region) != 4 or not all(isinstance(i, int) for i in region):
+            raise ToolError(f"{region} must be a list of four ints [x0, y0, x1, y1]")
+        x0, y0, x1, y1 = region
+        if x0 >= x1 or y0 >= y1:
+            raise ToolError(f"region {region} must have x0 < x1 and y0 < y1")
+
+        transform = self.coordinate_transform
+        # both corners in one call, clamped to the screen (the API frame may include padding)
+        corners = transform.convert([[x0, y0], [x1, y1]], "api", "local").clip(0, [self.width, self.height])
+        (x0, y0), (x1, y1) = corners.tolist()
+        if x0 >= x1 or y0 >= y1:
+            raise ToolError(f"region {region} is outside the screen")
+
+        frame = self._capture_ring.latest_after(timeout=0) if self._capture_ring is not None else None
+        if frame is not None and frame.image.size == (self.width, self.height):
+            image = frame.image.crop((x0, y0, x1, y1))
+        else:
+            image = get_capture_backend().grab(tuple(transform.convert(corners, "local", "screen").ravel().tolist()))
+
+        output = f"Region {list(region)} shown at native resolution ({x1 - x0}x{y1 - y0} screen pixels)."
+        if max(image.size) > MAX_ZOOM_EDGE:
+            image.thumbnail((MAX_ZOOM_EDGE, MAX_ZOOM_EDGE), self.resample)
+            output = f"Region {list(region)} shown at {image.width}x{image.height} (downscaled from {x1 - x0}x{y1 - y0} screen pixels)."
+
+        data = self.codec.encode(image)
+        return ToolResult(
+            output=output,
+            image=EncodedImage(data, self.codec.media_type),
+            image_bbox=tuple(region),
+        )
 
-    def padding_image(self, screenshot):
-        """Pad the screenshot to 16:10 aspect ratio, when the aspect ratio is not 16:10."""
-        _, height = screenshot.size
-        new_width = height * 16 // 10
+    def _fingerprint(self, frame: Image.Image) -> str:
+        """Hash `frame`, look up the closest earlier frame and add this one to the index."""
+        value = dhash(frame)
+        self._previous_frame_hash, self.last_frame_hash = self.last_frame_hash, value
+        self.last_match = self.phash_index.nearest(value)
+        self.phash_index.add(value, (self.session_id, self._step))
+        return format_hash(value)
+
+    def is_same_screen(self, max_distance: int = SAME_SCREEN_DISTANCE) -> bool:
+        """Whether the latest screenshot looks like the one before it (by perceptual hash)."""
+        if self.last_frame_hash is None or self._previous_frame_hash is None:
+            return False
+        return hamming(self.last_frame_hash, self._previous_frame_hash) <= max_distance
+
+    def _observe_text(
+        self,
+        native: Image.Image,
+        frame: Image.Image,
+        transform: FrameTransform,
+        waited: float | None,
+        frame_hash: str,
+    ) -> ToolResult:
+        """OCR the screen at native resolution and describe its text lines in API coordinates.
+
+        When a previous text observation exists, only the horizontal bands that changed since
+        then are read again; lines elsewhere are reused.
+        """
+        if not ocr_available():
+            raise ToolError("Text observations need pytesseract and a local tesseract install")
+        scale = (transform.scale_x, transform.scale_y)
+        previous, self._ocr_frame = self._ocr_frame, frame
+
+        bands = None
+        if previous is not None and previous.size == frame.size:
+            spans = changed_bands(previous, frame)
+            # grow each band over the old lines it cuts through so no line is read in half
+            for box in self._ocr_boxes:
+                spans = [
+                    (min(top, box.bbox[1]), max(bottom, box.bbox[3])) if box.bbox[1] < bottom and box.bbox[3] > top
+                    else (top, bottom)
+                    for top, bottom in spans
+                ]
+            bands = merge_bands(spans, margin=4, limit=transform.content_height)
+            if sum(bottom - top for top, bottom in bands) > 0.5 * transform.content_height:
+                bands = None
+
+        if bands is None:
+            boxes = recognize(native, scale=scale)
+        else:
+            boxes = [
+                box for box in self._ocr_boxes
+                if not any(box.bbox[1] < bottom and box.bbox[3] > top for top, bottom in bands)
+            ]
+            for top, bottom in bands:
+                native_top = math.floor(top / scale[1])
+                native_bottom = min(native.height, math.ceil(bottom / scale[1]))
+                band = native.crop((0, native_top, native.width, native_bottom))
+                boxes += recognize(band, offset=(0, round(native_top * scale[1])), scale=scale)
+        self._ocr_boxes = reading_order(boxes)
+        self._step += 1
+
+        lines = "\n".join(box.describe() for box in self._ocr_boxes) or "(no text found)"
+        return ToolResult(
+            output=(
+                f"Text on the screen ({transform.target_width}x{transform.target_height} frame; "
+                f"each line is preceded by its left, top, right, bottom box):\n{lines}"
+            ),
+            settle_time=waited,
+            frame_hash=frame_hash,
+        )
+
+    def _dirty_region(self, frame: Image.Image) -> tuple[int, int, int, int] | None:
+        """Box of `frame` that changed since the previous screenshot, or None to send the full frame.
 
-        padding_image = Image.new("RGB", (new_width, height), (255, 255, 255))
-        # padding to top left
-        padding_image.paste(screenshot, (0, 0))
-        return padding_image
+        Returns (0, 0, 0, 0) when nothing changed at all.
+        """
+        previous, self._previous_frame = self._previous_frame, frame
+        if (
+            not self.dirty_crops
+            or previous is None
+            or self._frames_since_full + 1 >= self.full_frame_every
+        ):
+            self._frames_since_full = 0
+            return None
+
+        region = changed_bbox(previous, frame)
+        if region is None:
+            self._frames_since_full += 1
+            return (0, 0, 0, 0)
+        left, top, right, bottom = region
+        # a crop covering most of the screen saves little; send the full frame and reset the cadence
+        if (right - left) * (bottom - top) > 0.5 * frame.width * frame.height:
+            self._frames_since_full = 0
+            return None
+        self._frames_since_full += 1
+        return region
+
+    def _press_and_hold(self, x: int | None = None, y: int | None = None) -> float:
+        """Hold the left button for the pacing's press duration, then wait (at most its press
+        timeout) for the screen to settle after the release; returns the time waited."""
+        self.input.mouse_down(x, y)
+        self.input.flush()
+        try:
+            time.sleep(self._pacing.press_duration)
+        finally:
+            self.input.mouse_up(x, y)
+            self.input.flush()
+        return wait_until_settled(self._grab, max_wait=self._pacing.press_timeout).waited
+
+    def _grab(self) -> Image.Image:
+        """Grab the selected screen at native resolution."""
+        # Take screenshot using the bounding box of the cached screen geometry
+        return get_capture_backend().grab(self.bbox)
 
     async def shell(self, command: str, take_screenshot=True) -> ToolResult:
         """Run a shell command and return the output, error, and optionally a screenshot."""
         _, stdout, stderr = await run(command)
-        base64_image = None
 
         if take_screenshot:
-            # delay to let things settle before taking a screenshot
-            await asyncio.sleep(self._screenshot_delay)
-            base64_image = (await self.screenshot()).base64_image
+            # wait (up to the old fixed delay) for things to settle before taking a screenshot
+            screenshot = await self.screenshot(max_wait=self._screenshot_delay)
+            return screenshot.replace(
+                output=f"{stdout}\n{screenshot.output}" if screenshot.output else stdout, error=stderr
+            )
 
-        return ToolResult(output=stdout, error=stderr, base64_image=base64_image)
+        return ToolResult(output=stdout, error=stderr)
 
     def scale_coordinates(self, source: ScalingSource, x: int, y: int):
-        """Scale coordinates to a target maximum resolution."""
+        """Map a point between API coordinates and native pixels of the selected screen (no offset)."""
         x, y = int(x), int(y)
         if not self._scaling_enabled:
             return x, y
-        ratio = self.width / self.height
-        target_dimension = None
-
-        for target_name, dimension in MAX_SCALING_TARGETS.items():
-            # allow some error in the aspect ratio - not ratios are exactly 16:9
-            if abs(dimension["width"] / dimension["height"] - ratio) < 0.02:
-                if dimension["width"] < self.width:
-                    target_dimension = dimension
-                    self.target_dimension = target_dimension
-                    # print(f"target_dimension: {target_dimension}")
-                break
-
-        if target_dimension is None:
-            # TODO: currently we force the target to be WXGA (16:10), when it cannot find a match
-            target_dimension = MAX_SCALING_TARGETS["WXGA"]
-            self.target_dimension = MAX_SCALING_TARGETS["WXGA"]
-
-        # should be less than 1
-        x_scaling_factor = target_dimension["width"] / self.width
-        y_scaling_factor = target_dimension["height"] / self.height
         if source == ScalingSource.API:
             if x > self.width or y > self.height:
                 raise ToolError(f"Coordinates {x}, {y} are out of bounds")
-            # scale up
-            return round(x / x_scaling_factor), round(y / y_scaling_factor)
-        # scale down
-        return round(x * x_scaling_factor), round(y * y_scaling_factor)
+            return self.coordinate_transform.convert((x, y), "api", "local")
+        return self.coordinate_transform.convert((x, y), "local", "api")
 
     def get_screen_size(self):
-        if platform.system() == "Windows":
-            # Use screeninfo to get primary monitor on Windows
-            screens = get_monitors()
-
-            # Sort screens by x position to arrange from left to right
-            sorted_screens = sorted(screens, key=lambda s: s.x)
-            
-            if self.selected_screen is None:
-                primary_monitor = next((m for m in get_monitors() if m.is_primary), None)
-                return primary_monitor.width, primary_monitor.height
-            elif self.selected_screen < 0 or self.selected_screen >= len(screens):
-                raise IndexError("Invalid screen index.")
-            else:
-                screen = sorted_screens[self.selected_screen]
-                return screen.width, screen.height
-
-        elif platform.system() == "Darwin":
-            # macOS part using Quartz to get screen information
-            max_displays = 32  # Maximum number of displays to handle
-            active_displays = Quartz.CGGetActiveDisplayList(max_displays, None, None)[1]
-
-            # Get the display bounds (resolution) for each active display
-            screens = []
-            for display_id in active_displays:
-                bounds = Quartz.CGDisplayBounds(display_id)
-                screens.append({
-                    'id': display_id,
-                    'x': int(bounds.origin.x),
-                    'y': int(bounds.origin.y),
-                    'width': int(bounds.size.width),
-                    'height': int(bounds.size.height),
-                    'is_primary': Quartz.CGDisplayIsMain(display_id)  # Check if this is the primary display
-                })
-
-            # Sort screens by x position to arrange from left to right
-            sorted_screens = sorted(screens, key=lambda s: s['x'])
-
-            if self.selected_screen is None:
-                # Find the primary monitor
-                primary_monitor = next((screen for screen in screens if screen['is_primary']), None)
-                if primary_monitor:
-                    return primary_monitor['width'], primary_monitor['height']
-                else:
-                    raise RuntimeError("No primary monitor found.")
-            elif self.selected_screen < 0 or self.selected_screen >= len(screens):
-                raise IndexError("Invalid screen index.")
-            else:
-                # Return the resolution of the selected screen
-                screen = sorted_screens[self.selected_screen]
-                return screen['width'], screen['height']
-
-        else:  # Linux or other OS
-            cmd = "xrandr | grep ' primary' | awk '{print $4}'"
-            try:
-                output = subprocess.check_output(cmd, shell=True).decode()
-                resolution = output.strip().split()[0]
-                width, height = map(int, resolution.split('x'))
-                return width, height
-            except subprocess.CalledProcessError:
-                raise RuntimeError("Failed to get screen resolution on Linux.")
+        screen = get_topology().screen(self.selected_screen)
+        return screen.width, screen.height
     
     def get_mouse_position(self):
         # TODO: enhance this func
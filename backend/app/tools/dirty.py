@@ -0,0 +1,55 @@
+"""
+Dirty-region detection between consecutive screenshots.
+
+Frames are compared tile by tile with vectorized NumPy diffs; the changed tiles are
+reported as one pixel bounding box, or as the horizontal bands they span.
+"""
+import numpy as np
+from PIL import Image
+
+BBox = tuple[int, int, int, int]
+
+
+def changed_tiles(previous: np.ndarray, current: np.ndarray, tile: int = 32, threshold: int = 12) -> np.ndarray:
+    """Return a (rows, cols) boolean grid marking tiles whose pixels moved by more than `threshold`."""
+    diff = np.abs(previous.astype(np.int16) - current.astype(np.int16))
+    if diff.ndim == 3:
+        diff = diff.max(axis=2)
+    height, width = diff.shape
+    rows, cols = -(-height // tile), -(-width // tile)
+    padded = np.zeros((rows * tile, cols * tile), dtype=diff.dtype)
+    padded[:height, :width] = diff
+    return padded.reshape(rows, tile, cols, tile).max(axis=(1, 3)) > threshold
+
+
+def _tile_mask(previous: Image.Image, current: Image.Image, tile: int, threshold: int) -> np.ndarray:
+    return changed_tiles(np.asarray(previous.convert("RGB")), np.asarray(current.convert("RGB")), tile, threshold)
+
+
+def changed_bbox(previous: Image.Image, current: Image.Image, tile: int = 32, threshold: int = 12) -> BBox | None:
+    """Pixel bounding box (left, top, right, bottom) of everything that changed, or None if nothing did."""
+    width, height = current.size
+    if previous.size != current.size:
+        return (0, 0, width, height)
+    rows, cols = np.nonzero(_tile_mask(previous, current, tile, threshold))
+    if rows.size == 0:
+        return None
+    return (
+        int(cols.min()) * tile,
+        int(rows.min()) * tile,
+        min((int(cols.max()) + 1) * tile, width),
+        min((int(rows.max()) + 1) * tile, height),
+    )
+
+
+def changed_bands(
+    previous: Image.Image, current: Image.Image, tile: int = 32, threshold: int = 12
+) -> list[tuple[int, int]]:
+    """Pixel (top, bottom) spans of the horizontal bands of tile rows that changed."""
+    height = current.size[1]
+    if previous.size != current.size:
+        return [(0, height)]
+    rows = _tile_mask(previous, current, tile, threshold).any(axis=1)
+    # starts and ends of runs of changed rows, from the edges of the padded row mask
+    edges = np.flatnonzero(np.diff(np.concatenate(([False], rows, [False])).astype(np.int8)))
+    return [(int(start) * tile, min(int(end) * tile, height)) for start, end in zip(edges[::2], edges[1::2])]
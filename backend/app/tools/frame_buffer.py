@@ -0,0 +1,96 @@
+"""
+Background capture ring buffer.
+
+A capture thread per screen keeps the most recent frames, so a screenshot request
+can be served from memory instead of grabbing (and waiting) on the agent's step.
+"""
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from PIL import Image
+
+
+@dataclass(frozen=True)
+class Frame:
+    """A captured frame; `timestamp` is the monotonic time the grab started."""
+
+    image: Image.Image
+    timestamp: float
+
+
+class CaptureRing:
+    """Keeps a bounded ring of recent frames produced by `grab` on a daemon thread."""
+
+    def __init__(self, grab: Callable[[], Image.Image], capacity: int = 8, interval: float = 0.25):
+        self._grab = grab
+        self._frames: deque[Frame] = deque(maxlen=capacity)
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.interval = interval
+        self.last_input = 0.0
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="capture-ring", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def mark_input(self):
+        """Record that an input event just finished; older frames are now stale."""
+        self.last_input = time.monotonic()
+
+    def latest(self) -> Frame | None:
+        with self._cond:
+            return self._frames[-1] if self._frames else None
+
+    def latest_after(self, since: float | None = None, timeout: float = 1.0) -> Frame | None:
+        """Return the newest frame grabbed after `since` (default: the last input event).
+
+        Waits up to `timeout` seconds for such a frame; returns None if none arrives.
+        """
+        since = self.last_input if since is None else since
+        with self._cond:
+            if self._cond.wait_for(
+                lambda: self._frames and self._frames[-1].timestamp > since, timeout=timeout
+            ):
+                return self._frames[-1]
+        return None
+
+    def frames(self) -> list[Frame]:
+        with self._cond:
+            return list(self._frames)
+
+    def _run(self):
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                image = self._grab()
+            except Exception as e:
+                print(f"Capture ring grab failed: {e}")
+            else:
+                with self._cond:
+                    self._frames.append(Frame(image=image, timestamp=started))
+                    self._cond.notify_all()
+            self._stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
+
+
+_rings: dict[int, CaptureRing] = {}
+_rings_lock = threading.Lock()
+
+
+def get_capture_ring(selected_screen: int, grab: Callable[[], Image.Image], **kwargs) -> CaptureRing:
+    """Return the (started) capture ring for `selected_screen`, creating it on first use."""
+    with _rings_lock:
+        ring = _rings.get(selected_screen)
+        if ring is None:
+            ring = _rings[selected_screen] = CaptureRing(grab, **kwargs)
+        ring.start()
+        return ring
@@ -0,0 +1,457 @@
+"""
+Pluggable mouse and keyboard backends.
+
+ComputerTool chooses a backend once, when it is constructed (`CUA_INPUT_BACKEND`,
+default pyautogui), and sends every input event through it:
+
+- "pyautogui": the portable default (Windows, macOS, X11)
+- "xtest": X11 XTest through ctypes, with one persistent connection; events are queued
+  and sent to the server in one flush per action (opt in with `CUA_INPUT_BACKEND=xtest`)
+- "recording": a fake that logs events with timestamps, for tests
+
+Key names follow pyautogui ("enter", "ctrl", "pagedown", "a", ...).
+"""
+import atexit
+import ctypes
+import ctypes.util
+import os
+import threading
+import time
+from abc import ABCMeta, abstractmethod
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from .capture import install_x_error_handler
+
+Button = str  # "left", "middle" or "right"
+
+
+class InputBackend(metaclass=ABCMeta):
+    """Synthesizes mouse and keyboard input in virtual desktop coordinates."""
+
+    name: str
+    # seconds to sleep after every call, like pyautogui.PAUSE (set from the pacing profile)
+    pause: float = 0.0
+
+    @abstractmethod
+    def position(self) -> tuple[int, int]:
+        ...
+
+    @abstractmethod
+    def move(self, x: int, y: int):
+        ...
+
+    @abstractmethod
+    def drag(self, x: int, y: int, duration: float = 0.0, button: Button = "left"):
+        """Drag from the current position to (x, y) over `duration` seconds."""
+        ...
+
+    @abstractmethod
+    def click(self, x: int | None = None, y: int | None = None, button: Button = "left", clicks: int = 1):
+        """Click at (x, y), or where the pointer is when no position is given."""
+        ...
+
+    @abstractmethod
+    def mouse_down(self, x: int | None = None, y: int | None = None, button: Button = "left"):
+        ...
+
+    @abstractmethod
+    def mouse_up(self, x: int | None = None, y: int | None = None, button: Button = "left"):
+        ...
+
+    @abstractmethod
+    def scroll(self, amount: int, x: int | None = None, y: int | None = None, horizontal: bool = False):
+        """Scroll by `amount` clicks: positive is up (or right when `horizontal`)."""
+        ...
+
+    @abstractmethod
+    def key_down(self, key: str):
+        ...
+
+    @abstractmethod
+    def key_up(self, key: str):
+        ...
+
+    @abstractmethod
+    def write(self, text: str, interval: float = 0.0):
+        """Type ASCII `text` one key at a time, `interval` seconds apart."""
+        ...
+
+    def hotkey(self, *keys: str):
+        for key in keys:
+            self.key_down(key)
+        for key in reversed(keys):
+            self.key_up(key)
+
+    def flush(self):
+        """Send any queued events to the display."""
+
+    def close(self):
+        """Release any native resources held by the backend."""
+
+
+class PyAutoGUIBackend(InputBackend):
+    """pyautogui; imported on construction so other backends never pay for the import."""
+
+    name = "pyautogui"
+
+    def __init__(self):
+        import pyautogui
+
+        self._pyautogui = pyautogui
+        self._pause = pyautogui.PAUSE
+
+    @property
+    def pause(self) -> float:
+        return self._pause
+
+    @pause.setter
+    def pause(self, value: float):
+        self._pause = value
+        self._pyautogui.PAUSE = value
+
+    def position(self) -> tuple[int, int]:
+        x, y = self._pyautogui.position()
+        return int(x), int(y)
+
+    def move(self, x: int, y: int):
+        self._pyautogui.moveTo(x, y)
+
+    def drag(self, x: int, y: int, duration: float = 0.0, button: Button = "left"):
+        self._pyautogui.dragTo(x, y, duration=duration, button=button)
+
+    def click(self, x: int | None = None, y: int | None = None, button: Button = "left", clicks: int = 1):
+        self._pyautogui.click(x, y, clicks=clicks, button=button)
+
+    def mouse_down(self, x: int | None = None, y: int | None = None, button: Button = "left"):
+        self._pyautogui.mouseDown(x, y, button=button)
+
+    def mouse_up(self, x: int | None = None, y: int | None = None, button: Button = "left"):
+        self._pyautogui.mouseUp(x, y, button=button)
+
+    def scroll(self, amount: int, x: int | None = None, y: int | None = None, horizontal: bool = False):
+        (self._pyautogui.hscroll if horizontal else self._pyautogui.scroll)(amount, x, y)
+
+    def key_down(self, key: str):
+        self._pyautogui.keyDown(key)
+
+    def key_up(self, key: str):
+        self._pyautogui.keyUp(key)
+
+    def write(self, text: str, interval: float = 0.0):
+        self._pyautogui.typewrite(text, interval=interval)
+
+    def hotkey(self, *keys: str):
+        self._pyautogui.hotkey(*keys)
+
+
+# pyautogui key names -> X keysym names (single characters are looked up directly)
+_X_KEYSYMS = {
+    "enter": "Return", "return": "Return", "\n": "Return", "tab": "Tab", "\t": "Tab", "space": "space",
+    " ": "space", "esc": "Escape", "escape": "Escape", "backspace": "BackSpace", "delete": "Delete",
+    "del": "Delete", "insert": "Insert", "home": "Home", "end": "End", "pageup": "Prior", "pagedown": "Next",
+    "up": "Up", "down": "Down", "left": "Left", "right": "Right",
+    "shift": "Shift_L", "shiftleft": "Shift_L", "shiftright": "Shift_R",
+    "ctrl": "Control_L", "ctrlleft": "Control_L", "ctrlright": "Control_R",
+    "alt": "Alt_L", "altleft": "Alt_L", "altright": "Alt_R", "option": "Alt_L",
+    "win": "Super_L", "winleft": "Super_L", "winright": "Super_R", "super": "Super_L", "command": "Super_L",
+    "capslock": "Caps_Lock", "printscreen": "Print", "menu": "Menu",
+    **{f"f{i}": f"F{i}" for i in range(1, 25)},
+    "!": "exclam", '"': "quotedbl", "#": "numbersign", "$": "dollar", "%": "percent", "&": "ampersand",
+    "'": "apostrophe", "(": "parenleft", ")": "parenright", "*": "asterisk", "+": "plus", ",": "comma",
+    "-": "minus", ".": "period", "/": "slash", ":": "colon", ";": "semicolon", "<": "less", "=": "equal",
+    ">": "greater", "?": "question", "@": "at", "[": "bracketleft", "\\": "backslash", "]": "bracketright",
+    "^": "asciicircum", "_": "underscore", "`": "grave", "{": "braceleft", "|": "bar", "}": "braceright",
+    "~": "asciitilde",
+}
+_X_BUTTONS = {"left": 1, "middle": 2, "right": 3}
+# wheel "buttons": up, down, left, right
+_X_SCROLL = {(False, True): 4, (False, False): 5, (True, False): 6, (True, True): 7}  # (horizontal, positive)
+
+
+class XTestBackend(InputBackend):
+    """X11 XTest fake input over one persistent display connection.
+
+    Events are only queued on the connection; `flush` (called once per action) sends
+    them in one go. With a non-zero `pause`, each call is flushed and followed by the
+    pause, like pyautogui.
+    """
+
+    name = "xtest"
+
+    def __init__(self, display: str | None = None):
+        x11 = ctypes.util.find_library("X11")
+        xtst = ctypes.util.find_library("Xtst")
+        if x11 is None or xtst is None:
+            raise RuntimeError("libX11/libXtst not found; the xtest input backend is unavailable.")
+        self._x11 = ctypes.CDLL(x11)
+        self._xtst = ctypes.CDLL(xtst)
+        self._declare()
+        # an X error (e.g. a bad keycode) must not exit the process through Xlib's default handler
+        install_x_error_handler(self._x11)
+
+        self._lock = threading.Lock()
+        self._display = self._x11.XOpenDisplay((display or os.environ.get("DISPLAY", "")).encode() or None)
+        if not self._display:
+            raise RuntimeError("Cannot open X display for the xtest input backend.")
+        if not self._xtst.XTestQueryExtension(self._display, *(ctypes.byref(ctypes.c_int()) for _ in range(4))):
+            self._x11.XCloseDisplay(self._display)
+            raise RuntimeError("The X server does not support the XTEST extension.")
+        self._root = self._x11.XDefaultRootWindow(self._display)
+        self._keycodes: dict[str, tuple[int, bool]] = {}
+        atexit.register(self.close)
+
+    def _declare(self):
+        x11, xtst = self._x11, self._xtst
+        x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        x11.XOpenDisplay.restype = ctypes.c_void_p
+        x11.XCloseDisplay.argtypes = [ctypes.c_void_p]
+        x11.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+        x11.XDefaultRootWindow.restype = ctypes.c_ulong
+        x11.XFlush.argtypes = [ctypes.c_void_p]
+        x11.XStringToKeysym.argtypes = [ctypes.c_char_p]
+        x11.XStringToKeysym.restype = ctypes.c_ulong
+        x11.XKeysymToKeycode.argtypes = [ctypes.c_void_p, ctypes.c_ulong]
+        x11.XKeysymToKeycode.restype = ctypes.c_ubyte
+        x11.XKeycodeToKeysym.argtypes = [ctypes.c_void_p, ctypes.c_ubyte, ctypes.c_int]
+        x11.XKeycodeToKeysym.restype = ctypes.c_ulong
+        x11.XQueryPointer.argtypes = [
+            ctypes.c_void_p, ctypes.c_ulong,
+            ctypes.POINTER(ctypes.c_ulong), ctypes.POINTER(ctypes.c_ulong),
+            ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int),
+            ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int),
+            ctypes.POINTER(ctypes.c_uint),
+        ]
+        xtst.XTestQueryExtension.argtypes = [ctypes.c_void_p] + [ctypes.POINTER(ctypes.c_int)] * 4
+        xtst.XTestFakeMotionEvent.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_ulong]
+        xtst.XTestFakeButtonEvent.argtypes = [ctypes.c_void_p, ctypes.c_uint, ctypes.c_int, ctypes.c_ulong]
+        xtst.XTestFakeKeyEvent.argtypes = [ctypes.c_void_p, ctypes.c_uint, ctypes.c_int, ctypes.c_ulong]
+
+    def _paced(self):
+        if self.pause:
+            self._x11.XFlush(self._display)
+            time.sleep(self.pause)
+
+    def _keycode(self, key: str) -> tuple[int, bool]:
+        """(keycode, needs shift) for a pyautogui key name or a single character."""
+        cached = self._keycodes.get(key)
+        if cached is not None:
+            return cached
+        name = _X_KEYSYMS.get(key) or _X_KEYSYMS.get(key.lower()) or key
+        keysym = self._x11.XStringToKeysym(name.encode())
+        keycode = self._x11.XKeysymToKeycode(self._display, keysym) if keysym else 0
+        if not keycode:
+            raise ValueError(f"No X keycode for key {key!r}")
+        # the keysym is the shifted symbol of its key, e.g. "A" or "!"
+        shift = self._x11.XKeycodeToKeysym(self._display, keycode, 0) != keysym
+        self._keycodes[key] = (keycode, shift)
+        return keycode, shift
+
+    def _motion(self, x: int, y: int):
+        self._xtst.XTestFakeMotionEvent(self._display, -1, int(x), int(y), 0)
+
+    def _button(self, button: int, press: bool):
+        self._xtst.XTestFakeButtonEvent(self._display, button, int(press), 0)
+
+    def _key(self, keycode: int, press: bool):
+        self._xtst.XTestFakeKeyEvent(self._display, keycode, int(press), 0)
+
+    def position(self) -> tuple[int, int]:
+        root, child = ctypes.c_ulong(), ctypes.c_ulong()
+        x, y, win_x, win_y = ctypes.c_int(), ctypes.c_int(), ctypes.c_int(), ctypes.c_int()
+        mask = ctypes.c_uint()
+        with self._lock:
+            self._x11.XQueryPointer(
+                self._display, self._root, ctypes.byref(root), ctypes.byref(child),
+                ctypes.byref(x), ctypes.byref(y), ctypes.byref(win_x), ctypes.byref(win_y), ctypes.byref(mask),
+            )
+        return x.value, y.value
+
+    def move(self, x: int, y: int):
+        with self._lock:
+            self._motion(x, y)
+            self._paced()
+
+    def drag(self, x: int, y: int, duration: float = 0.0, button: Button = "left"):
+        start_x, start_y = self.position()
+        steps = max(1, int(duration / 0.01))
+        with self._lock:
+            self._button(_X_BUTTONS[button], True)
+            for step in range(1, steps + 1):
+                self._motion(start_x + (x - start_x) * step / steps, start_y + (y - start_y) * step / steps)
+                if duration:
+                    self._x11.XFlush(self._display)
+                    time.sleep(duration / steps)
+            self._button(_X_BUTTONS[button], False)
+            self._paced()
+
+    def click(self, x: int | None = None, y: int | None = None, button: Button = "left", clicks: int = 1):
+        with self._lock:
+            if x is not None and y is not None:
+                self._motion(x, y)
+            for _ in range(clicks):
+                self._button(_X_BUTTONS[button], True)
+                self._button(_X_BUTTONS[button], False)
+            self._paced()
+
+    def mouse_down(self, x: int | None = None, y: int | None = None, button: Button = "left"):
+        with self._lock:
+            if x is not None and y is not None:
+                self._motion(x, y)
+            self._button(_X_BUTTONS[button], True)
+            self._paced()
+
+    def mouse_up(self, x: int | None = None, y: int | None = None, button: Button = "left"):
+        with self._lock:
+            if x is not None and y is not None:
+                self._motion(x, y)
+            self._button(_X_BUTTONS[button], False)
+            self._paced()
+
+    def scroll(self, amount: int, x: int | None = None, y: int | None = None, horizontal: bool = False):
+        wheel = _X_SCROLL[(horizontal, amount > 0)]
+        with self._lock:
+            if x is not None and y is not None:
+                self._motion(x, y)
+            for _ in range(abs(amount)):
+                self._button(wheel, True)
+                self._button(wheel, False)
+            self._paced()
+
+    def _shifted_key(self, key: str, press: bool):
+        keycode, shifted = self._keycode(key)
+        shift, _ = self._keycode("shift") if shifted else (0, False)
+        with self._lock:
+            # like pyautogui, a shifted symbol ("+", "?", "A") is wrapped in its own shift press
+            if shifted:
+                self._key(shift, True)
+            self._key(keycode, press)
+            if shifted:
+                self._key(shift, False)
+            self._paced()
+
+    def key_down(self, key: str):
+        self._shifted_key(key, True)
+
+    def key_up(self, key: str):
+        self._shifted_key(key, False)
+
+    def write(self, text: str, interval: float = 0.0):
+        shift, _ = self._keycode("shift")
+        for char in text:
+            keycode, shifted = self._keycode(char)
+            with self._lock:
+                if shifted:
+                    self._key(shift, True)
+                self._key(keycode, True)
+                self._key(keycode, False)
+                if shifted:
+                    self._key(shift, False)
+                if interval:
+                    self._x11.XFlush(self._display)
+            if interval:
+                time.sleep(interval)
+        with self._lock:
+            self._paced()
+
+    def flush(self):
+        with self._lock:
+            if self._display:
+                self._x11.XFlush(self._display)
+
+    def close(self):
+        """Close the display connection; also runs at interpreter exit."""
+        with self._lock:
+            if self._display:
+                self._x11.XCloseDisplay(self._display)
+                self._display = None
+        atexit.unregister(self.close)
+
+
+@dataclass(frozen=True)
+class InputEvent:
+    timestamp: float
+    kind: str
+    args: tuple[Any, ...]
+
+
+class RecordingInputBackend(InputBackend):
+    """Fake backend for tests: records every call with a timestamp and tracks the pointer."""
+
+    name = "recording"
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic, start: tuple[int, int] = (0, 0)):
+        self.clock = clock
+        self.events: list[InputEvent] = []
+        self.pointer = start
+        self.flushes = 0
+
+    def _record(self, kind: str, *args: Any):
+        self.events.append(InputEvent(self.clock(), kind, args))
+
+    def _move_to(self, x: int | None, y: int | None):
+        if x is not None and y is not None:
+            self.pointer = (x, y)
+
+    def position(self) -> tuple[int, int]:
+        return self.pointer
+
+    def move(self, x: int, y: int):
+        self._move_to(x, y)
+        self._record("move", x, y)
+
+    def drag(self, x: int, y: int, duration: float = 0.0, button: Button = "left"):
+        self._record("drag", self.pointer, (x, y), duration, button)
+        self._move_to(x, y)
+
+    def click(self, x: int | None = None, y: int | None = None, button: Button = "left", clicks: int = 1):
+        self._move_to(x, y)
+        self._record("click", *self.pointer, button, clicks)
+
+    def mouse_down(self, x: int | None = None, y: int | None = None, button: Button = "left"):
+        self._move_to(x, y)
+        self._record("mouse_down", *self.pointer, button)
+
+    def mouse_up(self, x: int | None = None, y: int | None = None, button: Button = "left"):
+        self._move_to(x, y)
+        self._record("mouse_up", *self.pointer, button)
+
+    def scroll(self, amount: int, x: int | None = None, y: int | None = None, horizontal: bool = False):
+        self._move_to(x, y)
+        self._record("hscroll" if horizontal else "scroll", amount, *self.pointer)
+
+    def key_down(self, key: str):
+        self._record("key_down", key)
+
+    def key_up(self, key: str):
+        self._record("key_up", key)
+
+    def write(self, text: str, interval: float = 0.0):
+        self._record("write", text, interval)
+
+    def hotkey(self, *keys: str):
+        self._record("hotkey", *keys)
+
+    def flush(self):
+        self.flushes += 1
+
+    def kinds(self) -> list[str]:
+        return [event.kind for event in self.events]
+
+
+INPUT_BACKENDS: dict[str, type[InputBackend]] = {
+    PyAutoGUIBackend.name: PyAutoGUIBackend,
+    XTestBackend.name: XTestBackend,
+    RecordingInputBackend.name: RecordingInputBackend,
+}
+
+
+def create_input_backend(backend: InputBackend | str | None = None) -> InputBackend:
+    """Pass an instance through, or instantiate the named backend (default: `CUA_INPUT_BACKEND`, then pyautogui)."""
+    if isinstance(backend, InputBackend):
+        return backend
+    name = backend or os.environ.get("CUA_INPUT_BACKEND") or PyAutoGUIBackend.name
+    if name not in INPUT_BACKENDS:
+        raise ValueError(f"Unknown input backend {name!r}, expected one of {list(INPUT_BACKENDS)}")
+    return INPUT_BACKENDS[name]()
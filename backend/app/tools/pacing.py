@@ -0,0 +1,45 @@
+"""
+Action pacing profiles.
+
+A profile bundles the timings around input: the pause after every input call, how
+long a drag takes, how long a press is held and how long to wait for the screen
+after it, and the per-character typing delay. Headless runners can drop them entirely; remote desktops need more.
+"""
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class PacingProfile:
+    name: str
+    # sleep after every input backend call (pyautogui.PAUSE for the pyautogui backend)
+    pause: float
+    drag_duration: float
+    # longest to wait for the screen to settle after a left_press is released
+    press_timeout: float
+    typing_delay_ms: float
+    # how long a left_press holds the button; long-press gestures need the full hold
+    press_duration: float = 1.0
+
+
+PACING_PROFILES: dict[str, PacingProfile] = {
+    # Xvfb and other headless displays: no artificial delay (a long press still holds for press_duration)
+    "fast-headless": PacingProfile("fast-headless", pause=0.0, drag_duration=0.0, press_timeout=0.0, typing_delay_ms=0),
+    # the historical pyautogui / ComputerTool timings
+    "default": PacingProfile("default", pause=0.1, drag_duration=0.5, press_timeout=1.0, typing_delay_ms=12),
+    # VNC / RDP sessions where input and screen updates lag
+    "conservative-remote-desktop": PacingProfile(
+        "conservative-remote-desktop", pause=0.25, drag_duration=1.0, press_timeout=2.0, typing_delay_ms=30,
+        press_duration=1.5,
+    ),
+}
+
+DEFAULT_PACING = "default"
+
+
+def get_pacing(pacing: str | PacingProfile) -> PacingProfile:
+    """Resolve a profile name (or pass a custom PacingProfile through)."""
+    if isinstance(pacing, PacingProfile):
+        return pacing
+    if pacing not in PACING_PROFILES:
+        raise ValueError(f"Unknown pacing profile {pacing!r}, expected one of {list(PACING_PROFILES)}")
+    return PACING_PROFILES[pacing]
@@ -0,0 +1,116 @@
+"""
+Perceptual hashes of screenshots and an in-memory nearest-neighbour index.
+
+A 64-bit hash is computed from a tiny grayscale version of the frame, so two
+screenshots of the same screen hash to the same (or a very close) value even when
+they are not byte-identical. Distances are Hamming distances between hashes.
+"""
+import threading
+from functools import lru_cache
+from typing import Any
+
+import numpy as np
+from PIL import Image
+
+HASH_SIZE = 8
+# Frames whose hashes differ in at most this many of the 64 bits are treated as the same screen
+SAME_SCREEN_DISTANCE = 4
+
+
+def dhash(image: Image.Image, hash_size: int = HASH_SIZE) -> int:
+    """Difference hash: one bit per horizontally adjacent pixel pair of a (size+1) x size thumbnail."""
+    pixels = np.asarray(
+        image.resize((hash_size + 1, hash_size), Image.Resampling.BOX).convert("L"), dtype=np.int16
+    )
+    bits = pixels[:, 1:] > pixels[:, :-1]
+    return int.from_bytes(np.packbits(bits.ravel()).tobytes(), "big")
+
+
+@lru_cache(maxsize=4)
+def _dct_matrix(n: int) -> np.ndarray:
+    k = np.arange(n)
+    matrix = np.cos(np.pi * (2 * k[None, :] + 1) * k[:, None] / (2 * n)) * np.sqrt(2 / n)
+    matrix[0] /= np.sqrt(2)
+    return matrix
+
+
+def phash(image: Image.Image, hash_size: int = HASH_SIZE, highfreq_factor: int = 4) -> int:
+    """DCT hash: low-frequency DCT coefficients of a grayscale thumbnail compared to their median."""
+    size = hash_size * highfreq_factor
+    pixels = np.asarray(image.resize((size, size), Image.Resampling.BOX).convert("L"), dtype=np.float64)
+    dct = _dct_matrix(size)
+    low = (dct @ pixels @ dct.T)[:hash_size, :hash_size]
+    bits = low > np.median(low.ravel()[1:])  # skip the DC term, it only tracks overall brightness
+    return int.from_bytes(np.packbits(bits.ravel()).tobytes(), "big")
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def format_hash(value: int) -> str:
+    return f"{value:016x}"
+
+
+def _popcount(values: np.ndarray) -> np.ndarray:
+    if hasattr(np, "bitwise_count"):  # NumPy >= 2.0
+        return np.bitwise_count(values)
+    return np.unpackbits(values.view(np.uint8)).reshape(-1, 64).sum(axis=1)
+
+
+class PerceptualIndex:
+    """Hashes with attached keys; nearest-neighbour lookups are one vectorized XOR + popcount."""
+
+    def __init__(self, max_size: int = 100_000):
+        self.max_size = max_size
+        self._hashes = np.empty(1024, dtype=np.uint64)
+        self._keys: list[Any] = []
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, value: int, key: Any):
+        with self._lock:
+            count = len(self._keys)
+            if count >= self.max_size:
+                # forget the oldest half rather than shifting on every insert
+                keep = count // 2
+                self._hashes[:keep] = self._hashes[count - keep:count]
+                self._keys = self._keys[count - keep:]
+                count = keep
+            if count == len(self._hashes):
+                self._hashes = np.resize(self._hashes, 2 * count)
+            self._hashes[count] = value
+            self._keys.append(key)
+
+    def nearest(self, value: int, max_distance: int = 64) -> tuple[Any, int] | None:
+        """(key, distance) of the closest stored hash within `max_distance`, newest first on ties."""
+        with self._lock:
+            count = len(self._keys)
+            if not count:
+                return None
+            distances = _popcount(self._hashes[:count] ^ np.uint64(value))
+            # reversed so argmin prefers the most recent frame among equally close ones
+            index = count - 1 - int(np.argmin(distances[::-1]))
+            distance = int(distances[index])
+            if distance > max_distance:
+                return None
+            return self._keys[index], distance
+
+    def within(self, value: int, max_distance: int) -> list[tuple[Any, int]]:
+        """All (key, distance) pairs within `max_distance`, closest first."""
+        with self._lock:
+            count = len(self._keys)
+            distances = _popcount(self._hashes[:count] ^ np.uint64(value))
+            indices = np.nonzero(distances <= max_distance)[0]
+            order = indices[np.argsort(distances[indices], kind="stable")]
+            return [(self._keys[i], int(distances[i])) for i in order]
+
+
+_index = PerceptualIndex()
+
+
+def get_phash_index() -> PerceptualIndex:
+    """Return the process-wide index shared by every ComputerTool (and thus every session)."""
+    return _index
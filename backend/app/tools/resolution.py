@@ -0,0 +1,99 @@
+"""
+Token-budget-aware screenshot resolution.
+
+Image tokens grow with pixel count (about width * height / 750), so the API frame
+size is the main lever on what a screenshot costs. A ResolutionPolicy picks the
+target for each screenshot from a per-frame token budget, how much detail the frame
+actually contains (a loading page does not need the resolution of a dense editor)
+and how much of the context window is left.
+"""
+import math
+import threading
+
+import numpy as np
+from PIL import Image
+
+from .topology import Resolution
+
+PIXELS_PER_TOKEN = 750
+# Default per-frame ceiling: enough for the FWXGA / WXGA / XGA targets at full size
+DEFAULT_FRAME_TOKENS = 1600
+# Claude's context window; leave room for this many more frames when it starts to fill up
+CONTEXT_WINDOW_TOKENS = 200_000
+RESERVED_FRAMES = 20
+# Edge density (fraction of strong horizontal gradients) of a text-dense screen
+DENSE_EDGE_DENSITY = 0.05
+EDGE_THRESHOLD = 24
+DETAIL_PROBE_WIDTH = 320
+
+
+def estimate_image_tokens(width: int, height: int) -> int:
+    return math.ceil(width * height / PIXELS_PER_TOKEN)
+
+
+def detail_level(image: Image.Image) -> float:
+    """Rough 0..1 measure of how much fine detail (mostly text) `image` contains."""
+    height = max(1, round(image.height * DETAIL_PROBE_WIDTH / image.width))
+    probe = np.asarray(
+        image.resize((DETAIL_PROBE_WIDTH, height), Image.Resampling.BOX).convert("L"), dtype=np.int16
+    )
+    edges = np.abs(np.diff(probe, axis=1)) > EDGE_THRESHOLD
+    return min(1.0, float(edges.mean()) / DENSE_EDGE_DENSITY)
+
+
+class ResolutionPolicy:
+    """Chooses the API frame size for each screenshot and keeps count of the image tokens spent."""
+
+    def __init__(
+        self,
+        frame_tokens: int = DEFAULT_FRAME_TOKENS,
+        min_frame_tokens: int = 400,
+        context_tokens: int = CONTEXT_WINDOW_TOKENS,
+        reserved_frames: int = RESERVED_FRAMES,
+        adapt_to_content: bool = True,
+    ):
+        self.frame_tokens = frame_tokens
+        self.min_frame_tokens = min_frame_tokens
+        self.context_tokens = context_tokens
+        self.reserved_frames = reserved_frames
+        self.adapt_to_content = adapt_to_content
+        self.spent_tokens = 0
+        self._context_used: int | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def remaining_context(self) -> int:
+        """Tokens left in the context window: from the last reported usage, else our own image spend."""
+        used = self._context_used if self._context_used is not None else self.spent_tokens
+        return max(0, self.context_tokens - used)
+
+    def observe_usage(self, input_tokens: int):
+        """Report the input tokens of the latest request (the agent loop knows the real context size)."""
+        self._context_used = input_tokens
+
+    def frame_budget(self, image: Image.Image | None = None) -> int:
+        """Token budget for the next frame."""
+        budget = self.frame_tokens
+        if image is not None and self.adapt_to_content:
+            budget = round(budget * max(detail_level(image), self.min_frame_tokens / self.frame_tokens))
+        # spread what is left of the context over the frames we still expect to send
+        budget = min(budget, self.remaining_context // self.reserved_frames)
+        return max(budget, self.min_frame_tokens)
+
+    def choose(self, base: Resolution, image: Image.Image | None = None) -> Resolution:
+        """Scale `base` (the screen's scaling target) down, keeping its aspect ratio, to fit the budget."""
+        budget = self.frame_budget(image)
+        scale = min(1.0, math.sqrt(budget * PIXELS_PER_TOKEN / (base["width"] * base["height"])))
+        if scale >= 1.0:
+            return base
+        # even sizes keep box reductions and the padding maths exact more often
+        return Resolution(
+            width=max(2, 2 * round(base["width"] * scale / 2)),
+            height=max(2, 2 * round(base["height"] * scale / 2)),
+        )
+
+    def record(self, width: int, height: int) -> int:
+        tokens = estimate_image_tokens(width, height)
+        with self._lock:
+            self.spent_tokens += tokens
+        return tokens
@@ -0,0 +1,231 @@
+"""
+Text entry strategies for the `type` action.
+
+- "typewrite": one key press per character through the input backend (ASCII only), the
+  old behaviour.
+- "chunked": xdotool typing in groups of TYPING_GROUP_SIZE characters (any Unicode text),
+  falling back to the input backend per group where xdotool is unavailable.
+- "paste": put the text on the clipboard, press the paste shortcut, and restore the
+  previous clipboard contents shortly afterwards. The shortcut is configurable, since
+  terminal emulators paste with ctrl+shift+v rather than ctrl+v.
+
+"auto" pastes long text when a clipboard backend is available, and otherwise picks
+the fastest way to type the characters involved, and falls back to typing when the
+clipboard fails. Text that no available strategy can enter raises ToolError instead
+of being dropped.
+"""
+import platform
+import shutil
+import subprocess
+import threading
+
+from .base import ToolError
+from .input_backend import InputBackend
+
+TYPING_DELAY_MS = 12
+TYPING_GROUP_SIZE = 50
+# Texts at least this long are pasted in "auto" mode
+PASTE_THRESHOLD = 200
+# Time the focused app gets to read the clipboard before it is restored
+CLIPBOARD_RESTORE_DELAY = 0.5
+
+STRATEGIES = ("auto", "typewrite", "chunked", "paste")
+
+
+def chunks(s: str, chunk_size: int) -> list[str]:
+    return [s[i : i + chunk_size] for i in range(0, len(s), chunk_size)]
+
+
+class ClipboardError(RuntimeError):
+    """Reading or writing the clipboard failed."""
+
+
+class Clipboard:
+    """Text clipboard through pyperclip, or the platform's clipboard commands."""
+
+    def __init__(self):
+        self._copy, self._paste = self._find_commands()
+        if self._copy is None:
+            raise RuntimeError("No clipboard backend found (install pyperclip, xclip, xsel or wl-clipboard).")
+        # set once an operation fails; get_clipboard then stops offering this clipboard
+        self.failed = False
+
+    @staticmethod
+    def _find_commands():
+        try:
+            import pyperclip
+            # pyperclip imports without a working mechanism (e.g. on Xvfb without xclip); try it once
+            pyperclip.paste()
+            return pyperclip.copy, pyperclip.paste
+        except ImportError:
+            pass
+        except RuntimeError as e:
+            print(f"pyperclip has no usable clipboard, trying the clipboard commands: {e}")
+        if platform.system() == "Darwin":
+            candidates = [(["pbcopy"], ["pbpaste"])]
+        else:
+            candidates = [
+                (["wl-copy"], ["wl-paste", "--no-newline"]),
+                (["xclip", "-selection", "clipboard"], ["xclip", "-selection", "clipboard", "-o"]),
+                (["xsel", "--clipboard", "--input"], ["xsel", "--clipboard", "--output"]),
+            ]
+        for copy, paste in candidates:
+            if shutil.which(copy[0]) and shutil.which(paste[0]):
+                return (
+                    lambda text, copy=copy: subprocess.run(copy, input=text.encode(), check=True),
+                    lambda paste=paste: subprocess.run(paste, capture_output=True).stdout.decode(errors="replace"),
+                )
+        return None, None
+
+    def get(self) -> str:
+        try:
+            return self._paste()
+        except (RuntimeError, OSError, subprocess.SubprocessError) as e:
+            self.failed = True
+            raise ClipboardError(str(e)) from e
+
+    def set(self, text: str):
+        try:
+            self._copy(text)
+        except (RuntimeError, OSError, subprocess.SubprocessError) as e:
+            self.failed = True
+            raise ClipboardError(str(e)) from e
+
+
+_clipboard: Clipboard | None = None
+_clipboard_probed = False
+
+
+def get_clipboard() -> Clipboard | None:
+    """The process-wide clipboard backend, or None if this host has none (or it has failed)."""
+    global _clipboard, _clipboard_probed
+    if not _clipboard_probed:
+        _clipboard_probed = True
+        try:
+            _clipboard = Clipboard()
+        except RuntimeError as e:
+            print(e)
+    if _clipboard is not None and _clipboard.failed:
+        return None
+    return _clipboard
+
+
+class TextEntry:
+    """Enters text into the focused window with the configured (or automatically chosen) strategy."""
+
+    def __init__(
+        self,
+        input: InputBackend,
+        strategy: str = "auto",
+        paste_threshold: int = PASTE_THRESHOLD,
+        paste_shortcut: str | None = None,
+    ):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown text entry strategy {strategy!r}, expected one of {STRATEGIES}")
+        self.input = input
+        self.strategy = strategy
+        self.paste_threshold = paste_threshold
+        # keys pressed to paste, e.g. "ctrl+shift+v" for terminals; default: the platform's paste shortcut
+        self.paste_keys = tuple(
+            (paste_shortcut or ("command+v" if platform.system() == "Darwin" else "ctrl+v")).split("+")
+        )
+        self.typing_delay_ms = TYPING_DELAY_MS
+        self._xdotool = platform.system() == "Linux" and shutil.which("xdotool") is not None
+        # clipboard contents to put back once pasting is done, and the timer that will do it
+        self._saved_clipboard: str | None = None
+        self._restore_timer: threading.Timer | None = None
+        self._pastes = 0
+        self._lock = threading.Lock()
+
+    def choose(self, text: str) -> str:
+        if self.strategy != "auto":
+            return self.strategy
+        if len(text) >= self.paste_threshold and get_clipboard() is not None:
+            return "paste"
+        if text.isascii() and len(text) <= TYPING_GROUP_SIZE and not self._xdotool:
+            return "typewrite"
+        if text.isascii() or self._xdotool:
+            return "chunked"
+        # non-ASCII text without xdotool can only be pasted
+        if get_clipboard() is None:
+            raise ToolError(
+                "Typing non-ASCII text needs xdotool or a clipboard backend (pyperclip, xclip, xsel or wl-clipboard)."
+            )
+        return "paste"
+
+    def enter(self, text: str, typing_delay_ms: float | None = None) -> str:
+        """Type `text` (typewrite waits `typing_delay_ms` between keys); returns the strategy used."""
+        strategy = self.choose(text)
+        if not text.isascii() and (strategy == "typewrite" or (strategy == "chunked" and not self._xdotool)):
+            # key-by-key input backends cannot produce these characters and would silently drop them
+            raise ToolError(f"The {strategy} strategy cannot type non-ASCII text; use paste, or chunked with xdotool.")
+        delay_ms = self.typing_delay_ms if typing_delay_ms is None else typing_delay_ms
+        try:
+            if strategy == "paste":
+                try:
+                    self._paste(text)
+                except ClipboardError as e:
+                    # nothing was pasted yet; in auto mode type the text instead, where it can be typed
+                    if self.strategy != "auto" or not (text.isascii() or self._xdotool):
+                        raise ToolError(f"Pasting text failed, the clipboard is unavailable: {e}")
+                    print(f"Pasting text failed, typing it instead: {e}")
+                    strategy = "chunked"
+                    self._type_chunked(text, delay_ms)
+            elif strategy == "chunked":
+                self._type_chunked(text, delay_ms)
+            else:
+                self.input.write(text, interval=delay_ms / 1000)  # Convert ms to seconds
+        except ValueError as e:
+            # a character the input backend has no key for
+            raise ToolError(str(e))
+        except subprocess.CalledProcessError as e:
+            raise ToolError(f"{e.cmd[0]} failed with exit status {e.returncode}")
+        return strategy
+
+    def _type_chunked(self, text: str, delay_ms: float = TYPING_DELAY_MS):
+        for chunk in chunks(text, TYPING_GROUP_SIZE):
+            if self._xdotool:
+                # anything still queued on the input backend must land before xdotool's keys
+                self.input.flush()
+                subprocess.run(
+                    ["xdotool", "type", "--clearmodifiers", "--delay", str(round(delay_ms)), "--", chunk],
+                    check=True,
+                )
+            else:
+                self.input.write(chunk, interval=0)
+
+    def _paste(self, text: str):
+        clipboard = get_clipboard()
+        if clipboard is None:
+            raise ToolError("Pasting text needs a clipboard backend (pyperclip, xclip, xsel or wl-clipboard).")
+        with self._lock:
+            if self._restore_timer is not None:
+                # a restore is still pending: the clipboard holds our last paste, keep the saved original
+                self._restore_timer.cancel()
+            else:
+                self._saved_clipboard = clipboard.get()
+            clipboard.set(text)
+            self.input.hotkey(*self.paste_keys)
+            self.input.flush()
+            self._pastes += 1
+            self._restore_timer = threading.Timer(
+                CLIPBOARD_RESTORE_DELAY, self._restore_clipboard, args=(self._pastes,)
+            )
+            self._restore_timer.daemon = True
+            self._restore_timer.start()
+
+    def _restore_clipboard(self, paste: int):
+        with self._lock:
+            if paste != self._pastes:
+                # fired just as another paste started; that paste's timer restores instead
+                return
+            self._restore_timer = None
+            saved, self._saved_clipboard = self._saved_clipboard, None
+            clipboard = get_clipboard()
+            if saved is None or clipboard is None:
+                return
+            try:
+                clipboard.set(saved)
+            except ClipboardError as e:
+                # runs on a timer thread, where an exception would only be printed as a traceback
+                print(f"Failed to restore the clipboard: {e}")
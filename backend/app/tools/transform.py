@@ -0,0 +1,181 @@
+"""
+Precomputed screen-to-API frame geometry.
+
+A FrameTransform is built once per (screen size, target, filter) and turns a native
+capture into the frame sent to the model in one step: an optional source crop, a
+downsample that uses Image.reduce for the integer part of the ratio, and padding to
+the target aspect ratio, without first allocating a padded full-resolution canvas.
+
+A CoordinateTransform is the matching point geometry: it converts single points or
+arrays of points between API, screen and normalized coordinates.
+"""
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Literal
+
+import numpy as np
+from PIL import Image
+
+# Aspect ratios closer than this are treated as equal (see scale_target_for)
+ASPECT_TOLERANCE = 0.02
+# Passed to Image.resize: box-reduce by the whole part of the ratio first, then resample the rest.
+# Low values favour speed (a 4K -> FWXGA resize reduces 2x first); box reduction keeps text legible.
+REDUCING_GAP = 1.1
+PADDING_COLOR = (255, 255, 255)
+
+
+@dataclass(frozen=True)
+class FrameTransform:
+    """How a `source` sized capture maps onto a `target` sized API frame."""
+
+    source_width: int
+    source_height: int
+    target_width: int
+    target_height: int
+    # size of the scaled capture inside the target frame; the remainder is padding
+    content_width: int
+    content_height: int
+    resample: Image.Resampling = Image.Resampling.BICUBIC
+
+    @property
+    def scale_x(self) -> float:
+        return self.content_width / self.source_width
+
+    @property
+    def scale_y(self) -> float:
+        return self.content_height / self.source_height
+
+    @property
+    def padded(self) -> bool:
+        return (self.content_width, self.content_height) != (self.target_width, self.target_height)
+
+    @property
+    def reduce_factor(self) -> int | None:
+        """Whole-number downscale factor, if the scaled content is an exact reduction of the source."""
+        factor = self.source_width // self.content_width
+        if (
+            factor > 1
+            and self.content_width * factor == self.source_width
+            and self.content_height * factor == self.source_height
+        ):
+            return factor
+        return None
+
+    def apply(self, image: Image.Image, box: tuple[int, int, int, int] | None = None) -> Image.Image:
+        """Crop (optional `box`, in source pixels), downsample and pad `image` into the target frame."""
+        content_size = (self.content_width, self.content_height)
+        if box is None and image.size == content_size:
+            scaled = image
+        elif box is None and self.reduce_factor and image.size == (self.source_width, self.source_height):
+            scaled = image.reduce(self.reduce_factor)
+        else:
+            scaled = image.resize(content_size, self.resample, box=box, reducing_gap=REDUCING_GAP)
+
+        if not self.padded:
+            return scaled
+        frame = Image.new("RGB", (self.target_width, self.target_height), PADDING_COLOR)
+        # padding to top left, matching the coordinate mapping
+        frame.paste(scaled, (0, 0))
+        return frame
+
+
+@lru_cache(maxsize=32)
+def get_frame_transform(
+    source_width: int,
+    source_height: int,
+    target_width: int,
+    target_height: int,
+    resample: Image.Resampling = Image.Resampling.BICUBIC,
+    pad: bool = True,
+) -> FrameTransform:
+    """Build (once) the transform for a screen size and target.
+
+    When the aspect ratios differ and `pad` is set, the capture is scaled uniformly and
+    padded on the right/bottom; otherwise it is stretched to the target as before.
+    """
+    source_ratio = source_width / source_height
+    target_ratio = target_width / target_height
+    if not pad or abs(source_ratio - target_ratio) < ASPECT_TOLERANCE:
+        content_width, content_height = target_width, target_height
+    else:
+        scale = min(target_width / source_width, target_height / source_height)
+        content_width = min(target_width, round(source_width * scale))
+        content_height = min(target_height, round(source_height * scale))
+    return FrameTransform(
+        source_width, source_height, target_width, target_height,
+        content_width, content_height, resample,
+    )
+
+
+Space = Literal["api", "local", "screen", "normalized"]
+SPACES: tuple[Space, ...] = ("api", "local", "screen", "normalized")
+
+
+class CoordinateTransform:
+    """Affine maps between the coordinate spaces of one screen, precomputed as 3x3 matrices.
+
+    - "api": pixels of the frame sent to the model (scaled and possibly padded)
+    - "local": native pixels within the screen
+    - "screen": native pixels of the virtual desktop (local plus the screen's offset)
+    - "normalized": fractions of the screen's width and height (0..1)
+
+    `convert` takes one (x, y) point or an (N, 2) array of points and maps them all
+    with one matrix product.
+    """
+
+    def __init__(self, width: int, height: int, offset_x: int = 0, offset_y: int = 0,
+                 scale_x: float = 1.0, scale_y: float = 1.0):
+        self.width, self.height = width, height
+        self.offset_x, self.offset_y = offset_x, offset_y
+        self.scale_x, self.scale_y = scale_x, scale_y
+        to_local = {
+            "api": np.array([[1 / scale_x, 0, 0], [0, 1 / scale_y, 0], [0, 0, 1]]),
+            "local": np.eye(3),
+            "screen": np.array([[1, 0, -offset_x], [0, 1, -offset_y], [0, 0, 1]], dtype=np.float64),
+            "normalized": np.array([[width, 0, 0], [0, height, 0], [0, 0, 1]], dtype=np.float64),
+        }
+        from_local = {space: np.linalg.inv(matrix) for space, matrix in to_local.items()}
+        # (source, target) -> 2x3 affine matrix
+        self._matrices = {
+            (source, target): (from_local[target] @ to_local[source])[:2]
+            for source in SPACES for target in SPACES
+        }
+
+    @classmethod
+    def for_frame(cls, transform: "FrameTransform", offset_x: int = 0, offset_y: int = 0) -> "CoordinateTransform":
+        return cls(
+            transform.source_width, transform.source_height, offset_x, offset_y, transform.scale_x, transform.scale_y
+        )
+
+    def convert(self, points, source: Space, target: Space):
+        """Map a point (returns a tuple) or an (N, 2) array (returns an array) from `source` to `target`.
+
+        Pixel spaces are rounded to ints; normalized coordinates stay floats.
+        """
+        array = np.asarray(points, dtype=np.float64)
+        single = array.ndim == 1
+        matrix = self._matrices[(source, target)]
+        result = array.reshape(-1, 2) @ matrix[:, :2].T + matrix[:, 2]
+        if target != "normalized":
+            result = np.rint(result).astype(np.int64)
+        if single:
+            return tuple(v.item() for v in result[0])
+        return result
+
+    def api_to_screen(self, points):
+        return self.convert(points, "api", "screen")
+
+    def screen_to_api(self, points):
+        return self.convert(points, "screen", "api")
+
+    def normalized_to_api(self, points):
+        return self.convert(points, "normalized", "api")
+
+    def normalized_to_screen(self, points):
+        return self.convert(points, "normalized", "screen")
+
+
+@lru_cache(maxsize=32)
+def get_coordinate_transform(transform: FrameTransform, offset_x: int = 0, offset_y: int = 0) -> CoordinateTransform:
+    """Build (once) the coordinate maps for a frame transform on a screen at the given offset."""
+    return CoordinateTransform.for_frame(transform, offset_x, offset_y)
@@ -0,0 +1,63 @@
+"""
+Per-display worker threads for blocking input and capture.
+
+pyautogui calls, settle waits and screen grabs block. Running them on a dedicated
+thread keeps the event loop free for other coroutines (bash sessions, HTTP handlers),
+while actions still execute one at a time and in order. Workers are keyed by the
+X display name, but ComputerTool always uses the one for $DISPLAY, so in practice
+there is one worker per process and all tools in it share it.
+"""
+import asyncio
+import os
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+class DisplayWorker:
+    """A single thread that runs submitted calls for one display in submission order."""
+
+    def __init__(self, display: str):
+        self.display = display
+        self._thread_id: int | None = None
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix=f"display-{display}", initializer=self._register
+        )
+
+    def _register(self):
+        self._thread_id = threading.get_ident()
+
+    def submit(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> "Future[T]":
+        return self._executor.submit(fn, *args, **kwargs)
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run `fn` on the worker and await it without blocking the event loop."""
+        if threading.get_ident() == self._thread_id:
+            return fn(*args, **kwargs)
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def call(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run `fn` on the worker and block until it is done (inline if already on the worker)."""
+        if threading.get_ident() == self._thread_id:
+            return fn(*args, **kwargs)
+        return self.submit(fn, *args, **kwargs).result()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+
+_workers: dict[str, DisplayWorker] = {}
+_workers_lock = threading.Lock()
+
+
+def get_display_worker(display: str | None = None) -> DisplayWorker:
+    """Return the worker for `display` (default: $DISPLAY, or the only display on Windows/macOS)."""
+    display = display or os.environ.get("DISPLAY") or "default"
+    with _workers_lock:
+        worker = _workers.get(display)
+        if worker is None:
+            worker = _workers[display] = DisplayWorker(display)
+        return worker
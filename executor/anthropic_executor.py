@@ -13,6 +13,7 @@ from anthropic.types.beta import (
 from anthropic.types import TextBlock
 from anthropic.types.beta import BetaMessage, BetaTextBlock, BetaToolUseBlock
 from ..tools import BashTool, ComputerTool, EditTool, ToolCollection, ToolResult
+from ..tools.resolution import ResolutionPolicy
 
 
 class AnthropicExecutor:
@@ -20,10 +21,24 @@ class AnthropicExecutor:
         self, 
         output_callback: Callable[[BetaContentBlockParam], None], 
         tool_output_callback: Callable[[Any, str], None],
-        selected_screen: int = 0
+        selected_screen: int = 0,
+        screenshot_token_budget: int | None = None,
+        pacing_profile: str = "default",
+        wait_for_change: bool = False,
     ):
+        # Per-screenshot image token budget; screenshot resolution then adapts to content and context left
+        self.resolution_policy = (
+            ResolutionPolicy(frame_tokens=screenshot_token_budget) if screenshot_token_budget else None
+        )
         self.tool_collection = ToolCollection(
-            ComputerTool(selected_screen=selected_screen),
+            # pacing_profile: fast-headless, default or conservative-remote-desktop (see tools.pacing)
+            # wait_for_change: clicks, keys and typing wait for the screen to react and settle
+            ComputerTool(
+                selected_screen=selected_screen,
+                resolution_policy=self.resolution_policy,
+                pacing=pacing_profile,
+                wait_for_change=wait_for_change,
+            ),
             BashTool(),
             EditTool(),
         )
@@ -31,6 +46,10 @@ class AnthropicExecutor:
         self.tool_output_callback = tool_output_callback
 
     def __call__(self, response: BetaMessage, messages: list[BetaMessageParam]):
+        if self.resolution_policy is not None and response.usage is not None:
+            # the prompt size of this turn tells the policy how much context is left for screenshots
+            self.resolution_policy.observe_usage(response.usage.input_tokens)
+
         new_message = {
             "role": "assistant",
             "content": cast(list[BetaContentBlockParam], response.content),
@@ -74,6 +93,10 @@ class AnthropicExecutor:
         
         return tool_result_content
 
+def _image_html(media_type: str, data: str) -> str:
+    return f'<img src="data:{media_type};base64,{data}">'
+
+
 def _message_display_callback(messages):
     display_messages = []
     for msg in messages:
@@ -85,7 +108,8 @@ def _message_display_callback(messages):
             elif isinstance(msg["content"][0], BetaToolUseBlock):
                 display_messages.append((None, f"Tool Use: {msg['content'][0].name}\nInput: {msg['content'][0].input}"))  # Bot message
             elif isinstance(msg["content"][0], Dict) and msg["content"][0]["content"][-1]["type"] == "image":
-                display_messages.append((None, f'<img src="data:image/png;base64,{msg["content"][0]["content"][-1]["source"]["data"]}">'))  # Bot message
+                source = msg["content"][0]["content"][-1]["source"]
+                display_messages.append((None, _image_html(source["media_type"], source["data"])))  # Bot message
             else:
                 print(msg["content"][0])
         except Exception as e:
@@ -110,17 +134,29 @@ def _make_api_tool_result(
                     "text": _maybe_prepend_system_tool_result(result, result.output),
                 }
             )
-        if result.base64_image:
+        if result.image:
             tool_result_content.append(
                 {
                     "type": "image",
                     "source": {
                         "type": "base64",
-                        "media_type": "image/png",
+                        "media_type": result.media_type or "image/png",
                         "data": result.base64_image,
                     },
                 }
             )
+        for screen_image in result.screen_images:
+            tool_result_content.append({"type": "text", "text": f"Screen {screen_image.screen}:"})
+            tool_result_content.append(
+                {
+                    "type": "image",
+                    "source": {
+                        "type": "base64",
+                        "media_type": screen_image.media_type,
+                        "data": screen_image.base64_image,
+                    },
+                }
+            )
     return {
         "type": "tool_result",
         "content": tool_result_content,
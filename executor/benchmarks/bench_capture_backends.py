@@ -0,0 +1,64 @@
+"""
+Benchmark the capture backends against Xvfb.
+
+Run from the directory containing the executor package:
+
+    python -m executor.benchmarks.bench_capture_backends --resolution 1920x1080 --iterations 50
+"""
+import argparse
+import statistics
+import time
+
+from .xvfb import xvfb
+
+
+def bench_backend(backend, bbox: tuple[int, int, int, int], iterations: int) -> dict:
+    """Time `iterations` grabs of `bbox` (after a short warm-up) and summarise them in milliseconds."""
+    for _ in range(3):
+        backend.grab(bbox)
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        backend.grab(bbox)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "backend": backend.name,
+        "mean_ms": statistics.fmean(timings),
+        "p50_ms": timings[len(timings) // 2],
+        "p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        "min_ms": timings[0],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resolution", default="1920x1080")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--backends", nargs="+", default=["imagegrab", "x11"])
+    args = parser.parse_args()
+
+    width, height = map(int, args.resolution.split("x"))
+    with xvfb(width, height):
+        # imported late: the tools package needs DISPLAY to be set
+        from ..tools.capture import CAPTURE_BACKENDS
+
+        print(f"{'backend':<12}{'mean':>10}{'p50':>10}{'p95':>10}{'min':>10}  (ms, {width}x{height})")
+        for name in args.backends:
+            try:
+                backend = CAPTURE_BACKENDS[name]()
+            except Exception as e:
+                print(f"{name:<12}unavailable: {e}")
+                continue
+            try:
+                result = bench_backend(backend, (0, 0, width, height), args.iterations)
+            finally:
+                backend.close()
+            print(
+                f"{name:<12}{result['mean_ms']:>10.2f}{result['p50_ms']:>10.2f}"
+                f"{result['p95_ms']:>10.2f}{result['min_ms']:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark the screenshot codecs on recorded frames.
+
+Reports encode time and encoded size per codec, relative to the default PNG codec.
+Frames are read from a directory of recorded screenshots (PNG, WebP or JPEG):
+
+    python -m executor.benchmarks.bench_codecs ./tmp/outputs --limit 20 --json codecs.json
+"""
+import argparse
+import json
+import statistics
+import time
+from pathlib import Path
+
+from PIL import Image
+
+FRAME_PATTERNS = ("*.png", "*.webp", "*.jpg")
+
+
+def load_frames(directory: Path, limit: int) -> list[Image.Image]:
+    paths = sorted(path for pattern in FRAME_PATTERNS for path in directory.rglob(pattern))[:limit]
+    frames = []
+    for path in paths:
+        with Image.open(path) as image:
+            frames.append(image.convert("RGB"))
+    return frames
+
+
+def bench_codec(codec, frames: list[Image.Image], repeats: int) -> dict:
+    timings, sizes = [], []
+    for frame in frames:
+        for _ in range(repeats):
+            start = time.perf_counter()
+            data = codec.encode(frame)
+            timings.append((time.perf_counter() - start) * 1000)
+        sizes.append(len(data))
+    return {
+        "codec": codec.name,
+        "media_type": codec.media_type,
+        "mean_encode_ms": statistics.fmean(timings),
+        "p95_encode_ms": sorted(timings)[min(len(timings) - 1, int(len(timings) * 0.95))],
+        "mean_bytes": statistics.fmean(sizes),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("frames", type=Path, help="directory of recorded screenshots")
+    parser.add_argument("--limit", type=int, default=20, help="maximum number of frames to load")
+    parser.add_argument("--repeats", type=int, default=3, help="encodes per frame and codec")
+    parser.add_argument("--codecs", nargs="+", default=None, help="codec names (default: all)")
+    parser.add_argument("--json", type=Path, default=None, help="write results to this file")
+    args = parser.parse_args()
+
+    from ..tools.codec import CODECS, DEFAULT_CODEC
+
+    frames = load_frames(args.frames, args.limit)
+    if not frames:
+        parser.error(f"no frames found in {args.frames}")
+
+    results = [bench_codec(CODECS[name], frames, args.repeats) for name in (args.codecs or CODECS)]
+    baseline = next((r for r in results if r["codec"] == DEFAULT_CODEC), results[0])
+    print(f"{'codec':<16}{'encode ms':>12}{'p95 ms':>10}{'KiB':>10}{'size vs ' + baseline['codec']:>16}")
+    for result in results:
+        result["relative_size"] = result["mean_bytes"] / baseline["mean_bytes"]
+        print(
+            f"{result['codec']:<16}{result['mean_encode_ms']:>12.2f}{result['p95_encode_ms']:>10.2f}"
+            f"{result['mean_bytes'] / 1024:>10.1f}{result['relative_size']:>16.2f}"
+        )
+
+    if args.json:
+        args.json.write_text(json.dumps({"frames": len(frames), "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Micro-benchmark the screenshot pipeline under Xvfb.
+
+For each resolution a throwaway Xvfb server is started and painted with synthetic
+desktop content (windows, text, a gradient), then every stage is timed on its own:
+capture, resize, padding, PNG encode and base64, plus the end-to-end
+`get_screenshot` and `ComputerTool.screenshot` paths.
+
+    python -m executor.benchmarks.bench_screenshot --resolutions 1280x800 1920x1080 --json step.json
+
+With `--baseline previous.json`, each stage whose p50 exceeds the baseline's by more
+than `--tolerance` is reported as a regression and the exit status is 1.
+"""
+import argparse
+import asyncio
+import base64
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from PIL import Image, ImageDraw
+
+from .xvfb import paint_root, xvfb
+
+DEFAULT_RESOLUTIONS = ["1280x800", "1920x1080", "2560x1440", "3840x2160"]
+DEFAULT_TOLERANCE = 1.25
+WORDS = "the quick brown fox jumps over lazy dog screen agent click button file edit view help".split()
+
+
+def synthetic_desktop(width: int, height: int, seed: int = 0) -> Image.Image:
+    """A deterministic busy desktop: gradient wallpaper, overlapping windows full of text."""
+    rng = random.Random(seed)
+    image = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+    draw = ImageDraw.Draw(image)
+    for _ in range(6):
+        w, h = rng.randint(width // 4, width // 2), rng.randint(height // 4, height // 2)
+        x, y = rng.randint(0, width - w), rng.randint(0, height - h)
+        draw.rectangle((x, y, x + w, y + h), fill=(250, 250, 250), outline=(80, 80, 80))
+        draw.rectangle((x, y, x + w, y + 24), fill=tuple(rng.randint(40, 200) for _ in range(3)))
+        for line_y in range(y + 32, y + h - 12, 16):
+            draw.text((x + 8, line_y), " ".join(rng.choices(WORDS, k=w // 40)), fill=(20, 20, 20))
+    return image
+
+
+def timed(fn, iterations: int, warmup: int = 2) -> dict:
+    """Call `fn` `iterations` times (after `warmup` calls) and summarise the timings in milliseconds."""
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "mean_ms": statistics.fmean(timings),
+        "p50_ms": timings[len(timings) // 2],
+        "p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        "min_ms": timings[0],
+    }
+
+
+def bench_resolution(width: int, height: int, iterations: int) -> dict[str, dict]:
+    with xvfb(width, height):
+        paint_root(synthetic_desktop(width, height))
+
+        # imported late: the tools package needs DISPLAY to be set
+        from ..tools.archive import ScreenshotArchive, set_archive
+        from ..tools.capture import create_capture_backend, set_capture_backend
+        from ..tools.codec import get_codec
+        from ..tools.computer import ComputerTool
+        from ..tools.screen_capture import get_screenshot
+        from ..tools.topology import get_topology
+        from ..tools.transform import get_frame_transform
+
+        # each Xvfb server is a new display: drop geometry and capture connections from the last one
+        get_topology().refresh()
+        set_archive(ScreenshotArchive(tempfile.mkdtemp(prefix="bench-archive-")))
+        backend = set_capture_backend(create_capture_backend())
+        screen = get_topology().screen(0)
+        frame = backend.grab(screen.bbox)
+        target = screen.scale_target
+        resize = get_frame_transform(width, height, target["width"], target["height"])
+        # XGA pads any widescreen capture, so padding is measured even when the screen's own target does not pad
+        padded = get_frame_transform(width, height, 1024, 768)
+        content = frame.resize((padded.content_width, padded.content_height))
+        api_frame = resize.apply(frame)
+        png = get_codec("png")
+        data = png.encode(api_frame)
+        tool = ComputerTool(selected_screen=0)
+
+        def pad():
+            canvas = Image.new("RGB", (padded.target_width, padded.target_height), (255, 255, 255))
+            canvas.paste(content, (0, 0))
+
+        stages = {
+            "capture": lambda: backend.grab(screen.bbox),
+            "resize": lambda: frame.resize(
+                (resize.content_width, resize.content_height), resize.resample
+            ),
+            "transform": lambda: resize.apply(frame),
+            "padding": pad,
+            "png_encode": lambda: png.encode(api_frame),
+            "base64": lambda: base64.b64encode(data),
+            "get_screenshot": lambda: get_screenshot(0),
+            "computer_screenshot": lambda: asyncio.run(tool.screenshot(max_wait=0)),
+        }
+        results = {}
+        for stage, fn in stages.items():
+            results[stage] = timed(fn, iterations)
+            print(f"{f'{width}x{height}':<12}{stage:<22}" + "".join(f"{v:>10.2f}" for v in results[stage].values()))
+        results["png_encode"]["bytes"] = len(data)
+        return results
+
+
+def check_regressions(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Attach a p50 threshold from `baseline` to every stage it knows; return the stages over it."""
+    regressions = []
+    for resolution, stages in results.items():
+        for stage, result in stages.items():
+            reference = baseline.get(resolution, {}).get(stage)
+            if reference is None:
+                continue
+            result["threshold_p50_ms"] = reference["p50_ms"] * tolerance
+            result["regressed"] = result["p50_ms"] > result["threshold_p50_ms"]
+            if result["regressed"]:
+                regressions.append(
+                    f"{resolution} {stage}: p50 {result['p50_ms']:.2f} ms > {result['threshold_p50_ms']:.2f} ms"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resolutions", nargs="+", default=DEFAULT_RESOLUTIONS)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--json", type=Path, default=None, help="write results to this file")
+    parser.add_argument("--baseline", type=Path, default=None, help="results JSON of an earlier run")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="allowed p50 ratio to baseline")
+    args = parser.parse_args()
+
+    print(f"{'resolution':<12}{'stage':<22}{'mean':>10}{'p50':>10}{'p95':>10}{'min':>10}  (ms)")
+    results = {}
+    for resolution in args.resolutions:
+        width, height = map(int, resolution.split("x"))
+        results[resolution] = bench_resolution(width, height, args.iterations)
+
+    regressions = []
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        regressions = check_regressions(results, baseline["results"], args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+
+    if args.json:
+        args.json.write_text(json.dumps(
+            {"iterations": args.iterations, "tolerance": args.tolerance, "results": results}, indent=2
+        ))
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
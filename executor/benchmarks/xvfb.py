@@ -0,0 +1,102 @@
+"""
+Run benchmarks against a throwaway Xvfb server.
+"""
+import contextlib
+import os
+import shutil
+import subprocess
+import time
+
+
+def _free_display(start: int = 90) -> int:
+    for number in range(start, start + 100):
+        if not os.path.exists(f"/tmp/.X{number}-lock") and not os.path.exists(f"/tmp/.X11-unix/X{number}"):
+            return number
+    raise RuntimeError("No free X display number found.")
+
+
+@contextlib.contextmanager
+def xvfb(width: int = 1920, height: int = 1080, depth: int = 24, timeout: float = 10.0):
+    """Start Xvfb at the given resolution and point DISPLAY at it for the duration of the block."""
+    if shutil.which("Xvfb") is None:
+        raise RuntimeError("Xvfb is not installed.")
+    number = _free_display()
+    process = subprocess.Popen(
+        ["Xvfb", f":{number}", "-screen", "0", f"{width}x{height}x{depth}", "-nolisten", "tcp"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    socket = f"/tmp/.X11-unix/X{number}"
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(socket):
+        if process.poll() is not None or time.monotonic() > deadline:
+            process.kill()
+            raise RuntimeError(f"Xvfb :{number} failed to start.")
+        time.sleep(0.05)
+
+    previous = os.environ.get("DISPLAY")
+    os.environ["DISPLAY"] = f":{number}"
+    try:
+        yield os.environ["DISPLAY"]
+    finally:
+        if previous is None:
+            os.environ.pop("DISPLAY", None)
+        else:
+            os.environ["DISPLAY"] = previous
+        process.terminate()
+        process.wait(timeout=timeout)
+
+
+def paint_root(image, display: str | None = None):
+    """Show `image` (PIL, RGB) as the root window background of `display` until the server exits."""
+    import ctypes
+    import ctypes.util
+
+    x11 = ctypes.CDLL(ctypes.util.find_library("X11"))
+    x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+    x11.XOpenDisplay.restype = ctypes.c_void_p
+    x11.XDefaultScreen.argtypes = [ctypes.c_void_p]
+    x11.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+    x11.XDefaultRootWindow.restype = ctypes.c_ulong
+    x11.XDefaultVisual.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    x11.XDefaultVisual.restype = ctypes.c_void_p
+    x11.XDefaultDepth.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    x11.XDefaultGC.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    x11.XDefaultGC.restype = ctypes.c_void_p
+    x11.XCreatePixmap.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.c_uint, ctypes.c_uint, ctypes.c_uint]
+    x11.XCreatePixmap.restype = ctypes.c_ulong
+    x11.XCreateImage.argtypes = [
+        ctypes.c_void_p, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int, ctypes.c_int,
+        ctypes.c_char_p, ctypes.c_uint, ctypes.c_uint, ctypes.c_int, ctypes.c_int,
+    ]
+    x11.XCreateImage.restype = ctypes.c_void_p
+    x11.XPutImage.argtypes = [
+        ctypes.c_void_p, ctypes.c_ulong, ctypes.c_void_p, ctypes.c_void_p,
+        ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_uint, ctypes.c_uint,
+    ]
+    x11.XSetWindowBackgroundPixmap.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.c_ulong]
+    x11.XClearWindow.argtypes = [ctypes.c_void_p, ctypes.c_ulong]
+    x11.XSync.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    x11.XFreePixmap.argtypes = [ctypes.c_void_p, ctypes.c_ulong]
+    x11.XCloseDisplay.argtypes = [ctypes.c_void_p]
+
+    dpy = x11.XOpenDisplay((display or os.environ["DISPLAY"]).encode())
+    if not dpy:
+        raise RuntimeError("Cannot open the X display to paint it.")
+    screen = x11.XDefaultScreen(dpy)
+    root = x11.XDefaultRootWindow(dpy)
+    width, height = image.size
+    # 24-bit TrueColor visuals take 32-bit BGRX pixels
+    data = image.convert("RGB").tobytes("raw", "BGRX")
+    ximage = x11.XCreateImage(
+        dpy, x11.XDefaultVisual(dpy, screen), x11.XDefaultDepth(dpy, screen), 2, 0, data, width, height, 32, 0
+    )
+    pixmap = x11.XCreatePixmap(dpy, root, width, height, x11.XDefaultDepth(dpy, screen))
+    x11.XPutImage(dpy, pixmap, x11.XDefaultGC(dpy, screen), ximage, 0, 0, 0, 0, width, height)
+    x11.XSetWindowBackgroundPixmap(dpy, root, pixmap)
+    x11.XClearWindow(dpy, root)
+    # like xsetroot: the window keeps the background after the pixmap and connection are gone
+    x11.XFreePixmap(dpy, pixmap)
+    x11.XSync(dpy, 0)
+    # the XImage points into `data` (owned by Python), so only its struct would need freeing; it is left alone
+    x11.XCloseDisplay(dpy)
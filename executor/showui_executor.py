@@ -16,6 +16,7 @@ from anthropic.types import TextBlock
 from anthropic.types.beta import BetaMessage, BetaTextBlock, BetaToolUseBlock
 from computer_use_demo.tools import BashTool, ComputerTool, EditTool, ToolCollection, ToolResult
 from computer_use_demo.tools.colorful_text import colorful_text_showui, colorful_text_vlm
+from computer_use_demo.tools.topology import get_topology
 
 
 class ShowUIExecutor:
@@ -23,7 +24,9 @@ class ShowUIExecutor:
         self, 
         output_callback: Callable[[BetaContentBlockParam], None], 
         tool_output_callback: Callable[[Any, str], None],
-        selected_screen: int = 0
+        selected_screen: int = 0,
+        pacing_profile: str = "default",
+        wait_for_change: bool = False,
     ):
         self.output_callback = output_callback
         self.tool_output_callback = tool_output_callback
@@ -31,9 +34,10 @@ class ShowUIExecutor:
         self.screen_bbox = self._get_screen_resolution()
         print("Screen BBox:", self.screen_bbox)
         
-        self.tool_collection = ToolCollection(
-            ComputerTool(selected_screen=selected_screen, is_scaling=False)
+        self.computer = ComputerTool(
+            selected_screen=selected_screen, is_scaling=False, pacing=pacing_profile, wait_for_change=wait_for_change
         )
+        self.tool_collection = ToolCollection(self.computer)
         
         self.supported_action_type={
             # "showui_action": "anthropic_tool_action"
@@ -156,9 +160,7 @@ class ShowUIExecutor:
                     # continue
                 
                 elif action_item["action"] == "CLICK":  # 1. click -> mouse_move + left_click
-                    x, y = action_item["position"]
-                    action_item["position"] = (int(x * (self.screen_bbox[2] - self.screen_bbox[0])),
-                                               int(y * (self.screen_bbox[3] - self.screen_bbox[1])))
+                    action_item["position"] = self.computer.coordinate_transform.normalized_to_api(action_item["position"])
                     refined_output.append({"action": "mouse_move", "text": None, "coordinate": tuple(action_item["position"])})
                     refined_output.append({"action": "left_click", "text": None, "coordinate": None})
                 
@@ -172,9 +174,7 @@ class ShowUIExecutor:
                     refined_output.append({"action": "key", "text": "Escape", "coordinate": None})
                     
                 elif action_item["action"] == "HOVER":  # 5. hover -> mouse_move
-                    x, y = action_item["position"]
-                    action_item["position"] = (int(x * (self.screen_bbox[2] - self.screen_bbox[0])),
-                                               int(y * (self.screen_bbox[3] - self.screen_bbox[1])))
+                    action_item["position"] = self.computer.coordinate_transform.normalized_to_api(action_item["position"])
                     refined_output.append({"action": "mouse_move", "text": None, "coordinate": tuple(action_item["position"])})
                     
                 elif action_item["action"] == "SCROLL":  # 6. scroll -> key: pagedown
@@ -186,9 +186,7 @@ class ShowUIExecutor:
                         raise ValueError(f"Scroll direction {action_item['value']} not supported.")
 
                 elif action_item["action"] == "PRESS":  # 7. press
-                    x, y = action_item["position"]
-                    action_item["position"] = (int(x * (self.screen_bbox[2] - self.screen_bbox[0])),
-                                               int(y * (self.screen_bbox[3] - self.screen_bbox[1])))
+                    action_item["position"] = self.computer.coordinate_transform.normalized_to_api(action_item["position"])
                     refined_output.append({"action": "mouse_move", "text": None, "coordinate": tuple(action_item["position"])})
                     refined_output.append({"action": "left_press", "text": None, "coordinate": None})
 
@@ -200,68 +198,14 @@ class ShowUIExecutor:
         
 
     def _get_screen_resolution(self):
-        from screeninfo import get_monitors
-        import platform
-        if platform.system() == "Darwin":
-            import Quartz  # uncomment this line if you are on macOS
-        import subprocess
-            
-        # Detect platform
-        system = platform.system()
-
-        if system == "Windows":
-            # Windows: Use screeninfo to get monitor details
-            screens = get_monitors()
-
-            # Sort screens by x position to arrange from left to right
-            sorted_screens = sorted(screens, key=lambda s: s.x)
-
-            if self.selected_screen < 0 or self.selected_screen >= len(screens):
-                raise IndexError("Invalid screen index.")
-
-            screen = sorted_screens[self.selected_screen]
-            bbox = (screen.x, screen.y, screen.x + screen.width, screen.y + screen.height)
-
-        elif system == "Darwin":  # macOS
-            # macOS: Use Quartz to get monitor details
-            max_displays = 32  # Maximum number of displays to handle
-            active_displays = Quartz.CGGetActiveDisplayList(max_displays, None, None)[1]
-
-            # Get the display bounds (resolution) for each active display
-            screens = []
-            for display_id in active_displays:
-                bounds = Quartz.CGDisplayBounds(display_id)
-                screens.append({
-                    'id': display_id,
-                    'x': int(bounds.origin.x),
-                    'y': int(bounds.origin.y),
-                    'width': int(bounds.size.width),
-                    'height': int(bounds.size.height),
-                    'is_primary': Quartz.CGDisplayIsMain(display_id)  # Check if this is the primary display
-                })
-
-            # Sort screens by x position to arrange from left to right
-            sorted_screens = sorted(screens, key=lambda s: s['x'])
-
-            if self.selected_screen < 0 or self.selected_screen >= len(screens):
-                raise IndexError("Invalid screen index.")
-
-            screen = sorted_screens[self.selected_screen]
-            bbox = (screen['x'], screen['y'], screen['x'] + screen['width'], screen['y'] + screen['height'])
-
-        else:  # Linux or other OS
-            cmd = "xrandr | grep ' primary' | awk '{print $4}'"
-            try:
-                output = subprocess.check_output(cmd, shell=True).decode()
-                resolution = output.strip().split()[0]
-                width, height = map(int, resolution.split('x'))
-                bbox = (0, 0, width, height)  # Assuming single primary screen for simplicity
-            except subprocess.CalledProcessError:
-                raise RuntimeError("Failed to get screen resolution on Linux.")
-        
-        return bbox
+        # Served from the shared topology cache, so building an executor does not re-probe monitors
+        return get_topology().screen(self.selected_screen).bbox
+
 
 
+def _image_html(media_type: str, data: str) -> str:
+    return f'<img src="data:{media_type};base64,{data}">'
+
 
 def _message_display_callback(messages):
     display_messages = []
@@ -274,7 +218,8 @@ def _message_display_callback(messages):
             elif isinstance(msg["content"][0], BetaToolUseBlock):
                 display_messages.append((None, f"Tool Use: {msg['content'][0].name}\nInput: {msg['content'][0].input}"))  # Bot message
             elif isinstance(msg["content"][0], Dict) and msg["content"][0]["content"][-1]["type"] == "image":
-                display_messages.append((None, f'<img src="data:image/png;base64,{msg["content"][0]["content"][-1]["source"]["data"]}">'))  # Bot message
+                source = msg["content"][0]["content"][-1]["source"]
+                display_messages.append((None, _image_html(source["media_type"], source["data"])))  # Bot message
             else:
                 pass
                 # print(msg["content"][0])
@@ -301,17 +246,29 @@ def _make_api_tool_result(
                     "text": _maybe_prepend_system_tool_result(result, result.output),
                 }
             )
-        if result.base64_image:
+        if result.image:
             tool_result_content.append(
                 {
                     "type": "image",
                     "source": {
                         "type": "base64",
-                        "media_type": "image/png",
+                        "media_type": result.media_type or "image/png",
                         "data": result.base64_image,
                     },
                 }
             )
+        for screen_image in result.screen_images:
+            tool_result_content.append({"type": "text", "text": f"Screen {screen_image.screen}:"})
+            tool_result_content.append(
+                {
+                    "type": "image",
+                    "source": {
+                        "type": "base64",
+                        "media_type": screen_image.media_type,
+                        "data": screen_image.base64_image,
+                    },
+                }
+            )
     return {
         "type": "tool_result",
         "content": tool_result_content,
@@ -3,7 +3,7 @@ from .bash import BashTool
 from .collection import ToolCollection
 from .computer import ComputerTool
 from .edit import EditTool
-from .screen_capture import get_screenshot
+from .screen_capture import get_all_screenshots, get_screenshot
 
 __ALL__ = [
     BashTool,
@@ -12,5 +12,6 @@ __ALL__ = [
     EditTool,
     ToolCollection,
     ToolResult,
+    get_all_screenshots,
     get_screenshot,
 ]
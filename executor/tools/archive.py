@@ -0,0 +1,244 @@
+"""
+Content-addressed screenshot archive.
+
+Capture paths encode screenshots in memory and hand the bytes to the archive, which
+stores each distinct image once under its SHA-256 digest, keeps an index mapping
+(session, step) to digests, and evicts least-recently-used images once the archive
+grows past its byte quota. All disk and index work happens on a daemon thread so
+the agent step never waits on I/O. If the archive cannot be opened (a read-only
+directory, a locked index), every queued and later submission fails at once instead
+of waiting forever.
+"""
+import hashlib
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from pathlib import Path
+
+OUTPUT_DIR = "./tmp/outputs"
+DEFAULT_QUOTA_BYTES = 2 * 1024 ** 3
+# Longest a caller that needs the stored path should wait for it
+SUBMIT_TIMEOUT = 10.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    digest TEXT PRIMARY KEY,
+    suffix TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS objects_last_used ON objects (last_used);
+CREATE TABLE IF NOT EXISTS steps (
+    session TEXT NOT NULL,
+    step INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    created REAL NOT NULL,
+    phash TEXT
+);
+CREATE INDEX IF NOT EXISTS steps_session ON steps (session, step);
+"""
+
+
+@dataclass(frozen=True)
+class _Pending:
+    digest: str
+    suffix: str
+    data: bytes
+    session: str | None
+    step: int | None
+    phash: str | None
+    future: Future
+
+
+class ScreenshotArchive:
+    """Deduplicating screenshot store under `root`, bounded to `quota_bytes`."""
+
+    def __init__(self, root: str = OUTPUT_DIR, quota_bytes: int = DEFAULT_QUOTA_BYTES, max_pending: int = 64):
+        self.root = Path(root)
+        self.quota_bytes = quota_bytes
+        self.index_path = self.root / "index.sqlite3"
+        self._queue: queue.Queue[_Pending] = queue.Queue(maxsize=max_pending)
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        # why the archive thread could not start; set once, after which submissions fail
+        self._error: Exception | None = None
+
+    def path_for(self, digest: str, suffix: str = "png") -> Path:
+        return self.root / "objects" / digest[:2] / f"{digest}.{suffix}"
+
+    def submit(
+        self,
+        data: bytes,
+        suffix: str = "png",
+        session: str | None = None,
+        step: int | None = None,
+        phash: str | None = None,
+    ) -> "Future[Path]":
+        """Queue `data` for storage; the future resolves to its path once it is on disk.
+
+        `phash` (the frame's perceptual hash) is recorded with the step so that visually
+        identical screens can be found across sessions with `find_phash`.
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        future: Future[Path] = Future()
+        self._ensure_started()
+        # under the lock, so a failing archive thread cannot miss this item when it drains the queue
+        with self._lock:
+            if self._error is not None:
+                future.set_exception(RuntimeError(f"screenshot archive is unavailable: {self._error}"))
+                return future
+            try:
+                self._queue.put_nowait(_Pending(digest, suffix, data, session, step, phash, future))
+            except queue.Full:
+                # never block the caller; a slow disk only costs us archived frames
+                print(f"Screenshot archive queue is full, dropping {digest[:12]}")
+                future.set_exception(RuntimeError("screenshot archive queue is full"))
+        return future
+
+    def flush(self):
+        """Block until every queued screenshot has been stored."""
+        self._queue.join()
+
+    def lookup(self, session: str, step: int | None = None) -> list[tuple[int, str]]:
+        """(step, digest) pairs recorded for `session`, optionally for a single step."""
+        if not self.index_path.exists():
+            return []
+        with sqlite3.connect(self.index_path) as conn:
+            if step is None:
+                rows = conn.execute(
+                    "SELECT step, digest FROM steps WHERE session = ? ORDER BY step", (session,)
+                )
+            else:
+                rows = conn.execute(
+                    "SELECT step, digest FROM steps WHERE session = ? AND step = ?", (session, step)
+                )
+            return rows.fetchall()
+
+    def find_phash(self, phash: str) -> list[tuple[str, int, str]]:
+        """(session, step, digest) of every archived step whose frame had perceptual hash `phash`."""
+        if not self.index_path.exists():
+            return []
+        with sqlite3.connect(self.index_path) as conn:
+            rows = conn.execute(
+                "SELECT session, step, digest FROM steps WHERE phash = ? ORDER BY created DESC", (phash,)
+            )
+            return rows.fetchall()
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="screenshot-archive", daemon=True)
+                self._thread.start()
+
+    def _open(self) -> sqlite3.Connection:
+        self.root.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.index_path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        # indexes created before perceptual hashes were recorded
+        if "phash" not in {row[1] for row in conn.execute("PRAGMA table_info(steps)")}:
+            conn.execute("ALTER TABLE steps ADD COLUMN phash TEXT")
+        conn.execute("CREATE INDEX IF NOT EXISTS steps_phash ON steps (phash)")
+        return conn
+
+    def _fail(self, error: Exception):
+        """Record why the archive is unusable and fail everything still queued."""
+        print(f"Screenshot archive unavailable: {error}")
+        with self._lock:
+            self._error = error
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                item.future.set_exception(RuntimeError(f"screenshot archive is unavailable: {error}"))
+                self._queue.task_done()
+
+    def _run(self):
+        # the index connection is owned by this thread
+        try:
+            conn = self._open()
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()[0]
+        except (OSError, sqlite3.Error) as e:
+            self._fail(e)
+            return
+        while True:
+            item = self._queue.get()
+            try:
+                total += self._store(conn, item)
+                if total > self.quota_bytes:
+                    total -= self._evict(conn, total - self.quota_bytes, keep=item.digest)
+                conn.commit()
+                item.future.set_result(self.path_for(item.digest, item.suffix))
+            except Exception as e:
+                print(f"Failed to archive screenshot {item.digest[:12]}: {e}")
+                item.future.set_exception(e)
+            finally:
+                self._queue.task_done()
+
+    def _store(self, conn: sqlite3.Connection, item: _Pending) -> int:
+        """Write the object unless it is already stored; returns the number of bytes added."""
+        now = time.time()
+        if item.session is not None:
+            conn.execute(
+                "INSERT INTO steps (session, step, digest, created, phash) VALUES (?, ?, ?, ?, ?)",
+                (item.session, item.step, item.digest, now, item.phash),
+            )
+        if conn.execute("SELECT 1 FROM objects WHERE digest = ?", (item.digest,)).fetchone():
+            conn.execute("UPDATE objects SET last_used = ? WHERE digest = ?", (now, item.digest))
+            return 0
+
+        path = self.path_for(item.digest, item.suffix)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_bytes(item.data)
+        os.replace(tmp, path)
+        conn.execute(
+            "INSERT INTO objects (digest, suffix, size, created, last_used) VALUES (?, ?, ?, ?, ?)",
+            (item.digest, item.suffix, len(item.data), now, now),
+        )
+        return len(item.data)
+
+    def _evict(self, conn: sqlite3.Connection, excess: int, keep: str) -> int:
+        """Delete least-recently-used objects until `excess` bytes are freed; returns bytes freed."""
+        freed = 0
+        rows = conn.execute(
+            "SELECT digest, suffix, size FROM objects WHERE digest != ? ORDER BY last_used", (keep,)
+        ).fetchall()
+        for digest, suffix, size in rows:
+            if freed >= excess:
+                break
+            self.path_for(digest, suffix).unlink(missing_ok=True)
+            conn.execute("DELETE FROM objects WHERE digest = ?", (digest,))
+            conn.execute("DELETE FROM steps WHERE digest = ?", (digest,))
+            freed += size
+        return freed
+
+
+_archive: ScreenshotArchive | None = None
+_archive_lock = threading.Lock()
+
+
+def get_archive() -> ScreenshotArchive:
+    """Return the process-wide screenshot archive."""
+    global _archive
+    if _archive is None:
+        with _archive_lock:
+            if _archive is None:
+                _archive = ScreenshotArchive()
+    return _archive
+
+
+def set_archive(archive: ScreenshotArchive) -> ScreenshotArchive:
+    """Replace the process-wide archive, e.g. to change its root or quota."""
+    global _archive
+    with _archive_lock:
+        _archive = archive
+    return archive
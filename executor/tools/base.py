@@ -1,3 +1,4 @@
+import base64
 from abc import ABCMeta, abstractmethod
 from dataclasses import dataclass, fields, replace
 from typing import Any
@@ -20,14 +21,91 @@ class BaseAnthropicTool(metaclass=ABCMeta):
         raise NotImplementedError
 
 
+class EncodedImage:
+    """Encoded image bytes (PNG, WebP, ...) whose base64 form is built lazily, once.
+
+    Tool results carry the raw bytes; base64 is only needed where the result is
+    serialized for the API or a display. Once built it replaces the raw bytes, so a
+    retained result holds one copy of the image.
+    """
+
+    __slots__ = ("_data", "media_type", "_base64", "_size")
+
+    def __init__(self, data: bytes | memoryview, media_type: str = "image/png"):
+        self._data: bytes | memoryview | None = data
+        self.media_type = media_type
+        self._base64: str | None = None
+        self._size = len(data)
+
+    @property
+    def data(self) -> bytes | memoryview:
+        """The encoded bytes; decoded again from base64 once that has replaced them."""
+        data = self._data
+        if data is None:
+            return base64.b64decode(self._base64)
+        return data
+
+    @property
+    def base64(self) -> str:
+        if self._base64 is None:
+            data = self._data
+            # None if a concurrent call has just encoded (and released) the bytes
+            if data is not None:
+                self._base64 = base64.b64encode(data).decode()
+                self._data = None
+        return self._base64
+
+    def __len__(self):
+        return self._size
+
+    def __bool__(self):
+        return self._size > 0
+
+    def __repr__(self):
+        return f"EncodedImage({self.media_type}, {self._size} bytes)"
+
+
+@dataclass(kw_only=True, frozen=True)
+class ScreenImage:
+    """One monitor's image within a multi-screen result."""
+
+    screen: int
+    bbox: tuple[int, int, int, int]
+    image: EncodedImage
+
+    @property
+    def base64_image(self) -> str:
+        return self.image.base64
+
+    @property
+    def media_type(self) -> str:
+        return self.image.media_type
+
+
 @dataclass(kw_only=True, frozen=True)
 class ToolResult:
     """Represents the result of a tool execution."""
 
     output: str | None = None
     error: str | None = None
-    base64_image: str | None = None
+    image: EncodedImage | None = None
     system: str | None = None
+    settle_time: float | None = None
+    image_bbox: tuple[int, int, int, int] | None = None
+    screen_images: tuple[ScreenImage, ...] = ()
+    # perceptual hash of the full API frame (hex), see tools.phash
+    frame_hash: str | None = None
+    # name of the pacing profile the action ran with, see tools.pacing
+    pacing: str | None = None
+
+    @property
+    def base64_image(self) -> str | None:
+        """Base64 of the image, encoded on first access (the serialization boundary)."""
+        return self.image.base64 if self.image else None
+
+    @property
+    def media_type(self) -> str | None:
+        return self.image.media_type if self.image else None
 
     def __bool__(self):
         return any(getattr(self, field.name) for field in fields(self))
@@ -45,8 +123,13 @@ class ToolResult:
         return ToolResult(
             output=combine_fields(self.output, other.output),
             error=combine_fields(self.error, other.error),
-            base64_image=combine_fields(self.base64_image, other.base64_image, False),
+            image=combine_fields(self.image, other.image, False),
             system=combine_fields(self.system, other.system),
+            settle_time=combine_fields(self.settle_time, other.settle_time),
+            image_bbox=combine_fields(self.image_bbox, other.image_bbox, False),
+            screen_images=combine_fields(self.screen_images, other.screen_images),
+            frame_hash=combine_fields(self.frame_hash, other.frame_hash, False),
+            pacing=self.pacing or other.pacing,
         )
 
     def replace(self, **kwargs):
@@ -0,0 +1,55 @@
+"""
+Concurrent capture of every monitor.
+
+The virtual desktop is grabbed once (so all screens show the same instant) and each
+screen is then cropped, scaled and encoded on a worker thread; PIL releases the GIL
+while resampling and encoding, so the screens are processed in parallel.
+"""
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+from .capture import get_capture_backend
+from .codec import ImageCodec
+from .topology import ScreenGeometry
+from .transform import FrameTransform
+
+_executor: ThreadPoolExecutor | None = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="screen-encode")
+    return _executor
+
+
+def desktop_bbox(screens: list[ScreenGeometry]) -> tuple[int, int, int, int]:
+    """Bounding box of the union of all screens."""
+    return (
+        min(s.x for s in screens),
+        min(s.y for s in screens),
+        max(s.x + s.width for s in screens),
+        max(s.y + s.height for s in screens),
+    )
+
+
+def grab_desktop(screens: list[ScreenGeometry]) -> Image.Image:
+    return get_capture_backend().grab(desktop_bbox(screens))
+
+
+def encode_screens(
+    desktop: Image.Image,
+    screens: list[ScreenGeometry],
+    transform_for: Callable[[ScreenGeometry], FrameTransform],
+    codec: ImageCodec,
+) -> list[tuple[ScreenGeometry, bytes]]:
+    """Crop each screen out of a desktop grab, transform and encode them concurrently."""
+    left, top, _, _ = desktop_bbox(screens)
+
+    def work(screen: ScreenGeometry) -> tuple[ScreenGeometry, bytes]:
+        box = (screen.x - left, screen.y - top, screen.x - left + screen.width, screen.y - top + screen.height)
+        return screen, codec.encode(transform_for(screen).apply(desktop, box=box))
+
+    return list(_get_executor().map(work, screens))
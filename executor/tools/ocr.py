@@ -0,0 +1,97 @@
+"""
+Offline OCR of screenshots.
+
+Uses a local tesseract install through `pytesseract` (both optional, nothing leaves
+the machine). Words are grouped into lines, and every line is reported with its box
+in the caller's coordinate space.
+"""
+import shutil
+from dataclasses import dataclass
+from functools import lru_cache
+
+from PIL import Image
+
+BBox = tuple[int, int, int, int]
+
+# tesseract word confidences range 0..100 (-1 for non-word layout entries)
+MIN_CONFIDENCE = 50
+
+
+@dataclass(frozen=True)
+class TextBox:
+    """A line of recognized text and its box (left, top, right, bottom)."""
+
+    text: str
+    bbox: BBox
+    confidence: float
+
+    @property
+    def center(self) -> tuple[int, int]:
+        left, top, right, bottom = self.bbox
+        return (left + right) // 2, (top + bottom) // 2
+
+    def describe(self) -> str:
+        left, top, right, bottom = self.bbox
+        return f"({left}, {top}, {right}, {bottom}) {self.text}"
+
+
+@lru_cache(maxsize=1)
+def ocr_available() -> bool:
+    try:
+        import pytesseract  # noqa: F401
+    except ImportError:
+        print("pytesseract is not installed, text observations are unavailable")
+        return False
+    if shutil.which("tesseract") is None:
+        print("The tesseract binary is not on PATH, text observations are unavailable")
+        return False
+    return True
+
+
+def recognize(
+    image: Image.Image,
+    offset: tuple[int, int] = (0, 0),
+    scale: tuple[float, float] = (1.0, 1.0),
+    min_confidence: float = MIN_CONFIDENCE,
+) -> list[TextBox]:
+    """OCR `image` and return its text lines.
+
+    Boxes are mapped to the caller's space as `offset + pixel * scale`, e.g. a native
+    crop of the screen to API coordinates.
+    """
+    import pytesseract
+
+    data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
+    lines: dict[tuple[int, int, int], list[int]] = {}
+    for i, word in enumerate(data["text"]):
+        if word.strip() and float(data["conf"][i]) >= min_confidence:
+            lines.setdefault((data["block_num"][i], data["par_num"][i], data["line_num"][i]), []).append(i)
+
+    (dx, dy), (sx, sy) = offset, scale
+    boxes = []
+    for words in lines.values():
+        left = min(data["left"][i] for i in words)
+        top = min(data["top"][i] for i in words)
+        right = max(data["left"][i] + data["width"][i] for i in words)
+        bottom = max(data["top"][i] + data["height"][i] for i in words)
+        boxes.append(TextBox(
+            text=" ".join(data["text"][i].strip() for i in words),
+            bbox=(round(dx + left * sx), round(dy + top * sy), round(dx + right * sx), round(dy + bottom * sy)),
+            confidence=sum(float(data["conf"][i]) for i in words) / len(words),
+        ))
+    return boxes
+
+
+def reading_order(boxes: list[TextBox]) -> list[TextBox]:
+    return sorted(boxes, key=lambda box: (box.bbox[1], box.bbox[0]))
+
+
+def merge_bands(spans: list[tuple[int, int]], margin: int, limit: int) -> list[tuple[int, int]]:
+    """Merge vertical (top, bottom) spans, each grown by `margin` and clipped to [0, limit]."""
+    merged: list[tuple[int, int]] = []
+    for top, bottom in sorted((max(0, t - margin), min(limit, b + margin)) for t, b in spans):
+        if merged and top <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], bottom))
+        else:
+            merged.append((top, bottom))
+    return merged
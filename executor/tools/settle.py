@@ -0,0 +1,97 @@
+"""
+Adaptive "screen settled" detection.
+
+Instead of sleeping a fixed time after an action, sample frames, compare cheap
+low-resolution grayscale versions of them and stop as soon as consecutive samples
+are unchanged (or a ceiling is reached). Waiting for a reaction to input compares
+full-resolution frames instead, since a caret, a typed character or a checkbox tick
+vanishes in the probe.
+"""
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from PIL import Image, ImageChops
+
+PROBE_SIZE = (64, 40)
+
+
+@dataclass(frozen=True)
+class SettleResult:
+    """Outcome of a settle wait; `image` is the last full-resolution frame sampled."""
+
+    waited: float
+    settled: bool
+    changed: bool
+    image: Image.Image | None = None
+
+
+def probe(image: Image.Image) -> Image.Image:
+    """Downsample a frame to a tiny grayscale probe used for change detection."""
+    return image.resize(PROBE_SIZE, Image.Resampling.BOX).convert("L")
+
+
+def probes_differ(a: Image.Image, b: Image.Image, threshold: int = 8) -> bool:
+    """True if any probe pixel moved by more than `threshold` grey levels."""
+    _, max_diff = ImageChops.difference(a, b).getextrema()
+    return max_diff > threshold
+
+
+def frames_differ(a: Image.Image, b: Image.Image, threshold: int = 8) -> bool:
+    """True if any full-resolution pixel moved by more than `threshold` in some channel."""
+    if a.size != b.size:
+        return True
+    difference = ImageChops.difference(a.convert("RGB"), b.convert("RGB"))
+    return difference.point(lambda v: 255 if v > threshold else 0).getbbox() is not None
+
+
+def wait_until_settled(
+    grab: Callable[[], Image.Image],
+    max_wait: float = 1.0,
+    interval: float = 0.05,
+    stable_samples: int = 2,
+    threshold: int = 8,
+    require_change: bool = False,
+    reference: Image.Image | None = None,
+) -> SettleResult:
+    """Sample `grab` until `stable_samples` consecutive probes match, or `max_wait` passes.
+
+    With `require_change`, the screen must first differ from `reference` (or the first
+    sample) before it can count as settled; this is what callers use to wait for the
+    reaction to an input rather than for a screen that was already static.
+    """
+    start = time.monotonic()
+    image = grab()
+    previous = probe(image)
+    reference = reference if reference is not None else image
+    baseline = probe(reference)
+
+    def differs_from_reference(image: Image.Image, current: Image.Image) -> bool:
+        if require_change:
+            # the reaction may be a few pixels on a large screen; compare full frames
+            return frames_differ(reference, image, threshold)
+        return probes_differ(baseline, current, threshold)
+
+    changed = differs_from_reference(image, previous)
+    stable = 0
+
+    while True:
+        elapsed = time.monotonic() - start
+        if elapsed + interval > max_wait:
+            return SettleResult(waited=elapsed, settled=False, changed=changed, image=image)
+        time.sleep(interval)
+
+        image = grab()
+        current = probe(image)
+        if probes_differ(previous, current, threshold):
+            stable = 0
+        else:
+            stable += 1
+        if not changed and differs_from_reference(image, current):
+            changed = True
+        previous = current
+
+        if stable >= stable_samples and (changed or not require_change):
+            return SettleResult(
+                waited=time.monotonic() - start, settled=True, changed=changed, image=image
+            )
@@ -0,0 +1,246 @@
+"""
+Cached monitor topology shared by the screen capture helpers and the computer tool.
+
+Monitors are probed once and the geometry of every screen (bbox, offsets and the
+scaling target used for the API) is cached until the display configuration changes.
+On Linux the cache is invalidated by RandR screen-change events, on macOS by the
+Quartz display reconfiguration callback. Where no such watcher runs (Windows, or a
+watcher that failed) the monitors are re-probed every REPROBE_INTERVAL seconds.
+`refresh()` forces a re-probe everywhere.
+"""
+import platform
+import subprocess
+import threading
+import time
+from dataclasses import dataclass
+from typing import TypedDict
+
+from screeninfo import get_monitors
+
+from .base import ToolError
+
+if platform.system() == "Darwin":
+    import Quartz  # uncomment this line if you are on macOS
+
+
+# Cache lifetime in seconds when no display change notifications are available
+REPROBE_INTERVAL = 5.0
+
+
+class Resolution(TypedDict):
+    width: int
+    height: int
+
+
+MAX_SCALING_TARGETS: dict[str, Resolution] = {
+    "XGA": Resolution(width=1024, height=768),  # 4:3
+    "WXGA": Resolution(width=1280, height=800),  # 16:10
+    "FWXGA": Resolution(width=1366, height=768),  # ~16:9
+}
+
+
+def scale_target_for(width: int, height: int) -> Resolution:
+    """Pick the API scaling target for a screen of the given size."""
+    ratio = width / height
+    for dimension in MAX_SCALING_TARGETS.values():
+        # allow some error in the aspect ratio - not ratios are exactly 16:9
+        if abs(dimension["width"] / dimension["height"] - ratio) < 0.02:
+            if dimension["width"] < width:
+                return dimension
+            break
+    # TODO: currently we force the target to be WXGA (16:10), when it cannot find a match
+    return MAX_SCALING_TARGETS["WXGA"]
+
+
+@dataclass(frozen=True)
+class ScreenGeometry:
+    """Geometry of a single monitor in virtual desktop coordinates."""
+
+    index: int
+    x: int
+    y: int
+    width: int
+    height: int
+    is_primary: bool
+    scale_target: Resolution
+
+    @property
+    def bbox(self) -> tuple[int, int, int, int]:
+        return (self.x, self.y, self.x + self.width, self.y + self.height)
+
+    @property
+    def offset(self) -> tuple[int, int]:
+        return (self.x, self.y)
+
+
+class ScreenTopology:
+    """Probes the monitors once and serves cached geometry until invalidated."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._screens: list[ScreenGeometry] | None = None
+        self._probed_at = 0.0
+        # set by invalidate(); the old geometry is kept to tell whether the next probe changed anything
+        self._invalidated = False
+        # True while a watcher delivers change notifications; otherwise the cache expires
+        self._watching = False
+        # set once a watcher cannot work at all on this host (e.g. python-xlib missing)
+        self._watcher_unavailable = False
+        # bumped whenever a probe finds a new layout; ComputerTool compares it to drop per-screen state
+        self.generation = 0
+
+    def screens(self) -> list[ScreenGeometry]:
+        """Return all screens sorted from left to right."""
+        screens = self._screens
+        if screens is None or self._expired():
+            with self._lock:
+                if self._screens is None or self._expired():
+                    probed = self._probe()
+                    self._probed_at = time.monotonic()
+                    self._invalidated = False
+                    if probed != self._screens:
+                        self._screens = probed
+                        self.generation += 1
+                    self._start_watcher()
+                screens = self._screens
+        return screens
+
+    def _expired(self) -> bool:
+        return self._invalidated or (not self._watching and time.monotonic() - self._probed_at > REPROBE_INTERVAL)
+
+    def screen(self, index: int | None = 0) -> ScreenGeometry:
+        """Return the screen at `index` (left to right), or the primary screen for None.
+
+        Raises ToolError when the screen does not exist, e.g. after a monitor was unplugged.
+        """
+        screens = self.screens()
+        if index is not None and not 0 <= index < len(screens):
+            # the cache may predate a hot-plug nobody told us about; look once more
+            screens = self.refresh()
+        if index is None:
+            primary = next((s for s in screens if s.is_primary), None)
+            if primary is None:
+                raise ToolError("No primary monitor found.")
+            return primary
+        if not 0 <= index < len(screens):
+            raise ToolError(f"Screen {index} does not exist; {len(screens)} screen(s) are connected.")
+        return screens[index]
+
+    def invalidate(self):
+        """Drop the cached geometry; the next lookup re-probes the monitors."""
+        with self._lock:
+            self._invalidated = True
+
+    def refresh(self) -> list[ScreenGeometry]:
+        """Re-probe the monitors immediately."""
+        self.invalidate()
+        return self.screens()
+
+    def _probe(self) -> list[ScreenGeometry]:
+        system = platform.system()
+        if system == "Darwin":
+            raw = _probe_quartz()
+        else:
+            try:
+                raw = [(m.x, m.y, m.width, m.height, bool(m.is_primary)) for m in get_monitors()]
+            except Exception:
+                if system == "Windows":
+                    raise
+                raw = _probe_xrandr()
+
+        # Sort screens by x position to arrange from left to right
+        raw.sort(key=lambda s: s[0])
+        return [
+            ScreenGeometry(
+                index=i, x=x, y=y, width=width, height=height, is_primary=is_primary,
+                scale_target=scale_target_for(width, height),
+            )
+            for i, (x, y, width, height, is_primary) in enumerate(raw)
+        ]
+
+    def _start_watcher(self):
+        """Subscribe to display change notifications (called with the lock held).
+
+        Without a watcher (Windows, or when subscribing fails) `_watching` stays False
+        and the cache expires after REPROBE_INTERVAL instead.
+        """
+        if self._watching or self._watcher_unavailable:
+            return
+        system = platform.system()
+        if system == "Linux":
+            self._watching = True
+            threading.Thread(target=self._watch_randr, name="randr-watcher", daemon=True).start()
+        elif system == "Darwin":
+            try:
+                Quartz.CGDisplayRegisterReconfigurationCallback(self._on_quartz_reconfigure, None)
+                self._watching = True
+            except Exception as e:
+                self._watcher_unavailable = True
+                print(f"Display reconfiguration callback unavailable: {e}")
+
+    def _watch_randr(self):
+        try:
+            from Xlib import display as xdisplay
+            from Xlib.ext import randr
+        except ImportError:
+            print("python-xlib is not installed, monitors are re-probed periodically instead")
+            self._watcher_unavailable = True
+            self._watching = False
+            return
+        try:
+            conn = xdisplay.Display()
+            conn.screen().root.xrandr_select_input(
+                randr.RRScreenChangeNotifyMask
+                | randr.RRCrtcChangeNotifyMask
+                | randr.RROutputChangeNotifyMask
+            )
+            while True:
+                conn.next_event()
+                # every event we subscribed to means the layout (may have) changed
+                self.invalidate()
+        except Exception as e:
+            print(f"RandR watcher stopped: {e}")
+        finally:
+            # fall back to periodic re-probes; the next one starts a new watcher
+            self._watching = False
+
+    def _on_quartz_reconfigure(self, display_id, flags, user_info):
+        # the callback fires once before and once after the change; only act on the latter
+        if not flags & Quartz.kCGDisplayBeginConfigurationFlag:
+            self.invalidate()
+
+
+def _probe_quartz() -> list[tuple[int, int, int, int, bool]]:
+    max_displays = 32  # Maximum number of displays to handle
+    active_displays = Quartz.CGGetActiveDisplayList(max_displays, None, None)[1]
+    screens = []
+    for display_id in active_displays:
+        bounds = Quartz.CGDisplayBounds(display_id)
+        screens.append((
+            int(bounds.origin.x), int(bounds.origin.y),
+            int(bounds.size.width), int(bounds.size.height),
+            bool(Quartz.CGDisplayIsMain(display_id)),  # Check if this is the primary display
+        ))
+    return screens
+
+
+def _probe_xrandr() -> list[tuple[int, int, int, int, bool]]:
+    """Fallback for X servers screeninfo cannot enumerate: ask xrandr for the primary output."""
+    cmd = "xrandr | grep ' primary' | awk '{print $4}'"
+    try:
+        output = subprocess.check_output(cmd, shell=True).decode()
+        resolution = output.strip().split()[0]  # e.g. 1920x1080+0+0
+        size, _, position = resolution.partition('+')
+        width, height = map(int, size.split('x'))
+        x, y = map(int, position.split('+')) if position else (0, 0)
+        return [(x, y, width, height, True)]  # Assuming single primary screen for simplicity
+    except (subprocess.CalledProcessError, IndexError, ValueError):
+        raise RuntimeError("Failed to get screen resolution on Linux.")
+
+
+_topology = ScreenTopology()
+
+
+def get_topology() -> ScreenTopology:
+    """Return the process-wide topology service."""
+    return _topology